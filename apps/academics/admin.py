@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from dashboards.admin_filters import AutocompleteListFilter
+
 from .models import Department, Program, Session, Semester, Course, ProgramCourse
 
 
@@ -26,7 +28,7 @@ class SessionAdmin(admin.ModelAdmin):
 @admin.register(Semester)
 class SemesterAdmin(admin.ModelAdmin):
     list_display = ("program", "session", "number")
-    list_filter = ("program", "session")
+    list_filter = (("program", AutocompleteListFilter), ("session", AutocompleteListFilter))
 
 
 @admin.register(Course)
@@ -39,4 +41,5 @@ class CourseAdmin(admin.ModelAdmin):
 @admin.register(ProgramCourse)
 class ProgramCourseAdmin(admin.ModelAdmin):
     list_display = ("program", "department", "semester_number", "course")
-    list_filter = ("department", "program", "semester_number")
+    list_filter = ("department", ("program", AutocompleteListFilter), "semester_number")
+    autocomplete_fields = ("course",)
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AcademicsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'academics'
+
+    def ready(self):
+        from django.db.models import CharField
+        from django.db.models.functions import Lower
+
+        # code__lower=... / registration_no__lower=...: case-insensitive
+        # equality that can use the Lower() indexes (iexact cannot).
+        CharField.register_lookup(Lower)
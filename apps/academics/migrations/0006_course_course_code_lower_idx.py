@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:58
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0005_alter_course_title'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(django.db.models.functions.text.Lower('code'), name='course_code_lower_idx'),
+        ),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 
 class Department(models.Model):
@@ -13,17 +16,75 @@ class Department(models.Model):
         return self.name
 
 
+DEFAULT_DEPARTMENT_NAME = "Falcon Educational Complex, Tank"
+
+# Id of the default department, cached per process (model saves and imports
+# call this for every row). Reset when that department is changed or deleted,
+# but only in the process that did it: other workers keep the old id until
+# they restart. Renaming is harmless (the row still exists); after deleting
+# the default department, restart the workers (get_default_department
+# recovers on its own, saves that fill in department_id would not).
+_default_department_id = None
+
+
+def get_default_department_id() -> int:
+    """Return the default department's id, creating the department if missing."""
+    global _default_department_id
+    if _default_department_id is None:
+        obj, created = Department.objects.get_or_create(name=DEFAULT_DEPARTMENT_NAME)
+        if created:
+            # Only remember a new row once it is committed (it may be rolled back).
+            transaction.on_commit(lambda: _remember_default_department_id(obj.id))
+            return obj.id
+        _default_department_id = obj.id
+    return _default_department_id
+
+
+def _remember_default_department_id(dept_id):
+    global _default_department_id
+    _default_department_id = dept_id
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def _forget_default_department(sender, instance, **kwargs):
+    global _default_department_id
+    if instance.id == _default_department_id:
+        _default_department_id = None
+
+
 def get_default_department() -> "Department":
     """Return the first department, creating the default one if missing.
 
     This is used as a safe fallback so existing forms/views that don't
     expose a department field keep working.
     """
-    default_name = "Falcon Educational Complex, Tank"
-    obj, _ = Department.objects.get_or_create(name=default_name)
+    obj = Department.objects.filter(id=get_default_department_id()).first()
+    if obj is None:
+        # Cached id went stale (row removed without signals, e.g. a flush).
+        _remember_default_department_id(None)
+        obj = Department.objects.get(id=get_default_department_id())
     return obj
 
 
+def related_department_id(instance, field_name: str):
+    """``department_id`` of the object a FK points to, without loading that object.
+
+    Uses the already-cached related object when there is one, else a single
+    ``values_list`` lookup.
+    """
+    field = instance._meta.get_field(field_name)
+    if not getattr(instance, field.attname):
+        return None
+    if field.is_cached(instance):
+        return getattr(field.get_cached_value(instance), "department_id", None)
+    return (
+        field.related_model.objects.filter(pk=getattr(instance, field.attname))
+        .values_list("department_id", flat=True)
+        .first()
+    )
+
+
 class Program(models.Model):
     """
     Example:
@@ -51,7 +112,7 @@ class Program(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.department_id:
-            self.department = get_default_department()
+            self.department_id = get_default_department_id()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -103,6 +164,12 @@ class Course(models.Model):
     title = models.CharField(max_length=255)
     credit_hours = models.DecimalField(max_digits=4, decimal_places=1)
 
+    class Meta:
+        indexes = [
+            # Imports match codes case-insensitively (code__lower=...)
+            models.Index(Lower("code"), name="course_code_lower_idx"),
+        ]
+
     def __str__(self):
         return f"{self.code or 'NO-CODE'} - {self.title} ({self.credit_hours} CH)"
 
@@ -122,10 +189,7 @@ class ProgramCourse(models.Model):
     def save(self, *args, **kwargs):
         if not self.department_id:
             # Keep in sync with the program's department
-            if self.program_id and getattr(self.program, "department_id", None):
-                self.department_id = self.program.department_id
-            else:
-                self.department = get_default_department()
+            self.department_id = related_department_id(self, "program") or get_default_department_id()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -1,3 +1,45 @@
 from django.test import TestCase
 
-# Create your tests here.
+from academics import models
+from academics.models import DEFAULT_DEPARTMENT_NAME, Department, get_default_department, get_default_department_id
+
+
+class DefaultDepartmentTests(TestCase):
+    """The per-process memo of the default department's id."""
+
+    def setUp(self):
+        # Process-global: leave it as the other tests expect it.
+        self.addCleanup(setattr, models, "_default_department_id", models._default_department_id)
+        models._default_department_id = None
+
+    def default_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return get_default_department_id()
+
+    def test_memoized(self):
+        department_id = self.default_id()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_default_department_id(), department_id)
+
+    def test_delete_and_recreate_invalidates(self):
+        Department.objects.get(id=self.default_id()).delete()
+        self.assertIsNone(models._default_department_id)
+        recreated = self.default_id()
+        self.assertEqual(Department.objects.get(id=recreated).name, DEFAULT_DEPARTMENT_NAME)
+        self.assertEqual(get_default_department_id(), recreated)
+
+    def test_rename_invalidates(self):
+        old = Department.objects.get(id=self.default_id())
+        old.name = "Renamed"
+        old.save()
+        self.assertNotEqual(self.default_id(), old.id)
+
+    def test_uncommitted_department_not_memoized(self):
+        Department.objects.filter(name=DEFAULT_DEPARTMENT_NAME).delete()
+        get_default_department_id()  # created, but the transaction may still roll back
+        self.assertIsNone(models._default_department_id)
+
+    def test_stale_id_from_another_process_recovers(self):
+        models._default_department_id = 999999  # deleted by another worker
+        self.assertEqual(get_default_department().name, DEFAULT_DEPARTMENT_NAME)
+        self.assertNotEqual(models._default_department_id, 999999)
@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.urls import reverse
+
+
+class AutocompleteListFilter(admin.RelatedFieldListFilter):
+    """Admin ``list_filter`` for a foreign key that searches instead of listing.
+
+    The stock filter renders one link per related row (every course, every
+    session). This one shows only "All" and the current choice, plus a search
+    box backed by the admin's own autocomplete endpoint, so the related model's
+    admin needs ``search_fields``. Use as ``list_filter = (("course",
+    AutocompleteListFilter), ...)``.
+    """
+
+    template = "admin/autocomplete_filter.html"
+
+    def field_choices(self, field, request, model_admin):
+        # Only the selected object(s): the rest are searched on demand.
+        if not self.lookup_val:
+            return []
+        related = field.remote_field.model._default_manager.filter(
+            **{f"{field.target_field.name}__in": self.lookup_val}
+        )
+        return [(getattr(obj, field.target_field.attname), str(obj)) for obj in related]
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Read by the template: where to search, and the page to filter.
+        self.autocomplete_url = reverse(f"{changelist.model_admin.admin_site.name}:autocomplete")
+        self.source = self.field.model._meta
+        self.base_query_string = changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull])
+        yield from super().choices(changelist)
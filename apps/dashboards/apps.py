@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DashboardsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dashboards"
+
+    def ready(self):
+        from . import context_processors, counters, filter_cascade, roles  # noqa: F401  (signal receivers)
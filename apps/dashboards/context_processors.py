@@ -1,6 +1,40 @@
 from __future__ import annotations
 
-from academics.models import Department, get_default_department
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+
+from academics.models import Department, get_default_department, get_default_department_id
+
+from .roles import is_system_admin
+
+# ---------------------------------------------------------
+# Process-local department cache (departments rarely change).
+# Cleared by the signals below in the writing process; other processes pick
+# up changes after DEPARTMENT_CACHE_TTL seconds.
+# ---------------------------------------------------------
+_departments: tuple[Department, ...] | None = None
+_departments_loaded_at = 0.0
+
+
+def cached_departments() -> tuple[Department, ...]:
+    """All departments ordered by name (shared instances: do not modify)."""
+    global _departments, _departments_loaded_at
+    departments = _departments
+    if departments is None or time.monotonic() - _departments_loaded_at > settings.DEPARTMENT_CACHE_TTL:
+        departments = tuple(Department.objects.all().order_by("name"))
+        _departments, _departments_loaded_at = departments, time.monotonic()
+    return departments
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def _departments_changed(sender, **kwargs):
+    global _departments
+    _departments = None
 
 
 def get_active_department(request):
@@ -8,9 +42,10 @@ def get_active_department(request):
     dept_id = request.session.get("active_department_id")
     dept = None
     if dept_id:
-        dept = Department.objects.filter(id=dept_id).first()
+        dept = next((d for d in cached_departments() if d.id == dept_id), None)
     if dept is None:
-        dept = get_default_department()
+        default_id = get_default_department_id()
+        dept = next((d for d in cached_departments() if d.id == default_id), None) or get_default_department()
         request.session["active_department_id"] = dept.id
     return dept
 
@@ -18,20 +53,15 @@ def get_active_department(request):
 def role_flags(request):
     user = request.user
 
-    is_system_admin = (
-        user.is_authenticated
-        and (user.is_superuser or user.groups.filter(name="System Admin").exists())
-    )
-
-    ctx = {"is_system_admin": is_system_admin}
+    ctx = {"is_system_admin": is_system_admin(request)}
 
-    # Department context is only needed for authenticated users
+    # Department context is only needed for authenticated users, and only
+    # resolved when a template actually uses it.
     if user.is_authenticated:
-        active_department = get_active_department(request)
         ctx.update(
             {
-                "departments": Department.objects.all().order_by("name"),
-                "active_department": active_department,
+                "departments": SimpleLazyObject(lambda: list(cached_departments())),
+                "active_department": SimpleLazyObject(lambda: get_active_department(request)),
             }
         )
 
@@ -0,0 +1,160 @@
+"""Materialized dashboard counters.
+
+The dashboards show row counts of large tables (CourseResult, ...). Instead of
+``COUNT(*)`` on every page load, counts live in :class:`DashboardCounter` rows:
+
+* post_save / post_delete signals adjust them by +/-1;
+* code that bypasses signals (``bulk_create``, ``QuerySet.update``) calls
+  :func:`add` itself;
+* :func:`batched` collapses the per-row adjustments of an import into one
+  UPDATE per counter;
+* ``manage.py reconcile_dashboard_counters`` recounts everything (run it
+  periodically, e.g. nightly, to repair any drift).
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import Course, Program, Session
+from results.models import CourseResult, ResultBatch
+from students.models import Enrollment, Student
+
+from .models import DashboardCounter
+
+# name -> function returning the queryset that is counted
+COUNTERS = {
+    "programs": lambda: Program.objects.all(),
+    "courses": lambda: Course.objects.all(),
+    "sessions": lambda: Session.objects.all(),
+    "students": lambda: Student.objects.all(),
+    "enrollments": lambda: Enrollment.objects.all(),
+    "batches": lambda: ResultBatch.objects.all(),
+    "locked_batches": lambda: ResultBatch.objects.filter(is_locked=True),
+    "course_results": lambda: CourseResult.objects.all(),
+}
+
+# model -> counter tracking all of its rows
+_MODEL_COUNTERS = {
+    Program: "programs",
+    Course: "courses",
+    Session: "sessions",
+    Student: "students",
+    Enrollment: "enrollments",
+    ResultBatch: "batches",
+    CourseResult: "course_results",
+}
+
+_local = threading.local()
+
+
+# ======================================================
+# WRITE SIDE
+# ======================================================
+
+def _apply(deltas):
+    for name, delta in deltas.items():
+        if delta:
+            DashboardCounter.objects.filter(name=name).update(value=F("value") + delta)
+
+
+def add(name: str, delta: int):
+    """Adjust a counter (buffered while inside :func:`batched`)."""
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending[name] += delta
+    else:
+        _apply({name: delta})
+
+
+@contextmanager
+def batched():
+    """Accumulate counter adjustments and write them once at the end (imports)."""
+    if getattr(_local, "pending", None) is not None:
+        # Nested: the outer block writes.
+        yield
+        return
+
+    _local.pending = deltas = Counter()
+    try:
+        yield
+    except BaseException:
+        # Rows written before the error may be committed (no surrounding
+        # transaction), so still record them; inside a broken transaction this
+        # fails and is rolled back with it -- reconcile repairs any drift.
+        _local.pending = None
+        try:
+            _apply(deltas)
+        except Exception:
+            pass
+        raise
+    _local.pending = None
+    _apply(deltas)
+
+
+def _model_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add(_MODEL_COUNTERS[sender], 1)
+
+
+def _model_deleted(sender, instance, **kwargs):
+    add(_MODEL_COUNTERS[sender], -1)
+
+
+for _model in _MODEL_COUNTERS:
+    post_save.connect(_model_saved, sender=_model, dispatch_uid=f"dashboard_counter_save_{_model.__name__}")
+    post_delete.connect(_model_deleted, sender=_model, dispatch_uid=f"dashboard_counter_delete_{_model.__name__}")
+
+
+@receiver(post_save, sender=ResultBatch)
+def _batch_lock_changed(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_locked = False if created else bool(getattr(instance, "_loaded_is_locked", False))
+    if instance.is_locked != was_locked:
+        add("locked_batches", 1 if instance.is_locked else -1)
+
+
+@receiver(post_delete, sender=ResultBatch)
+def _locked_batch_deleted(sender, instance, **kwargs):
+    if instance.is_locked:
+        add("locked_batches", -1)
+
+
+# ======================================================
+# READ SIDE
+# ======================================================
+
+def reconcile(names=None) -> dict:
+    """Recount the given (default: all) counters; returns {name: (old, new)}."""
+    changes = {}
+    with transaction.atomic():
+        for name in names or COUNTERS:
+            value = COUNTERS[name]().count()
+            counter, created = DashboardCounter.objects.select_for_update().get_or_create(
+                name=name, defaults={"value": value}
+            )
+            old = None if created else counter.value
+            if old != value:
+                if not created:
+                    counter.value = value
+                    counter.save(update_fields=["value", "updated_at"])
+                changes[name] = (old, value)
+    return changes
+
+
+def get_counts(*names: str) -> dict:
+    """Current values of the given counters in one query (missing rows are created)."""
+    values = dict(DashboardCounter.objects.filter(name__in=names).values_list("name", "value"))
+    missing = [name for name in names if name not in values]
+    if missing:
+        reconcile(missing)
+        values.update(DashboardCounter.objects.filter(name__in=missing).values_list("name", "value"))
+    return values
@@ -4,25 +4,21 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
 
+from .roles import has_any_group
+
 
 def group_required(*group_names: str):
     """Require that the logged-in user belongs to at least one of the given groups.
 
-    Superusers always pass.
+    Superusers always pass. Groups come from the per-session role cache
+    (see :mod:`dashboards.roles`).
     """
 
     def decorator(view_func):
         @login_required
         @wraps(view_func)
         def _wrapped(request, *args, **kwargs):
-            user = request.user
-            if user.is_superuser:
-                return view_func(request, *args, **kwargs)
-
-            if not group_names:
-                return view_func(request, *args, **kwargs)
-
-            if user.groups.filter(name__in=group_names).exists():
+            if has_any_group(request, *group_names):
                 return view_func(request, *args, **kwargs)
 
             messages.error(request, "You do not have permission to access that page.")
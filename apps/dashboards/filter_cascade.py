@@ -0,0 +1,215 @@
+"""Cascading filter options for the document pickers.
+
+The DMC and result-notification pages narrow Department → Program → Session →
+Semester → Type → Batch (→ Student). All of a department's programs and their
+batch metadata are read in one query, kept in the shared cache under a version
+stamp (bumped by the signals below whenever a program, session or batch
+changes), and every level's options are derived from it in memory.
+
+:func:`resolve` is used both by the pages and by their JSON endpoint, so a
+dropdown refreshed without a reload shows exactly what a full reload would.
+"""
+
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import Program, Session
+from results import archive
+from results.models import ResultBatch
+
+from . import stamps
+
+_VERSION_KEY = "filter_cascade:version"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+RESULT_TYPE_LABELS = dict(ResultBatch.RESULT_TYPES)
+
+# UI type -> batch result types (the UI merges repeat + improved)
+UI_TYPES = {
+    "regular": ("regular",),
+    "reappeared": ("repeat", "improved"),
+}
+
+
+def _clean_id(value) -> str:
+    value = str(value or "").strip()
+    return value if value.isdigit() else ""
+
+
+# ======================================================
+# CACHED METADATA
+# ======================================================
+
+def _version() -> str:
+    return stamps.get(_VERSION_KEY)
+
+
+def invalidate():
+    stamps.bump(_VERSION_KEY)
+
+
+def _load(dept_id: str) -> dict:
+    """Programs and batch rows of a department ("" = all departments), one query."""
+    qs = Program.objects.all()
+    if dept_id:
+        qs = qs.filter(department_id=dept_id)
+    rows = qs.values(
+        "id",
+        "name",
+        "department_id",
+        batch_id=F("resultbatch__id"),
+        session_id=F("resultbatch__session_id"),
+        start_year=F("resultbatch__session__start_year"),
+        semester_number=F("resultbatch__semester_number"),
+        result_type=F("resultbatch__result_type"),
+        created_at=F("resultbatch__created_at"),
+    )
+
+    programs = {}
+    batches = []
+    for row in rows:
+        programs[row["id"]] = {"id": row["id"], "name": row["name"], "department_id": row["department_id"]}
+        if row["batch_id"] is not None:
+            batches.append(
+                {
+                    "id": row["batch_id"],
+                    "program_id": row["id"],
+                    "program_name": row["name"],
+                    "session_id": row["session_id"],
+                    "start_year": row["start_year"],
+                    "semester_number": row["semester_number"],
+                    "result_type": row["result_type"],
+                    "created_at": row["created_at"],
+                }
+            )
+
+    batches.sort(key=lambda b: (b["created_at"], b["id"]), reverse=True)
+    for b in batches:
+        b["label"] = (
+            f'{b["program_name"]} | {b["start_year"]} | Sem {b["semester_number"]} | '
+            f'{RESULT_TYPE_LABELS.get(b["result_type"], b["result_type"])}'
+        )
+        del b["created_at"]
+    return {
+        "programs": sorted(programs.values(), key=lambda p: (p["name"], p["id"])),
+        "batches": batches,
+    }
+
+
+def department_metadata(dept_id) -> dict:
+    """Cached ``{"programs": [...], "batches": [...]}`` of a department."""
+    dept_id = _clean_id(dept_id)
+    key = f"filter_cascade:{_version()}:{dept_id or 'all'}"
+    data = cache.get(key)
+    if data is None:
+        data = _load(dept_id)
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
+
+
+def batch_department_id(batch_id) -> str:
+    """Department of a batch ("" if it does not exist)."""
+    batch_id = _clean_id(batch_id)
+    if not batch_id:
+        return ""
+    dept_id = ResultBatch.objects.filter(id=batch_id).values_list("program__department_id", flat=True).first()
+    return str(dept_id) if dept_id else ""
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=ResultBatch)
+@receiver(post_delete, sender=ResultBatch)
+def _metadata_changed(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate()
+
+
+# ======================================================
+# CASCADE
+# ======================================================
+
+def resolve(dept_id="", program_id="", session_id="", semester_no="", ui_type="regular", batch_id="", auto_select=True) -> dict:
+    """Options of every level for the given selection, with stale selections cleared.
+
+    Mirrors the pages' rules: sessions narrow by program + type, semesters need
+    a session, and a batch is auto-selected when it is the only match.
+    """
+    dept_id = _clean_id(dept_id)
+    program_id = _clean_id(program_id)
+    session_id = _clean_id(session_id)
+    semester_no = _clean_id(semester_no)
+    batch_id = _clean_id(batch_id)
+    ui_type = "regular" if ui_type == "regular" else "reappeared"
+
+    data = department_metadata(dept_id)
+    types = UI_TYPES[ui_type]
+
+    batches = [b for b in data["batches"] if b["result_type"] in types]
+    if program_id:
+        batches = [b for b in batches if str(b["program_id"]) == program_id]
+    if session_id:
+        batches = [b for b in batches if str(b["session_id"]) == session_id]
+
+    sessions = {}
+    for b in batches:
+        sessions[b["session_id"]] = {"id": b["session_id"], "start_year": b["start_year"]}
+    sessions = sorted(sessions.values(), key=lambda s: -s["start_year"])
+
+    semesters = sorted({b["semester_number"] for b in batches}) if session_id else []
+    if semester_no and int(semester_no) not in semesters:
+        semester_no = ""
+    if semester_no:
+        batches = [b for b in batches if b["semester_number"] == int(semester_no)]
+
+    if batch_id and not any(str(b["id"]) == batch_id for b in batches):
+        batch_id = ""
+    if not batch_id and auto_select and len(batches) == 1:
+        batch_id = str(batches[0]["id"])
+
+    return {
+        "dept_id": dept_id,
+        "programs": data["programs"],
+        "program_id": program_id,
+        "sessions": sessions,
+        "session_id": session_id,
+        "semesters": semesters,
+        "semester_no": semester_no,
+        "ui_type": ui_type,
+        "batches": batches,
+        "batch_id": batch_id,
+    }
+
+
+def batch_students(batch_id) -> list[dict]:
+    """Students with a semester result in the batch, by roll no (hot or archive table)."""
+    batch_id = _clean_id(batch_id)
+    batch = ResultBatch.objects.filter(id=batch_id).only("id", "is_archived").first() if batch_id else None
+    if batch is None:
+        return []
+    return list(
+        archive.semester_results(batch)
+        .values(
+            "enrollment_id",
+            roll=F("enrollment__roll_no"),
+            reg=F("enrollment__student__registration_no"),
+            name=F("enrollment__student__name"),
+        )
+        .order_by("enrollment__roll_sort_key", "roll")
+    )
+
+
+def resolve_student(students, enrollment_id="", auto_select=True) -> str:
+    """The selected enrollment if it is in ``students`` (or the only one)."""
+    enrollment_id = _clean_id(enrollment_id)
+    if enrollment_id and not any(str(s["enrollment_id"]) == enrollment_id for s in students):
+        enrollment_id = ""
+    if not enrollment_id and auto_select and len(students) == 1:
+        enrollment_id = str(students[0]["enrollment_id"])
+    return enrollment_id
@@ -4,6 +4,8 @@ from academics.models import Department, Program, ProgramCourse, Session, Semest
 from results.models import GradeScale, ResultBatch
 from students.models import Enrollment, Student
 
+from .widgets import AutocompleteSelect
+
 
 class SessionForm(forms.ModelForm):
     class Meta:
@@ -34,7 +36,7 @@ class ProgramCourseForm(forms.ModelForm):
             "department": forms.Select(attrs={"class": "form-select"}),
             "program": forms.Select(attrs={"class": "form-select"}),
             "semester_number": forms.NumberInput(attrs={"class": "form-control"}),
-            "course": forms.Select(attrs={"class": "form-select"}),
+            "course": AutocompleteSelect("autocomplete_courses", attrs={"class": "form-select"}),
         }
 
     def __init__(self, *args, **kwargs):
@@ -88,7 +90,7 @@ class EnrollmentForm(forms.ModelForm):
         fields = ["department", "student", "program", "session", "roll_no", "is_active"]
         widgets = {
             "department": forms.Select(attrs={"class": "form-select"}),
-            "student": forms.Select(attrs={"class": "form-select"}),
+            "student": AutocompleteSelect("autocomplete_students", forward=["department"], attrs={"class": "form-select"}),
             "program": forms.Select(attrs={"class": "form-select"}),
             "session": forms.Select(attrs={"class": "form-select"}),
             "roll_no": forms.TextInput(attrs={"class": "form-control"}),
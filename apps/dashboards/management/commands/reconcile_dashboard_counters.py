@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from dashboards.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount the materialized dashboard counters (run periodically, e.g. nightly)."
+
+    def handle(self, *args, **options):
+        changes = reconcile()
+        for name, (old, new) in sorted(changes.items()):
+            self.stdout.write(f"{name}: {old} -> {new}")
+        self.stdout.write(self.style.SUCCESS(f"Done. {len(changes)} counter(s) corrected."))
@@ -0,0 +1,40 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from config.db_router import REPLICA_DB_ALIAS, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite database to the replica file (DB_REPLICA_NAME) for local testing of "
+        "read-replica routing. Uses SQLite's online backup, so the server may keep running."
+    )
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError("No replica database configured (set DB_REPLICA_NAME).")
+        source = connections[DEFAULT_DB_ALIAS]
+        target = connections[REPLICA_DB_ALIAS]
+        if source.vendor != "sqlite" or target.vendor != "sqlite":
+            raise CommandError("sync_replica copies SQLite files; replicate PostgreSQL with streaming replication.")
+        if str(source.settings_dict["NAME"]) == str(target.settings_dict["NAME"]):
+            raise CommandError("The replica must be a different file from the default database.")
+
+        started = time.perf_counter()
+        source.ensure_connection()
+        # A plain connection: the replica's own connections are read-only.
+        dest = sqlite3.connect(str(target.settings_dict["NAME"]))
+        try:
+            source.connection.backup(dest)
+            pages = dest.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            dest.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Copied {pages} pages to {target.settings_dict['NAME']} in {time.perf_counter() - started:.2f}s"
+            )
+        )
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class DashboardCounter(models.Model):
+    """A materialized row count shown on the dashboards (see dashboards.counters)."""
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,150 @@
+"""Keyset (cursor) pagination for the dashboard list pages.
+
+Offset pagination gets slower the deeper you go (the database still walks all
+skipped rows). Here a page is "the next N rows after the last row shown", as a
+WHERE on the list's sort key, so every page costs the same.
+
+The cursor is the sort-key values of the first/last row on the page, encoded in
+``?after=`` / ``?before=``. ``id`` is always appended to the sort key as a tie
+breaker. Sort-key fields must be non-null. A cursor that does not decode to
+values of the sort key's fields (tampered, outdated) gives the first page.
+
+The WHERE + ORDER BY is only cheap with an index on exactly the sort key, so
+prefer local columns that have one (students: ``(name, id)``, batches:
+``(created_at, id)``). A key through a join (``program__name``,
+``session__start_year``) has no index to walk: the database sorts every
+matching row on each page. That is fine for short lists (semesters, program
+courses); the unfiltered enrollment list pays for a full sort on every page.
+"""
+
+from __future__ import annotations
+
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def _json_default(value):
+    # Full precision (DjangoJSONEncoder drops microseconds below milliseconds).
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)  # Decimal, UUID
+
+
+def _encode(values) -> str:
+    raw = json.dumps(values, default=_json_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or not all(isinstance(v, (str, int, float)) for v in values):
+        return None
+    return values
+
+
+def _value(obj, path: str):
+    for attr in path.split("__"):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _keyset_q(fields, values, forward: bool) -> Q:
+    """Rows strictly after (forward) / before the given sort-key values."""
+    clauses = []
+    for i, (name, descending) in enumerate(fields):
+        lookup = "lt" if descending == forward else "gt"
+        equal = {f: v for (f, _), v in zip(fields[:i], values[:i])}
+        clauses.append(Q(**equal, **{f"{name}__{lookup}": values[i]}))
+    return reduce(or_, clauses)
+
+
+def _order_by(fields, forward: bool):
+    # Walking backwards = reversed sort, then the page is flipped back.
+    return [f"-{name}" if descending == forward else name for name, descending in fields]
+
+
+class KeysetPage:
+    """One page of rows plus links to its neighbours (iterate it like a list)."""
+
+    def __init__(self, object_list, has_next, has_previous, next_url, previous_url, first_url, page_size):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_url = next_url
+        self.previous_url = previous_url
+        self.first_url = first_url
+        self.page_size = page_size
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def keyset_paginate(request, queryset, ordering, page_size: int | None = None) -> KeysetPage:
+    """Paginate ``queryset`` by ``ordering`` (e.g. ``("name",)`` or ``("-created_at",)``)."""
+    page_size = page_size or settings.LIST_PAGE_SIZE
+    fields = [(o.lstrip("-"), o.startswith("-")) for o in ordering]
+    if "id" not in (name for name, _ in fields):
+        fields.append(("id", False))
+
+    after = _decode(request.GET.get("after", ""))
+    before = None if after else _decode(request.GET.get("before", ""))
+    forward = before is None
+    cursor = after or before
+    if cursor is not None and len(cursor) != len(fields):
+        cursor, forward = None, True
+
+    qs = None
+    if cursor is not None:
+        try:
+            qs = queryset.order_by(*_order_by(fields, forward)).filter(_keyset_q(fields, cursor, forward))
+        except (TypeError, ValueError, ValidationError):
+            # Tampered/outdated cursor: start from the first page.
+            cursor, forward = None, True
+    if qs is None:
+        qs = queryset.order_by(*_order_by(fields, forward))
+
+    rows = list(qs[: page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if not forward:
+        rows.reverse()
+
+    has_next = more if forward else True
+    has_previous = (cursor is not None) if forward else more
+
+    def url(**cursor_param):
+        params = request.GET.copy()
+        params.pop("after", None)
+        params.pop("before", None)
+        params.update(cursor_param)
+        return f"?{params.urlencode()}"
+
+    def key(obj):
+        return _encode([_value(obj, name) for name, _ in fields])
+
+    return KeysetPage(
+        rows,
+        has_next=bool(rows) and has_next,
+        has_previous=bool(rows) and has_previous,
+        next_url=url(after=key(rows[-1])) if rows else None,
+        previous_url=url(before=key(rows[0])) if rows else None,
+        first_url=url(),
+        page_size=page_size,
+    )
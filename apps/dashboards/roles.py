@@ -0,0 +1,142 @@
+"""Role (group) resolution, cached per session.
+
+A user's group names are read once and stored in the session together with a
+version stamp kept in the shared cache. Group membership changes (signals
+below) bump the stamp, so every session of that user re-reads its groups on
+the next request. A lost stamp is recreated as a new one (see
+:mod:`dashboards.stamps`), which has the same effect; ``ROLE_CACHE_TTL`` bounds
+staleness when the cache is not shared by every process.
+
+Within a request the result is memoised on the request object, so
+``group_required``, ``role_flags`` and the dashboard router together cost no
+role queries on a normal page view.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import stamps
+
+SYSTEM_ADMIN = "System Admin"
+CONTROLLER = "Controller"
+DATA_ENTRY = "Data Entry"
+DOCUMENT_GENERATOR = "Document Generator"
+RESULT_CHECKER = "Result Checker"
+
+# Dashboard routing priority (System Admin always wins).
+DASHBOARDS = (
+    (SYSTEM_ADMIN, "dash_system_admin"),
+    (CONTROLLER, "dash_controller"),
+    (DATA_ENTRY, "dash_data_entry"),
+    (DOCUMENT_GENERATOR, "dash_document_generator"),
+    (RESULT_CHECKER, "dash_result_checker"),
+)
+
+SESSION_KEY = "_role_groups"
+_GLOBAL_VERSION_KEY = "roles:version"
+
+
+def _user_version_key(user_id) -> str:
+    return f"roles:version:{user_id}"
+
+
+def _version(user_id) -> list:
+    versions = stamps.get_many([_GLOBAL_VERSION_KEY, _user_version_key(user_id)])
+    return [versions[_GLOBAL_VERSION_KEY], versions[_user_version_key(user_id)]]
+
+
+def invalidate_user(*user_ids):
+    for user_id in user_ids:
+        stamps.bump(_user_version_key(user_id))
+
+
+def invalidate_all():
+    stamps.bump(_GLOBAL_VERSION_KEY)
+
+
+def user_groups(request) -> frozenset[str]:
+    """Group names of ``request.user`` (empty for anonymous users)."""
+    groups = getattr(request, "_role_groups", None)
+    if groups is not None:
+        return groups
+
+    user = request.user
+    if not user.is_authenticated:
+        groups = frozenset()
+    else:
+        version = _version(user.pk)
+        entry = request.session.get(SESSION_KEY)
+        if (
+            entry
+            and entry.get("user") == user.pk
+            and entry.get("version") == version
+            and time.time() - entry.get("at", 0) < settings.ROLE_CACHE_TTL
+        ):
+            groups = frozenset(entry["groups"])
+        else:
+            groups = frozenset(user.groups.values_list("name", flat=True))
+            request.session[SESSION_KEY] = {
+                "user": user.pk,
+                "version": version,
+                "at": time.time(),
+                "groups": sorted(groups),
+            }
+
+    request._role_groups = groups
+    return groups
+
+
+def has_any_group(request, *group_names: str) -> bool:
+    """Superusers always pass; no group names means any logged-in user."""
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    if user.is_superuser or not group_names:
+        return True
+    return not user_groups(request).isdisjoint(group_names)
+
+
+def is_system_admin(request) -> bool:
+    user = request.user
+    return user.is_authenticated and (user.is_superuser or SYSTEM_ADMIN in user_groups(request))
+
+
+def dashboard_url_name(request) -> str | None:
+    """URL name of the user's dashboard, or None when the user has no role."""
+    if request.user.is_superuser:
+        return "dash_system_admin"
+    groups = user_groups(request)
+    for group_name, url_name in DASHBOARDS:
+        if group_name in groups:
+            return url_name
+    return None
+
+
+# ======================================================
+# INVALIDATION
+# ======================================================
+
+@receiver(m2m_changed, sender=User.groups.through)
+def _groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.groups.add/remove/clear/set
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_user(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        # group.user_set.add/remove
+        invalidate_user(*pk_set)
+    elif action == "pre_clear":
+        invalidate_user(*instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def _group_changed(sender, **kwargs):
+    # Renamed/deleted groups affect every cached set.
+    invalidate_all()
@@ -0,0 +1,41 @@
+"""Version stamps in the shared cache, for invalidating cached data.
+
+A stamp is an opaque, never-repeating token stored without a timeout; cached
+data records the stamp it was built under and is discarded once the stamp
+changes. ``cache.incr`` is deliberately not used: backends re-save the key with
+the default timeout on every incr (the file cache does), and once the key
+expires counting restarts at a value older entries may have been stored under.
+A missing stamp (expired, evicted, cache cleared) is replaced by a fresh token
+instead, so nothing stored under an earlier stamp can match it.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+from django.core.cache import cache
+
+
+def _new() -> str:
+    return uuid.uuid4().hex
+
+
+def get_many(keys) -> dict:
+    """Current stamp of every key, creating missing ones."""
+    stamps = cache.get_many(keys)
+    missing = [key for key in keys if key not in stamps]
+    if missing:
+        for key in missing:
+            cache.add(key, _new(), None)  # another process may have just created it
+        stamps.update(cache.get_many(missing))
+    # A cache that stores nothing (DummyCache): a one-off token never matches.
+    return {key: stamps[key] if key in stamps else _new() for key in keys}
+
+
+def get(key: str) -> str:
+    return get_many([key])[key]
+
+
+def bump(key: str):
+    """Invalidate everything stored under the key's current stamp."""
+    cache.set(key, _new(), None)
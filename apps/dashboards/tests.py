@@ -0,0 +1,749 @@
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from collections import Counter
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions import models as session_models
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from academics.models import Course, Department, Program, ProgramCourse, Semester, Session, get_default_department_id
+from config import db_router
+from config.request_timing import RequestTimingMiddleware
+from dashboards import context_processors, counters, filter_cascade, pagination, roles
+from dashboards import urls as dashboard_urls
+from dashboards.models import DashboardCounter
+from dashboards.pagination import keyset_paginate
+from results import documents, pdf_cache
+from results import urls as result_urls
+from results.models import CourseResult, GradeScale, ReappearSubject, ResultBatch, SemesterResult
+from students import search
+from students.models import Enrollment, Student, roll_sort_key
+
+BUDGETS_FILE = Path(__file__).with_name("query_budgets.json")
+
+ROLES = (roles.SYSTEM_ADMIN, roles.CONTROLLER, roles.DATA_ENTRY, roles.DOCUMENT_GENERATOR, roles.RESULT_CHECKER)
+
+# Object a ``<int:pk>`` URL points at, by URL name (first match wins).
+PK_OBJECTS = (
+    ("program_course", "program_course"),
+    ("grade_scale", "grade_scale"),
+    ("department", "department"),
+    ("program", "program"),
+    ("course", "course"),
+    ("session", "session"),
+    ("semester", "semester"),
+    ("student", "student"),
+    ("enrollment", "enrollment"),
+    ("batch", "batch"),
+)
+
+# Wall-time budgets are for a developer machine; scale them on slow CI.
+TIME_FACTOR = float(os.environ.get("QUERY_BUDGET_TIME_FACTOR", "1"))
+# Over-time views only warn unless QUERY_BUDGET_STRICT_TIME=1 (shared CI runners are noisy).
+STRICT_TIME = bool(os.environ.get("QUERY_BUDGET_STRICT_TIME"))
+# QUERY_BUDGET_REPORT=1 prints what every view measured (for updating the file).
+REPORT = bool(os.environ.get("QUERY_BUDGET_REPORT"))
+
+
+def _shape(sql: str) -> str:
+    """SQL with literals replaced, so repeats of one query (N+1) group together."""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(\.\d+)?\b", "?", sql)
+    return re.sub(r"\((?:\?, )+\?\)", "(...)", sql)
+
+
+@override_settings(
+    # A private, empty cache per request: budgets are for a cold cache.
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "query-budgets"}},
+)
+class QueryBudgetTests(TestCase):
+    """Every dashboard and PDF view, as every role, within its query / time budget.
+
+    Budgets live in ``query_budgets.json`` next to this file (one entry per URL
+    name, plus the PDF context builders): ``queries`` is a hard upper bound,
+    ``ms`` the wall-time budget (about 5x the slowest ``QUERY_BUDGET_REPORT=1``
+    run, at least 50 ms), ``roles`` the roles that get the page (everyone else
+    must be redirected), and ``query`` an optional query string (``{batch}``,
+    ``{enrollment}``, ... are fixture ids). A violation reports the view's most
+    repeated SQL. URLs without a budget fail too.
+
+    Going over the query budget always fails. Going over the time budget only
+    warns, unless ``QUERY_BUDGET_STRICT_TIME=1`` is set (on a quiet machine).
+    """
+
+    N_STUDENTS = 300
+    N_COURSES = 6
+    SEMESTERS = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.budgets = json.loads(BUDGETS_FILE.read_text())
+        department_id = get_default_department_id()
+        cls.department = Department.objects.get(id=department_id)
+        cls.program = Program.objects.create(name="B.Ed", total_semesters=4, department_id=department_id)
+        Program.objects.create(name="M.Ed", total_semesters=4, department_id=department_id)
+        cls.session = Session.objects.create(start_year=2024)
+        Session.objects.create(start_year=2023)
+        cls.semester = Semester.objects.create(program=cls.program, session=cls.session, number=1)
+
+        GradeScale.objects.create(
+            min_percentage=0, max_percentage=Decimal("49.99"), letter_grade="F", grade_point=0, remarks="Fail", is_fail=True
+        )
+        cls.grade_scale = GradeScale.objects.create(
+            min_percentage=50, max_percentage=100, letter_grade="A", grade_point=4, remarks="Pass"
+        )
+
+        courses = {}
+        for sem in range(1, cls.SEMESTERS + 1):
+            courses[sem] = [
+                Course.objects.create(code=f"EDU-{sem}{i:02d}", title=f"Course {sem}.{i}", credit_hours=3)
+                for i in range(cls.N_COURSES)
+            ]
+            for course in courses[sem]:
+                ProgramCourse.objects.create(program=cls.program, semester_number=sem, course=course)
+        cls.course = courses[1][0]
+        cls.program_course = ProgramCourse.objects.filter(course=cls.course).get()
+
+        students = Student.objects.bulk_create(
+            [
+                Student(
+                    department_id=department_id,
+                    name=f"Student {i:03d}",
+                    father_name="Khan",
+                    registration_no=f"REG-{i:03d}",
+                )
+                for i in range(cls.N_STUDENTS)
+            ]
+        )
+        enrollments = Enrollment.objects.bulk_create(
+            [
+                Enrollment(
+                    department_id=department_id,
+                    student=student,
+                    program=cls.program,
+                    session=cls.session,
+                    roll_no=f"BD1524-{i + 1}",
+                    roll_sort_key=roll_sort_key(f"BD1524-{i + 1}"),
+                )
+                for i, student in enumerate(students)
+            ]
+        )
+        cls.student = students[0]
+        cls.enrollment = enrollments[0]
+
+        for sem in range(1, cls.SEMESTERS + 1):
+            batch = ResultBatch.objects.create(
+                program=cls.program, session=cls.session, semester_number=sem, is_locked=sem == 1
+            )
+            CourseResult.objects.bulk_create(
+                [
+                    CourseResult(
+                        batch=batch,
+                        enrollment=enrollment,
+                        course=course,
+                        marks_obtained=40 + (i + j) % 60,
+                        percentage=40 + (i + j) % 60,
+                        letter_grade="A" if 40 + (i + j) % 60 >= 50 else "F",
+                        grade_point=4 if 40 + (i + j) % 60 >= 50 else 0,
+                        **batch.cohort_fields(),
+                    )
+                    for i, enrollment in enumerate(enrollments)
+                    for j, course in enumerate(courses[sem])
+                ]
+            )
+            SemesterResult.objects.bulk_create(
+                [
+                    SemesterResult(
+                        batch=batch,
+                        enrollment=enrollment,
+                        total_obtained=420,
+                        total_max=600,
+                        percentage=70,
+                        gpa=Decimal("3.20"),
+                        cgpa=Decimal("3.10"),
+                        letter_grade="B",
+                        remarks="Pass",
+                        **batch.cohort_fields(),
+                    )
+                    for enrollment in enrollments
+                ]
+            )
+        cls.batch = ResultBatch.objects.get(semester_number=1)
+        ResultBatch.objects.create(program=cls.program, session=cls.session, semester_number=1, result_type="repeat")
+        ReappearSubject.objects.bulk_create(
+            [
+                ReappearSubject(semester_result=sr, course=cls.course)
+                for sr in SemesterResult.objects.filter(batch=cls.batch)[:40]
+            ]
+        )
+        search.rebuild()
+        counters.reconcile()
+
+        cls.users = {}
+        for role in ROLES:
+            # System admins also get the staff-only pages (academics.views).
+            user = User.objects.create_user(
+                username=role.lower().replace(" ", "_"), password="x", is_staff=role == roles.SYSTEM_ADMIN
+            )
+            user.groups.add(Group.objects.get_or_create(name=role)[0])
+            cls.users[role] = user
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def fixture_ids(self) -> dict:
+        return {
+            "department": self.department.id,
+            "program": self.program.id,
+            "session": self.session.id,
+            "semester": self.semester.id,
+            "course": self.course.id,
+            "program_course": self.program_course.id,
+            "grade_scale": self.grade_scale.id,
+            "student": self.student.id,
+            "enrollment": self.enrollment.id,
+            "batch": self.batch.id,
+        }
+
+    def url_for(self, pattern) -> str:
+        ids = self.fixture_ids()
+        kwargs = {}
+        for name in pattern.pattern.converters:
+            if name == "pk":
+                key = next(obj for fragment, obj in PK_OBJECTS if fragment in pattern.name)
+                kwargs[name] = ids[key]
+            else:  # batch_id, enrollment_id
+                kwargs[name] = ids[name.removesuffix("_id")]
+        url = reverse(pattern.name, kwargs=kwargs)
+        query = self.budgets["views"].get(pattern.name, {}).get("query")
+        return f"{url}?{query.format(**ids)}" if query else url
+
+    def measure(self, call):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = call()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        return result, [q["sql"] for q in queries.captured_queries], elapsed_ms
+
+    def check_budget(self, label, budget, sql, elapsed_ms, status=""):
+        if REPORT:
+            sys.stderr.write(f"\n{label:<60}{status:>4}{len(sql):>6} queries{elapsed_ms:>9.1f} ms")
+        problems = []
+        if len(sql) > budget["queries"]:
+            problems.append(f"{len(sql)} queries > budget {budget['queries']}")
+        if elapsed_ms > budget["ms"] * TIME_FACTOR:
+            slow = f"{elapsed_ms:.0f} ms > budget {budget['ms'] * TIME_FACTOR:.0f} ms"
+            if STRICT_TIME:
+                problems.append(slow)
+            else:
+                warnings.warn(f"{label}: {slow}", stacklevel=2)
+        if problems:
+            repeated = Counter(_shape(q) for q in sql).most_common(5)
+            self.fail(
+                f"{label}: {'; '.join(problems)}\n"
+                + "Most repeated SQL:\n"
+                + "\n".join(f"  {n}x  {shape[:400]}" for shape, n in repeated)
+                + "\nAll SQL:\n"
+                + "\n".join(f"  {i}. {q[:400]}" for i, q in enumerate(sql[:50], start=1))
+            )
+
+    # -----------------------------
+    # Tests
+    # -----------------------------
+    def test_budget_file_covers_every_url(self):
+        names = {p.name for p in (*dashboard_urls.urlpatterns, *result_urls.urlpatterns)}
+        self.assertEqual(sorted(names - set(self.budgets["views"])), [], "URLs without a budget")
+        self.assertEqual(sorted(set(self.budgets["views"]) - names), [], "budgets for unknown URLs")
+
+    def prefill_pdf_cache(self):
+        """Cached PDFs of the (locked) fixture batch.
+
+        PDF views are budgeted on the path most requests take, the cache hit:
+        a render's time is WeasyPrint's, and its queries are budgeted by
+        test_pdf_contexts_within_budget.
+        """
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        batch = ResultBatch.objects.get(id=self.batch.id)
+        for name in (pdf_cache.RESULT_NOTIFICATION, pdf_cache.DMC_BATCH, pdf_cache.dmc_name(self.enrollment.id)):
+            pdf_cache.put(batch, name, b"%PDF-1.7 cached")
+
+    def test_views_within_budget(self):
+        """Roles listed in a budget's ``roles`` get the page; the others are redirected away."""
+        self.prefill_pdf_cache()
+        for pattern in (*dashboard_urls.urlpatterns, *result_urls.urlpatterns):
+            budget = self.budgets["views"][pattern.name]
+            url = self.url_for(pattern)
+            for role in ROLES:
+                with self.subTest(url=url, role=role):
+                    self.client.force_login(self.users[role])
+                    response, sql, elapsed_ms = self.measure(lambda: self.client.get(url))
+                    self.check_budget(f"{pattern.name} [{role}]", budget, sql, elapsed_ms, response.status_code)
+                    self.assertEqual(response.status_code, 200 if role in budget["roles"] else 302, url)
+
+    def test_pdf_contexts_within_budget(self):
+        """The database side of every PDF (context + HTML), independent of the renderer."""
+        batch = ResultBatch.objects.select_related("program", "session").get(id=self.batch.id)
+        sem_res = SemesterResult.objects.select_related("enrollment", "enrollment__student").get(
+            batch=batch, enrollment=self.enrollment
+        )
+        # Rendered to HTML too: lazy lookups in the templates count.
+        builders = {
+            "result_notification_context": lambda: render_to_string(
+                documents.RESULT_NOTIFICATION_TEMPLATE, documents.result_notification_context(batch)
+            ),
+            "dmc_single_context": lambda: render_to_string(
+                documents.DMC_TEMPLATE, documents.dmc_single_context(batch, sem_res)
+            ),
+            "dmc_batch_context": lambda: render_to_string(documents.DMC_TEMPLATE, documents.dmc_batch_context(batch)),
+        }
+        self.assertEqual(sorted(builders), sorted(self.budgets["documents"]))
+        for name, build in builders.items():
+            with self.subTest(name=name):
+                _, sql, elapsed_ms = self.measure(build)
+                self.check_budget(name, self.budgets["documents"][name], sql, elapsed_ms)
+
+
+class RequestTimingTests(TestCase):
+    """config.request_timing: Server-Timing header and the slow-request log line."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def view(self, n_queries, server_timing=None):
+        def get_response(request):
+            for _ in range(n_queries):
+                list(Department.objects.all())
+            response = HttpResponse("ok")
+            if server_timing:
+                response["Server-Timing"] = server_timing
+            return response
+
+        return RequestTimingMiddleware(get_response)
+
+    def test_server_timing_header(self):
+        response = self.view(3)(self.factory.get("/"))
+        self.assertRegex(response["Server-Timing"], r'^sql;dur=[\d.]+;desc="3 queries, 2 duplicates", view;dur=[\d.]+$')
+
+    def test_header_appended_to_view_timings(self):
+        response = self.view(1, server_timing='cache;desc="hit"')(self.factory.get("/"))
+        self.assertTrue(response["Server-Timing"].startswith('cache;desc="hit", sql;dur='))
+
+    @override_settings(REQUEST_SLOW_MS=0, REQUEST_SLOW_TOP_DUPLICATES=1)
+    def test_slow_request_logs_repeated_queries(self):
+        with self.assertLogs("portal.requests", "WARNING") as logs:
+            self.view(4)(self.factory.get("/some/path/"))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["event"], "slow_request")
+        self.assertEqual(record["path"], "/some/path/")
+        self.assertEqual((record["queries"], record["duplicates"]), (4, 3))
+        self.assertEqual(len(record["top_duplicates"]), 1)
+        self.assertEqual(record["top_duplicates"][0]["count"], 4)
+        self.assertIn("academics_department", record["top_duplicates"][0]["sql"])
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0, REQUEST_SLOW_MS=0)
+    def test_unsampled_request_untouched(self):
+        with self.assertNoLogs("portal.requests"):
+            response = self.view(2)(self.factory.get("/"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class KeysetPaginationTests(TestCase):
+    """dashboards.pagination: cursors walk ties in both directions; bad cursors give page one."""
+
+    PAGE_SIZE = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ties on the sort key: id decides the order within a name.
+        for i, name in enumerate(("Bilal", "Ali", "Bilal", "Bilal", "Ali", "Zara", "Bilal")):
+            Student.objects.create(name=name, father_name="Khan", registration_no=f"REG-{i}")
+        cls.ordered = list(Student.objects.order_by("name", "id").values_list("id", flat=True))
+
+    def page(self, url="?", queryset=None, ordering=("name",)):
+        request = RequestFactory().get(f"/students/{url}")
+        queryset = Student.objects.all() if queryset is None else queryset
+        return keyset_paginate(request, queryset, ordering, page_size=self.PAGE_SIZE)
+
+    def ids(self, page):
+        return [obj.id for obj in page]
+
+    def test_forward_and_backward_across_ties(self):
+        page = self.page()
+        self.assertFalse(page.has_previous)
+        seen = self.ids(page)
+        while page.has_next:
+            page = self.page(page.next_url)
+            self.assertTrue(page.has_previous)
+            seen += self.ids(page)
+        self.assertEqual(seen, self.ordered)
+        self.assertEqual(len(page), len(self.ordered) % self.PAGE_SIZE or self.PAGE_SIZE)
+
+        back = self.ids(page)
+        while page.has_previous:
+            page = self.page(page.previous_url)
+            self.assertTrue(page.has_next)
+            self.assertEqual(len(page), self.PAGE_SIZE)
+            back = self.ids(page) + back
+        self.assertEqual(back, self.ordered)
+        self.assertEqual(self.ids(page), self.ordered[: self.PAGE_SIZE])
+
+    def test_past_the_last_row(self):
+        last = Student.objects.get(id=self.ordered[-1])
+        page = self.page("?after=" + pagination._encode([last.name, last.id]))
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_next or page.has_previous)
+        self.assertIsNone(page.next_url)
+
+    def test_bad_cursor_gives_first_page(self):
+        first = self.ordered[: self.PAGE_SIZE]
+        for cursor in (
+            "not base64!",
+            "e30",  # {}
+            pagination._encode(["Ali"]),  # wrong length
+            pagination._encode(["Ali", "x"]),  # id not a number
+            pagination._encode(["Ali", None]),
+            pagination._encode([["Ali"], {"id": 1}]),
+        ):
+            for param in ("after", "before"):
+                with self.subTest(cursor=cursor, param=param):
+                    page = self.page(f"?{param}={cursor}")
+                    self.assertEqual(self.ids(page), first)
+                    self.assertFalse(page.has_previous)
+
+    def test_bad_date_cursor_gives_first_page(self):
+        program = Program.objects.create(name="B.Ed", total_semesters=4)
+        for year in (2022, 2023, 2024):
+            ResultBatch.objects.create(program=program, session=Session.objects.create(start_year=year), semester_number=1)
+        batches = ResultBatch.objects.all()
+        first = self.ids(self.page(queryset=batches, ordering=("-created_at",)))
+        page = self.page("?after=" + pagination._encode(["yesterday", 1]), batches, ("-created_at",))
+        self.assertEqual(self.ids(page), first)
+
+
+class DashboardCounterTests(TestCase):
+    """dashboards.counters stay equal to COUNT(*) through signals, imports and archiving."""
+
+    def setUp(self):
+        counters.reconcile()
+        self.program = Program.objects.create(name="B.Ed", total_semesters=4)
+        self.session = Session.objects.create(start_year=2019, is_active=False)
+        self.course = Course.objects.create(code="EDU-101", title="Course 1", credit_hours=3)
+
+    def assertCountsMatch(self):
+        self.assertEqual(
+            counters.get_counts(*counters.COUNTERS),
+            {name: queryset().count() for name, queryset in counters.COUNTERS.items()},
+        )
+
+    def enroll(self, i):
+        student = Student.objects.create(name=f"Student {i}", father_name="Khan", registration_no=f"REG-{i}")
+        return Enrollment.objects.create(student=student, program=self.program, session=self.session, roll_no=f"BD1519-{i}")
+
+    def test_signals_follow_inserts_and_deletes(self):
+        enrollments = [self.enroll(i) for i in range(3)]
+        batch = ResultBatch.objects.create(program=self.program, session=self.session, semester_number=1)
+        for enrollment in enrollments:
+            CourseResult.objects.create(batch=batch, enrollment=enrollment, course=self.course, marks_obtained=50)
+        self.assertCountsMatch()
+        self.assertEqual(counters.get_counts("students", "course_results"), {"students": 3, "course_results": 3})
+
+        batch.is_locked = True
+        batch.save()
+        self.assertEqual(counters.get_counts("locked_batches"), {"locked_batches": 1})
+        batch.is_locked = False
+        batch.save()
+        self.assertEqual(counters.get_counts("locked_batches"), {"locked_batches": 0})
+
+        CourseResult.objects.filter(enrollment__in=enrollments[:2]).delete()
+        enrollments[0].student.delete()  # cascades to its enrollment
+        self.assertCountsMatch()
+        self.assertEqual(counters.get_counts("enrollments", "course_results"), {"enrollments": 2, "course_results": 1})
+
+    def test_batched_writes_once_at_the_end(self):
+        with counters.batched():
+            for i in range(5):
+                self.enroll(i)
+            self.assertEqual(counters.get_counts("students", "enrollments"), {"students": 0, "enrollments": 0})
+        self.assertCountsMatch()
+
+        with CaptureQueriesContext(connection) as queries, counters.batched():
+            self.enroll(5)
+            self.enroll(6)
+        updates = [q["sql"] for q in queries.captured_queries if "dashboards_dashboardcounter" in q["sql"]]
+        self.assertEqual(len(updates), 2)  # students, enrollments: one UPDATE each
+        self.assertCountsMatch()
+
+    def test_batched_records_rows_written_before_an_error(self):
+        with self.assertRaises(RuntimeError), counters.batched():
+            self.enroll(1)
+            raise RuntimeError
+        self.assertCountsMatch()
+
+    def test_archiving_moves_course_results_out_of_the_count(self):
+        batch = ResultBatch.objects.create(program=self.program, session=self.session, semester_number=1)
+        for i in range(2):
+            CourseResult.objects.create(batch=batch, enrollment=self.enroll(i), course=self.course, marks_obtained=50)
+        self.assertEqual(counters.get_counts("course_results"), {"course_results": 2})
+
+        call_command("archive_results", "2019", stdout=StringIO())
+        self.assertEqual(counters.get_counts("course_results"), {"course_results": 0})
+        self.assertCountsMatch()
+
+        self.session.is_active = True
+        self.session.save()
+        call_command("archive_results", "2019", "--restore", stdout=StringIO())
+        self.assertEqual(counters.get_counts("course_results"), {"course_results": 2})
+        self.assertCountsMatch()
+
+    def test_reconcile_command_repairs_drift(self):
+        self.enroll(1)
+        DashboardCounter.objects.filter(name="students").update(value=99)
+        DashboardCounter.objects.filter(name="courses").delete()
+        out = StringIO()
+        call_command("reconcile_dashboard_counters", stdout=out)
+        self.assertIn("students: 99 -> 1", out.getvalue())
+        self.assertIn("courses: None -> 1", out.getvalue())
+        self.assertCountsMatch()
+
+
+class DepartmentContextTests(TestCase):
+    """dashboards.context_processors: departments are loaded lazily and cached per process."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("checker", password="x")
+        cls.science = Department.objects.create(name="Science")
+
+    def setUp(self):
+        # Process-local: start every test from an empty cache.
+        context_processors._departments = None
+        self.addCleanup(setattr, context_processors, "_departments", None)
+
+    def render(self, template):
+        request = RequestFactory().get("/")
+        request.user, request.session = self.user, SessionStore()
+        with CaptureQueriesContext(connection) as queries:
+            output = Template(template).render(Context(context_processors.role_flags(request)))
+        return output, [q["sql"] for q in queries.captured_queries if "academics_department" in q["sql"]]
+
+    def test_page_without_departments_runs_no_department_query(self):
+        output, sql = self.render("{{ is_system_admin }}")
+        self.assertEqual(output, "False")
+        self.assertEqual(sql, [])
+
+    def test_department_list_loaded_once(self):
+        output, sql = self.render("{% for d in departments %}{{ d.name }};{% endfor %}")
+        self.assertIn("Science;", output)
+        self.assertEqual(len(sql), 1)
+        output, sql = self.render("{% for d in departments %}{{ d.name }};{% endfor %}")
+        self.assertIn("Science;", output)
+        self.assertEqual(sql, [])
+
+    def names(self):
+        return [d.name for d in context_processors.cached_departments()]
+
+    def test_department_changes_update_the_list(self):
+        names = self.names
+        self.assertIn("Science", names())
+        Department.objects.create(name="Arts")
+        self.assertIn("Arts", names())
+        self.science.name = "Natural Sciences"
+        self.science.save()
+        self.assertIn("Natural Sciences", names())
+        self.assertNotIn("Science", names())
+        Department.objects.get(name="Arts").delete()
+        self.assertNotIn("Arts", names())
+
+    @override_settings(DEPARTMENT_CACHE_TTL=0)
+    def test_other_processes_reload_after_ttl(self):
+        self.assertIn("Science", self.names())
+        Department.objects.filter(id=self.science.id).update(name="Renamed")  # no signal: another process
+        time.sleep(0.01)
+        self.assertIn("Renamed", self.names())
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "roles"}})
+class RoleStampTests(TestCase):
+    """dashboards.roles: a revoked group never survives in a session's cached set."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("checker", password="x")
+        self.group = Group.objects.create(name=roles.RESULT_CHECKER)
+        self.user.groups.add(self.group)
+        self.session = SessionStore()
+
+    def groups(self):
+        request = RequestFactory().get("/")
+        request.user, request.session = self.user, self.session
+        return roles.user_groups(request)
+
+    def test_membership_change_invalidates_session(self):
+        self.assertEqual(self.groups(), {roles.RESULT_CHECKER})
+        self.user.groups.remove(self.group)
+        self.assertEqual(self.groups(), frozenset())
+
+    def test_lost_stamp_invalidates_session(self):
+        self.assertEqual(self.groups(), {roles.RESULT_CHECKER})
+        User.groups.through.objects.filter(user=self.user).delete()  # no signal
+        cache.delete(roles._user_version_key(self.user.pk))  # expired / evicted
+        self.assertEqual(self.groups(), frozenset())
+
+    def test_stamps_never_expire(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = "django.core.cache.backends.filebased.FileBasedCache"
+            with override_settings(CACHES={"default": {"BACKEND": backend, "LOCATION": location}}):
+                for _ in range(3):
+                    roles.invalidate_user(self.user.pk)
+                stamp = cache.get(roles._user_version_key(self.user.pk))
+                with mock.patch("django.core.cache.backends.filebased.time.time", return_value=time.time() + 86400):
+                    self.assertEqual(cache.get(roles._user_version_key(self.user.pk)), stamp)
+
+
+class AdminAutocompleteFilterTests(TestCase):
+    """dashboards.admin_filters: admin list filters search instead of listing every row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.courses = [
+            Course.objects.create(code=f"EDU-{i:03d}", title=f"Course {i}", credit_hours=3) for i in range(30)
+        ]
+        cls.admin = User.objects.create_superuser("admin", password="x")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_lists_only_the_selected_course(self):
+        changelist = reverse("admin:results_courseresult_changelist")
+        response = self.client.get(changelist)
+        self.assertContains(response, 'data-field-name="course"')
+        self.assertNotContains(response, "EDU-007")
+
+        response = self.client.get(f"{changelist}?course__id__exact={self.courses[7].id}")
+        self.assertContains(response, "EDU-007 - Course 7")
+        self.assertNotContains(response, "EDU-008")
+
+    def test_search_uses_admin_autocomplete(self):
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {"app_label": "results", "model_name": "courseresult", "field_name": "course", "term": "EDU-00"},
+        )
+        self.assertEqual(len(response.json()["results"]), 10)
+        # Filters on a related path search through the model that owns the field.
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {"app_label": "results", "model_name": "semesterresult", "field_name": "program", "term": "B"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "cascade"}})
+class FilterCascadeStampTests(TestCase):
+    """dashboards.filter_cascade never serves batch lists cached under a lost stamp."""
+
+    def test_lost_stamp_reloads_metadata(self):
+        program = Program.objects.create(name="B.Ed", total_semesters=4, department_id=get_default_department_id())
+        session = Session.objects.create(start_year=2024)
+        cache.clear()
+        self.assertEqual(filter_cascade.department_metadata("")["batches"], [])
+
+        # Written without signals, then the stamp expires / is evicted.
+        ResultBatch.objects.bulk_create([ResultBatch(program=program, session=session, semester_number=1)])
+        cache.delete(filter_cascade._VERSION_KEY)
+        self.assertEqual(len(filter_cascade.department_metadata("")["batches"]), 1)
+
+    def test_changes_invalidate(self):
+        program = Program.objects.create(name="B.Ed", total_semesters=4, department_id=get_default_department_id())
+        self.assertEqual(filter_cascade.department_metadata("")["batches"], [])
+        ResultBatch.objects.create(program=program, session=Session.objects.create(start_year=2024), semester_number=1)
+        self.assertEqual(len(filter_cascade.department_metadata("")["batches"]), 1)
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """config.db_router: which alias reads go to, and pinning after writes.
+
+    The router only names aliases, so a configured replica is simulated and
+    no query runs against it.
+    """
+
+    databases = {"default"}
+
+    def setUp(self):
+        self.enterContext(mock.patch.object(db_router, "replica_configured", return_value=True))
+        self.router = db_router.ReplicaRouter()
+
+    def request(self, session=None):
+        request = RequestFactory().get("/")
+        request.session = session if session is not None else SessionBase()
+        return request
+
+    def reads(self, *models, session=None, before=None):
+        """Aliases a replica-reading view would read ``models`` from."""
+
+        @db_router.read_from_replica
+        def view(request):
+            if before:
+                before()
+            return [self.router.db_for_read(model) for model in models]
+
+        return view(self.request(session))
+
+    def test_only_decorated_views_read_from_replica(self):
+        self.assertEqual(self.router.db_for_read(ResultBatch), "default")
+        self.assertEqual(self.reads(ResultBatch, Student), ["replica", "replica"])
+
+    def test_primary_only_apps_never_read_from_replica(self):
+        self.assertEqual(self.reads(User, Group, session_models.Session), ["default"] * 3)
+
+    def test_reads_inside_atomic_block_stay_on_default(self):
+        with transaction.atomic():
+            self.assertEqual(self.reads(ResultBatch), ["default"])
+
+    def test_reads_after_a_write_stay_on_default(self):
+        middleware = db_router.ReplicaStickyMiddleware(
+            lambda request: self.reads(ResultBatch, before=lambda: self.router.db_for_write(ResultBatch))
+        )
+        self.assertEqual(middleware(self.request()), ["default"])
+
+    def test_session_pinned_to_default_after_write(self):
+        session = SessionBase()
+        write = db_router.ReplicaStickyMiddleware(lambda request: self.router.db_for_write(ResultBatch))
+        with override_settings(DB_REPLICA_STICKY_SECONDS=15):
+            write(self.request(session))
+        self.assertGreater(session[db_router.STICKY_SESSION_KEY], time.time())
+        self.assertEqual(self.reads(ResultBatch, session=session), ["default"])
+
+        session[db_router.STICKY_SESSION_KEY] = time.time() - 1  # expired
+        self.assertEqual(self.reads(ResultBatch, session=session), ["replica"])
+
+    def test_session_writes_do_not_pin(self):
+        session = SessionBase()
+        write = db_router.ReplicaStickyMiddleware(lambda request: self.router.db_for_write(session_models.Session))
+        write(self.request(session))
+        self.assertNotIn(db_router.STICKY_SESSION_KEY, session)
+
+    def test_migrations_only_on_default(self):
+        self.assertTrue(self.router.allow_migrate("default", "results"))
+        self.assertFalse(self.router.allow_migrate("replica", "results"))
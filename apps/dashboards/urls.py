@@ -2,6 +2,7 @@ from django.urls import path
 
 from dashboards.views import core
 from dashboards.views import import_views
+from dashboards.views import autocomplete_views
 
 
 from dashboards.views.course_views import (
@@ -82,6 +83,7 @@ from dashboards.views.result_notification_views import (
 
 from dashboards.views.dmc_views import (
     dmc_single,
+    document_filter_options,
 )
 
 urlpatterns = [
@@ -157,6 +159,10 @@ urlpatterns = [
     path("admin-dashboard/enrollments/<int:pk>/edit/", enrollment_update, name="admin_enrollment_edit"),
     path("admin-dashboard/enrollments/<int:pk>/delete/", enrollment_delete, name="admin_enrollment_delete"),
 
+    # System Admin — Autocomplete (JSON for AutocompleteSelect)
+    path("admin-dashboard/autocomplete/students/", autocomplete_views.student_autocomplete, name="autocomplete_students"),
+    path("admin-dashboard/autocomplete/courses/", autocomplete_views.course_autocomplete, name="autocomplete_courses"),
+
     # System Admin — Results
     path("admin-dashboard/result-batches/", batch_list, name="admin_batch_list"),
     path("admin-dashboard/result-batches/add/", batch_create, name="admin_batch_add"),
@@ -182,4 +188,10 @@ urlpatterns = [
         dmc_single,
         name="admin_dmc_single",
     ),
+
+    path(
+        "admin-dashboard/documents/filter-options/",
+        document_filter_options,
+        name="document_filter_options",
+    ),
 ]
@@ -0,0 +1,41 @@
+from django.db.models import Q
+from django.http import JsonResponse
+
+from academics.models import Course
+from students import search
+from students.models import Student
+from dashboards.decorators import group_required
+
+RESULT_LIMIT = 20
+
+
+@group_required("System Admin")
+def student_autocomplete(request):
+    """JSON for AutocompleteSelect: students by registration no prefix / ranked name words."""
+    q = (request.GET.get("q") or "").strip()
+    department_id = (request.GET.get("department") or "").strip()
+    if not department_id.isdigit():
+        department_id = None
+
+    ids = search.ranked_student_ids(q, RESULT_LIMIT, department_id=department_id)
+    by_id = Student.objects.in_bulk(ids)
+    results = [
+        {"id": pk, "text": f"{by_id[pk].name} ({by_id[pk].registration_no})"}
+        for pk in ids
+        if pk in by_id
+    ]
+    return JsonResponse({"results": results})
+
+
+@group_required("System Admin")
+def course_autocomplete(request):
+    """JSON for AutocompleteSelect: courses by code prefix or title."""
+    q = (request.GET.get("q") or "").strip()
+    results = []
+    if q:
+        courses = (
+            Course.objects.filter(Q(code__istartswith=q) | Q(title__icontains=q))
+            .order_by("code")[:RESULT_LIMIT]
+        )
+        results = [{"id": c.id, "text": str(c)} for c in courses]
+    return JsonResponse({"results": results})
@@ -9,16 +9,20 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.files.storage import FileSystemStorage
 from django.db import transaction
-from django.db.models import Count
+from django.db.models import Exists, OuterRef
 from django.shortcuts import redirect, render
 from django.http import HttpResponse
 
 from academics.models import Course, Program, Session
+from results import bulk
 from results.models import CourseResult, ResultBatch
 from results.services import recompute_batch
 from students.models import Enrollment, Student
 
+from config.db_router import read_from_replica
+from dashboards import counters
 from dashboards.decorators import group_required
+from dashboards.roles import dashboard_url_name
 
 
 # ======================================================
@@ -44,23 +48,9 @@ def dashboard(request):
     """Route the logged-in user to the correct dashboard.
     System Admin ALWAYS has priority.
     """
-    user = request.user
-
-    # Highest priority: System Admin
-    if user.is_superuser or user.groups.filter(name="System Admin").exists():
-        return redirect("dash_system_admin")
-
-    if user.groups.filter(name="Controller").exists():
-        return redirect("dash_controller")
-
-    if user.groups.filter(name="Data Entry").exists():
-        return redirect("dash_data_entry")
-
-    if user.groups.filter(name="Document Generator").exists():
-        return redirect("dash_document_generator")
-
-    if user.groups.filter(name="Result Checker").exists():
-        return redirect("dash_result_checker")
+    url_name = dashboard_url_name(request)
+    if url_name:
+        return redirect(url_name)
 
     return render(request, "dashboards/no_group.html")
 
@@ -75,24 +65,16 @@ def controller_dashboard(request):
 
 
 @group_required("Data Entry")
+@read_from_replica
 def data_entry_dashboard(request):
     """Data Entry dashboard with quick stats and pending batches."""
-    unlocked_batches = ResultBatch.objects.filter(is_locked=False).count()
-    locked_batches = ResultBatch.objects.filter(is_locked=True).count()
-
-    totals = {
-        "students": Student.objects.count(),
-        "enrollments": Enrollment.objects.count(),
-        "batches": ResultBatch.objects.count(),
-        "course_results": CourseResult.objects.count(),
-        "unlocked_batches": unlocked_batches,
-        "locked_batches": locked_batches,
-    }
+    totals = counters.get_counts("students", "enrollments", "batches", "course_results", "locked_batches")
+    totals["unlocked_batches"] = totals["batches"] - totals["locked_batches"]
 
+    # Unlocked batches without any marks yet (NOT EXISTS uses the batch_id index)
     todo_batches = (
-        ResultBatch.objects.filter(is_locked=False)
-        .annotate(cr_count=Count("course_results"))
-        .filter(cr_count=0)
+        ResultBatch.objects.filter(is_locked=False, is_archived=False)
+        .filter(~Exists(CourseResult.objects.filter(batch=OuterRef("pk"))))
         .select_related("program", "session")
         .order_by("-created_at")[:8]
     )
@@ -115,17 +97,12 @@ def result_checker_dashboard(request):
 
 
 @group_required("System Admin")
+@read_from_replica
 def system_admin_dashboard(request):
     """System Admin dashboard: replacement for Django Admin home."""
-    totals = {
-        "programs": Program.objects.count(),
-        "courses": Course.objects.count(),
-        "sessions": Session.objects.count(),
-        "students": Student.objects.count(),
-        "enrollments": Enrollment.objects.count(),
-        "batches": ResultBatch.objects.count(),
-        "course_results": CourseResult.objects.count(),
-    }
+    totals = counters.get_counts(
+        "programs", "courses", "sessions", "students", "enrollments", "batches", "course_results"
+    )
     return render(request, "dashboards/system_admin.html", {"totals": totals})
 
 
@@ -146,6 +123,7 @@ def _to_float_or_zero(v):
 
 @group_required("Data Entry")
 @transaction.atomic
+@counters.batched()
 def data_entry_import_marks(request):
     """Upload Excel (.xlsx) file and import marks."""
     if request.method != "POST":
@@ -173,6 +151,7 @@ def data_entry_import_marks(request):
     created = 0
     updated = 0
     errors: list[str] = []
+    rows: list[CourseResult] = []
     touched_batches: dict[tuple[int, int, int, str], ResultBatch] = {}
 
     try:
@@ -274,33 +253,45 @@ def data_entry_import_marks(request):
                     errors.append(f"Row {row_num}: batch locked")
                     continue
 
+                if batch.is_archived:
+                    errors.append(f"Row {row_num}: batch archived (restore its session first)")
+                    continue
+
                 total = (
                     _to_float_or_zero(row[ses_i] if ses_i is not None else 0)
                     + _to_float_or_zero(row[mid_i] if mid_i is not None else 0)
                     + _to_float_or_zero(terminal)
                 )
 
-                cr, created_flag = CourseResult.objects.get_or_create(
-                    batch=batch,
-                    enrollment=enrollment,
-                    course=course,
-                    defaults={
-                        "marks_obtained": total,
-                        "max_marks": float(max_marks),
-                    },
+                rows.append(
+                    CourseResult(
+                        batch=batch,
+                        enrollment=enrollment,
+                        course=course,
+                        marks_obtained=total,
+                        max_marks=float(max_marks),
+                        **batch.cohort_fields(),
+                    )
                 )
 
-                if not created_flag:
-                    cr.marks_obtained = total
-                    cr.max_marks = float(max_marks)
-                    cr.save(update_fields=["marks_obtained", "max_marks"])
-                    updated += 1
-                else:
-                    created += 1
-
             except Exception as e:
                 errors.append(f"Row {row_num}: {e}")
 
+        # One upsert for the whole file; created = rows the touched batches gained.
+        existing = CourseResult.objects.filter(batch__in=list(touched_batches.values()))
+        before = existing.count()
+        bulk.upsert(
+            CourseResult,
+            rows,
+            unique_fields=["batch", "enrollment", "course"],
+            update_fields=["marks_obtained", "max_marks"],
+        )
+        created = existing.count() - before
+        updated = len(rows) - created
+        counters.add("course_results", created)
+
+        ResultBatch.bump_data_version(b.id for b in touched_batches.values())
+
         if recompute:
             for batch in touched_batches.values():
                 recompute_batch(batch)
@@ -6,6 +6,7 @@ from academics.models import Course
 from academics.forms import CourseForm
 
 from dashboards.decorators import group_required
+from dashboards.pagination import keyset_paginate
 
 
 # ======================================================
@@ -17,7 +18,7 @@ def course_list(request):
     """
     List all courses.
     """
-    courses = Course.objects.all().order_by("code")
+    courses = keyset_paginate(request, Course.objects.all(), ("code",))
     return render(
         request,
         "dashboards/courses/course_list.html",
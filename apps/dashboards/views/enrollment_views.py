@@ -2,10 +2,11 @@ from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect, render
 from django.db import IntegrityError
 
+from students import search
 from students.models import Enrollment
 from academics.models import Program, Session
-from django.db.models import Q
 from dashboards.decorators import group_required
+from dashboards.pagination import keyset_paginate
 from dashboards.forms import EnrollmentForm
 
 
@@ -18,7 +19,7 @@ def enrollment_list(request):
     enrollments = (
         Enrollment.objects.select_related("student", "program", "session")
         .all()
-        .order_by("-session__start_year", "program__name", "roll_no")
+        .order_by("-session__start_year", "program__name", "roll_sort_key")
     )
 
     if program_id:
@@ -27,11 +28,9 @@ def enrollment_list(request):
         enrollments = enrollments.filter(session_id=session_id)
 
     if q:
-        enrollments = enrollments.filter(
-            Q(roll_no__icontains=q)
-            | Q(student__registration_no__icontains=q)
-            | Q(student__name__icontains=q)
-        )
+        enrollments = search.filter_enrollments(enrollments, q)
+
+    enrollments = keyset_paginate(request, enrollments, ("-session__start_year", "program__name", "roll_sort_key"))
 
     programs = Program.objects.all().order_by("name")
     sessions = Session.objects.all().order_by("-start_year")
@@ -98,7 +97,12 @@ def enrollment_update(request, pk):
 def enrollment_delete(request, pk):
     enrollment = get_object_or_404(Enrollment, pk=pk)
 
-    delete_blocked = enrollment.course_results.exists() or enrollment.semester_results.exists()
+    delete_blocked = (
+        enrollment.course_results.exists()
+        or enrollment.semester_results.exists()
+        or enrollment.archived_course_results.exists()
+        or enrollment.archived_semester_results.exists()
+    )
 
     if request.method == "POST":
         if delete_blocked:
@@ -12,7 +12,9 @@ from django.http import HttpResponse
 from django.shortcuts import redirect, render
 
 from academics.models import Course, Program, Session, Department, ProgramCourse
+from students import search
 from students.models import Student, Enrollment
+from dashboards import counters
 from dashboards.decorators import group_required
 
 
@@ -124,6 +126,7 @@ def template_program_courses(request):
 @group_required("System Admin")
 @transaction.atomic
 @group_required("System Admin")
+@counters.batched()
 def import_courses(request):
     """
     Import Courses from Excel (.xlsx).
@@ -219,7 +222,7 @@ def import_courses(request):
         updated = 0
         with transaction.atomic():
             for code, title, credit_hours in cleaned:
-                obj = Course.objects.filter(code__iexact=code).first()
+                obj = Course.objects.filter(code__lower=code.lower()).first()
                 if obj:
                     obj.code = code  # normalize casing
                     obj.title = title
@@ -246,6 +249,8 @@ def import_courses(request):
 
 @group_required("System Admin")
 @transaction.atomic
+@counters.batched()
+@search.batched()
 def import_students(request):
     if request.method != "POST":
         return render(request, "dashboards/imports/students_import.html")
@@ -298,7 +303,7 @@ def import_students(request):
                 errors.append(f"Row {row_num}: missing required values")
                 continue
 
-            obj = Student.objects.filter(registration_no__iexact=registration_no).first()
+            obj = Student.objects.filter(registration_no__lower=registration_no.lower()).first()
             if obj:
                 obj.name = name
                 obj.father_name = father_name
@@ -335,6 +340,8 @@ def import_students(request):
 
 @group_required("System Admin")
 @transaction.atomic
+@counters.batched()
+@search.batched()
 def import_enrollments(request):
     if request.method != "POST":
         return render(request, "dashboards/imports/enrollments_import.html")
@@ -395,7 +402,7 @@ def import_enrollments(request):
                 errors.append(f"Row {row_num}: invalid session year '{session_year}'")
                 continue
 
-            student = Student.objects.filter(registration_no__iexact=registration_no).first()
+            student = Student.objects.filter(registration_no__lower=registration_no.lower()).first()
             if not student:
                 errors.append(f"Row {row_num}: student not found ({registration_no})")
                 continue
@@ -453,6 +460,7 @@ def import_enrollments(request):
 
 @group_required("System Admin")
 @transaction.atomic
+@counters.batched()
 def import_program_courses(request):
     """
     Import ProgramCourse mappings from Excel (.xlsx).
@@ -546,7 +554,7 @@ def import_program_courses(request):
                 validation_errors.append(f"Row {i}: invalid semester_number '{sem_raw}'.")
                 continue
 
-            course = Course.objects.filter(code__iexact=course_code).first()
+            course = Course.objects.filter(code__lower=course_code.lower()).first()
             if not course:
                 validation_errors.append(f"Row {i}: course not found by code ('{course_code}').")
                 continue
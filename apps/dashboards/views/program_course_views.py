@@ -4,6 +4,7 @@ from django.db import IntegrityError
 
 from academics.models import ProgramCourse, Program
 from dashboards.decorators import group_required
+from dashboards.pagination import keyset_paginate
 from dashboards.forms import ProgramCourseForm
 
 
@@ -19,10 +20,12 @@ def program_course_list(request):
 
     programs = Program.objects.all().order_by("name")
 
+    items = keyset_paginate(request, qs, ("program__name", "semester_number", "course__code"))
+
     return render(
         request,
         "dashboards/program_courses/list.html",
-        {"items": qs, "program_id": program_id, "programs": programs},
+        {"items": items, "program_id": program_id, "programs": programs},
     )
 
     # Optional filters
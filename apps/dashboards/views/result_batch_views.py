@@ -3,7 +3,9 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.db import IntegrityError
 
 from dashboards.decorators import group_required
+from dashboards.pagination import keyset_paginate
 from dashboards.forms import ResultBatchForm
+from results import archive
 from results.models import ResultBatch
 from academics.models import Program, Session, Semester
 
@@ -15,7 +17,7 @@ def batch_list(request):
     semester_no = (request.GET.get("semester") or "").strip()
 
     base = ResultBatch.objects.select_related("program", "session").all()
-    batches = base.order_by("-created_at")
+    batches = base.select_related("pdf_pregeneration").order_by("-created_at")
 
     if program_id:
         batches = batches.filter(program_id=program_id)
@@ -41,7 +43,7 @@ def batch_list(request):
         session_id = ""
         semester_no = ""
         # also reset batches filter
-        batches = base.order_by("-created_at")
+        batches = base.select_related("pdf_pregeneration").order_by("-created_at")
         if program_id:
             batches = batches.filter(program_id=program_id)
 
@@ -54,6 +56,8 @@ def batch_list(request):
         base_for_semesters.values_list("semester_number", flat=True).distinct().order_by("semester_number")
     )
 
+    batches = keyset_paginate(request, batches, ("-created_at",))
+
     return render(
         request,
         "dashboards/result_batches/list.html",
@@ -117,7 +121,7 @@ def batch_update(request, pk):
 def batch_delete(request, pk):
     batch = get_object_or_404(ResultBatch, pk=pk)
 
-    delete_blocked = batch.course_results.exists() or batch.semester_results.exists()
+    delete_blocked = archive.course_results(batch).exists() or archive.semester_results(batch).exists()
 
     if request.method == "POST":
         if delete_blocked:
@@ -137,7 +141,9 @@ def batch_delete(request, pk):
 
 @group_required("System Admin")
 def batch_detail(request, pk):
-    batch = get_object_or_404(ResultBatch, pk=pk)
+    batch = get_object_or_404(
+        ResultBatch.objects.select_related("program", "session", "pdf_pregeneration"), pk=pk
+    )
     return render(
         request,
         "dashboards/result_batches/detail.html",
@@ -4,6 +4,7 @@ from django.db import IntegrityError
 
 from academics.models import Semester, Program, Session
 from dashboards.decorators import group_required
+from dashboards.pagination import keyset_paginate
 from dashboards.forms import SemesterForm
 
 
@@ -21,6 +22,8 @@ def semester_list(request):
     if session_id:
         semesters = semesters.filter(session_id=session_id)
 
+    semesters = keyset_paginate(request, semesters, ("-session__start_year", "program__name", "number"))
+
     programs = Program.objects.all().order_by("name")
     sessions = Session.objects.all().order_by("-start_year")
 
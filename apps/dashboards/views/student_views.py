@@ -2,10 +2,11 @@ from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect, render
 from django.db import IntegrityError
 
-from students.models import Student
+from students import search
+from students.models import Student, enrolled_in
 from academics.models import Department, Program, Session
-from django.db.models import Q
 from dashboards.decorators import group_required
+from dashboards.pagination import keyset_paginate
 from dashboards.forms import StudentForm
 
 
@@ -23,15 +24,13 @@ def student_list(request):
         students = students.filter(department_id=department_id)
 
     # Program/Session filters work through enrollments
-    if program_id:
-        students = students.filter(enrollments__program_id=program_id)
-    if session_id:
-        students = students.filter(enrollments__session_id=session_id)
+    if program_id or session_id:
+        students = students.filter(enrolled_in(program_id, session_id))
 
     if q:
-        students = students.filter(Q(registration_no__icontains=q) | Q(name__icontains=q))
+        students = search.filter_students(students, q)
 
-    students = students.distinct()
+    students = keyset_paginate(request, students, ("name",))
 
     departments = Department.objects.all().order_by("name")
     programs = Program.objects.all().order_by("name")
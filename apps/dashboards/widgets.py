@@ -0,0 +1,47 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """A <select> that only renders the chosen option; others are searched via JSON.
+
+    ``url`` returns ``{"results": [{"id": ..., "text": ...}]}`` for ``?q=``.
+    ``forward`` names other form fields whose values are sent along (e.g.
+    ``department``) so the endpoint can narrow its results.
+    """
+
+    template_name = "dashboards/widgets/autocomplete_select.html"
+
+    class Media:
+        js = ("js/autocomplete.js",)
+
+    def __init__(self, url: str, forward=(), attrs=None):
+        super().__init__(attrs)
+        self.url = url
+        self.forward = tuple(forward)
+
+    def optgroups(self, name, value, attrs=None):
+        # Render only the selected object(s) instead of every row of the table.
+        selected = [v for v in value if v not in ("", None)]
+        queryset = getattr(self.choices, "queryset", None)
+        if queryset is None:
+            return super().optgroups(name, value, attrs)
+
+        groups = [(None, [self.create_option(name, "", self.choices.field.empty_label or "", not selected, 0)], 0)]
+        try:
+            objects = list(queryset.filter(pk__in=selected)) if selected else []
+        except (ValueError, ValidationError):
+            objects = []  # invalid submitted value; the form shows the error
+        if objects:
+            for index, obj in enumerate(objects, start=1):
+                option_value = self.choices.field.prepare_value(obj)
+                label = self.choices.field.label_from_instance(obj)
+                groups.append((None, [self.create_option(name, option_value, label, True, index)], index))
+        return groups
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["autocomplete_url"] = reverse(self.url)
+        context["widget"]["forward"] = ",".join(self.forward)
+        return context
@@ -1,21 +1,35 @@
-from decimal import Decimal, ROUND_HALF_UP
-
 from django.contrib import admin
-from django.db.models import Sum
 from django.urls import reverse
 from django.utils.html import format_html
 
-from .models import ResultBatch, CourseResult, SemesterResult, GradeScale
+from dashboards.admin_filters import AutocompleteListFilter
+
+from .models import ResultBatch, CourseResult, SemesterResult, ReappearSubject, GradeScale
 
 
 # -------------------------------------------------
 # Helpers
 # -------------------------------------------------
-Q2 = Decimal("0.01")
+# Related rows used by the __str__ of batch / enrollment / course columns.
+BATCH_RELATED = ("batch__program", "batch__session")
+ENROLLMENT_RELATED = ("enrollment__program", "enrollment__session")
+
 
+class BumpsBatchVersionMixin:
+    """Admin edits to batch rows change printed documents (ETag / PDF cache)."""
 
-def q2(x):
-    return Decimal(x).quantize(Q2, rounding=ROUND_HALF_UP)
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        ResultBatch.bump_data_version([obj.batch_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ResultBatch.bump_data_version([obj.batch_id])
+
+    def delete_queryset(self, request, queryset):
+        batch_ids = set(queryset.values_list("batch_id", flat=True))
+        super().delete_queryset(request, queryset)
+        ResultBatch.bump_data_version(batch_ids)
 
 
 # -------------------------------------------------
@@ -29,20 +43,23 @@ class ResultBatchAdmin(admin.ModelAdmin):
         "semester_number",
         "result_type",
         "is_locked",
+        "is_archived",
         "notification_no",
         "notification_date",
         "created_at",
         "notification_pdf",  # ✅ added
     )
     list_filter = (
-        "program",
-        "session",
+        ("program", AutocompleteListFilter),
+        ("session", AutocompleteListFilter),
         "semester_number",
         "result_type",
         "is_locked",
+        "is_archived",
     )
     search_fields = ("notification_no",)
     ordering = ("-created_at",)
+    list_select_related = ("program", "session")
 
     def notification_pdf(self, obj):
         """
@@ -67,7 +84,7 @@ class ResultBatchAdmin(admin.ModelAdmin):
 # Course Result
 # -------------------------------------------------
 @admin.register(CourseResult)
-class CourseResultAdmin(admin.ModelAdmin):
+class CourseResultAdmin(BumpsBatchVersionMixin, admin.ModelAdmin):
     list_display = (
         "batch",
         "enrollment",
@@ -79,11 +96,11 @@ class CourseResultAdmin(admin.ModelAdmin):
         "grade_point",
     )
     list_filter = (
-        "batch__program",
-        "batch__session",
-        "batch__semester_number",
+        ("program", AutocompleteListFilter),
+        ("session", AutocompleteListFilter),
+        "semester_number",
         "batch__result_type",
-        "course",
+        ("course", AutocompleteListFilter),
     )
     search_fields = (
         "enrollment__roll_no",
@@ -91,13 +108,15 @@ class CourseResultAdmin(admin.ModelAdmin):
         "course__title",
         "course__code",
     )
+    autocomplete_fields = ("enrollment", "course")
+    list_select_related = (*BATCH_RELATED, *ENROLLMENT_RELATED, "course")
 
 
 # -------------------------------------------------
 # Semester Result (MAIN FOCUS)
 # -------------------------------------------------
 @admin.register(SemesterResult)
-class SemesterResultAdmin(admin.ModelAdmin):
+class SemesterResultAdmin(BumpsBatchVersionMixin, admin.ModelAdmin):
     list_display = (
         "batch",
         "enrollment",
@@ -111,9 +130,9 @@ class SemesterResultAdmin(admin.ModelAdmin):
     )
 
     list_filter = (
-        "batch__program",
-        "batch__session",
-        "batch__semester_number",
+        ("program", AutocompleteListFilter),
+        ("session", AutocompleteListFilter),
+        "semester_number",
         "batch__result_type",
     )
 
@@ -121,44 +140,49 @@ class SemesterResultAdmin(admin.ModelAdmin):
         "enrollment__roll_no",
         "enrollment__student__registration_no",
     )
+    autocomplete_fields = ("enrollment",)
+    list_select_related = (*BATCH_RELATED, *ENROLLMENT_RELATED)
 
     # -----------------------------
-    # Computed columns
+    # Stored totals (kept up to date by recompute_batch)
     # -----------------------------
     def total_obtained(self, obj):
-        val = (
-            CourseResult.objects.filter(
-                batch=obj.batch,
-                enrollment=obj.enrollment,
-            )
-            .aggregate(total=Sum("marks_obtained"))
-            .get("total")
-        )
-        return q2(val or 0)
+        return obj.total_obtained
 
     total_obtained.short_description = "Total Obtained"
+    total_obtained.admin_order_field = "total_obtained"
 
     def total_marks(self, obj):
-        val = (
-            CourseResult.objects.filter(
-                batch=obj.batch,
-                enrollment=obj.enrollment,
-            )
-            .aggregate(total=Sum("max_marks"))
-            .get("total")
-        )
-        return q2(val or 0)
+        return obj.total_max
 
     total_marks.short_description = "Total Marks"
+    total_marks.admin_order_field = "total_max"
 
     def percentage(self, obj):
-        obtained = self.total_obtained(obj)
-        maximum = self.total_marks(obj)
-        if maximum > 0:
-            return q2((obtained / maximum) * 100)
-        return Decimal("0.00")
+        return obj.percentage
 
     percentage.short_description = "Percentage (%)"
+    percentage.admin_order_field = "percentage"
+
+
+# -------------------------------------------------
+# Reappear Subjects (written by recompute_batch)
+# -------------------------------------------------
+@admin.register(ReappearSubject)
+class ReappearSubjectAdmin(admin.ModelAdmin):
+    list_display = ("semester_result", "course")
+    list_filter = (
+        ("semester_result__program", AutocompleteListFilter),
+        ("semester_result__session", AutocompleteListFilter),
+        "semester_result__semester_number",
+        ("course", AutocompleteListFilter),
+    )
+    search_fields = (
+        "semester_result__enrollment__roll_no",
+        "semester_result__enrollment__student__registration_no",
+        "course__code",
+    )
+    list_select_related = ("semester_result__batch", "semester_result__enrollment", "course")
 
 
 # -------------------------------------------------
@@ -0,0 +1,118 @@
+"""Archive tables for the results of inactive sessions.
+
+Day-to-day work (imports, recompute, pickers, CGPA) concerns active sessions,
+so ``manage.py archive_results`` moves the CourseResult / SemesterResult /
+ReappearSubject rows of inactive sessions' batches into ``Archived*`` tables
+with the same columns and ids, and flags the batches ``is_archived``. The hot
+tables keep only current cohorts.
+
+Readers of a single batch's results (DMCs, result notifications, the student
+picker) get their querysets from :func:`course_results` /
+:func:`semester_results` (or the ``*_model`` functions), which pick the table
+from the batch flag, so old students' documents print exactly as before. All batches of a session move
+together, so a student's GPA history is always in one table.
+"""
+
+from __future__ import annotations
+
+from django.db import connection, transaction
+
+from .models import (
+    ArchivedCourseResult,
+    ArchivedReappearSubject,
+    ArchivedSemesterResult,
+    CourseResult,
+    ReappearSubject,
+    ResultBatch,
+    SemesterResult,
+)
+
+# (hot, archive) pairs, parents before children
+TABLES = (
+    (CourseResult, ArchivedCourseResult),
+    (SemesterResult, ArchivedSemesterResult),
+    (ReappearSubject, ArchivedReappearSubject),
+)
+
+
+def course_result_model(batch: ResultBatch):
+    """CourseResult or ArchivedCourseResult, wherever the batch's rows are."""
+    return ArchivedCourseResult if batch.is_archived else CourseResult
+
+
+def semester_result_model(batch: ResultBatch):
+    """SemesterResult or ArchivedSemesterResult, wherever the batch's rows are."""
+    return ArchivedSemesterResult if batch.is_archived else SemesterResult
+
+
+def course_results(batch: ResultBatch):
+    return course_result_model(batch).objects.filter(batch=batch)
+
+
+def semester_results(batch: ResultBatch):
+    return semester_result_model(batch).objects.filter(batch=batch)
+
+
+def batch_ids_with_results(**filters) -> set:
+    """Ids of the batches with semester results matching ``filters``, hot or archived."""
+    ids = set()
+    for model in (SemesterResult, ArchivedSemesterResult):
+        ids.update(model.objects.filter(**filters).values_list("batch_id", flat=True))
+    return ids
+
+
+def _rows_of(model, batch_ids):
+    if model in (ReappearSubject, ArchivedReappearSubject):
+        return model.objects.filter(semester_result__batch_id__in=batch_ids)
+    return model.objects.filter(batch_id__in=batch_ids)
+
+
+def _move(source, target, batch_ids) -> int:
+    """INSERT INTO target SELECT ... FROM source: the batches' rows, ids included."""
+    columns = [f.column for f in source._meta.concrete_fields]
+    select = _rows_of(source, batch_ids).values_list(*[f.attname for f in source._meta.concrete_fields])
+    select_sql, params = select.query.sql_with_params()
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(target._meta.db_table)} ({', '.join(qn(c) for c in columns)}) {select_sql}",
+            params,
+        )
+        return cursor.rowcount
+
+
+def _delete(model, batch_ids):
+    # No signals / cascades needed: children are deleted first.
+    ids_sql, params = _rows_of(model, batch_ids).values("pk").query.sql_with_params()
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {qn(model._meta.db_table)} WHERE {qn(model._meta.pk.column)} IN ({ids_sql})", params)
+
+
+def _transfer(batch_ids, archive: bool) -> dict:
+    moved = {}
+    pairs = TABLES if archive else [(target, source) for source, target in TABLES]
+    for source, target in pairs:
+        moved[source._meta.model_name] = _move(source, target, batch_ids)
+    for source, _ in reversed(pairs):
+        _delete(source, batch_ids)
+    ResultBatch.objects.filter(id__in=batch_ids).update(is_archived=archive)
+    return moved
+
+
+@transaction.atomic
+def archive_batches(batch_ids) -> dict:
+    """Move the batches' results into the archive tables; rows moved per hot model name."""
+    batch_ids = list(ResultBatch.objects.filter(id__in=list(batch_ids), is_archived=False).values_list("id", flat=True))
+    if not batch_ids:
+        return {}
+    return _transfer(batch_ids, archive=True)
+
+
+@transaction.atomic
+def restore_batches(batch_ids) -> dict:
+    """Move archived batches' results back into the hot tables; rows moved per archive model name."""
+    batch_ids = list(ResultBatch.objects.filter(id__in=list(batch_ids), is_archived=True).values_list("id", flat=True))
+    if not batch_ids:
+        return {}
+    return _transfer(batch_ids, archive=False)
@@ -0,0 +1,80 @@
+"""Bulk upsert (insert or update on a unique key) with the best strategy per backend.
+
+* PostgreSQL, SQLite >= 3.24: ``INSERT ... ON CONFLICT (key) DO UPDATE``;
+* MySQL / MariaDB: ``INSERT ... ON DUPLICATE KEY UPDATE``;
+* anything else: one SELECT of the existing keys, then ``bulk_update`` +
+  ``bulk_create``.
+
+Like ``bulk_create``, :func:`upsert` skips ``save()`` and signals: callers set
+derived columns (e.g. ``**batch.cohort_fields()``) and adjust dashboard counters
+themselves.
+"""
+
+from __future__ import annotations
+
+from django.db import connections, router
+
+BATCH_SIZE = 500
+
+
+def strategy(model) -> str:
+    """``"on_conflict"``, ``"on_duplicate_key"`` or ``"select"`` for ``model``'s database."""
+    features = connections[router.db_for_write(model)].features
+    if features.supports_update_conflicts_with_target:
+        return "on_conflict"
+    if features.supports_update_conflicts:
+        return "on_duplicate_key"
+    return "select"
+
+
+def _key(model, obj, unique_fields):
+    return tuple(getattr(obj, model._meta.get_field(name).attname) for name in unique_fields)
+
+
+def upsert(model, objs, unique_fields, update_fields, batch_size=BATCH_SIZE) -> None:
+    """Insert ``objs``, or update ``update_fields`` of the rows matching on ``unique_fields``.
+
+    ``unique_fields`` must be a unique constraint of ``model``. When several
+    objects share a key the last one wins, as with row-by-row saves.
+    """
+    # One row per key: ON CONFLICT may not touch the same row twice in a statement.
+    objs = list({_key(model, obj, unique_fields): obj for obj in objs}.values())
+    if not objs:
+        return
+
+    manager = model._default_manager
+    mode = strategy(model)
+    if mode == "on_conflict":
+        manager.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+        return
+    if mode == "on_duplicate_key":
+        manager.bulk_create(objs, batch_size=batch_size, update_conflicts=True, update_fields=update_fields)
+        return
+
+    # Existing rows are looked up by the first key column, then matched in memory.
+    first = model._meta.get_field(unique_fields[0]).attname
+    attnames = [model._meta.get_field(name).attname for name in unique_fields]
+    existing = {
+        tuple(row[:-1]): row[-1]
+        for row in manager.filter(**{f"{first}__in": {getattr(obj, first) for obj in objs}}).values_list(
+            *attnames, "pk"
+        )
+    }
+    to_update, to_create = [], []
+    for obj in objs:
+        pk = existing.get(_key(model, obj, unique_fields))
+        if pk is None:
+            to_create.append(obj)
+        else:
+            obj.pk = pk
+            to_update.append(obj)
+    if to_update:
+        manager.bulk_update(to_update, update_fields, batch_size=batch_size)
+    if to_create:
+        manager.bulk_create(to_create, batch_size=batch_size)
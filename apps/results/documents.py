@@ -0,0 +1,311 @@
+"""Context builders for the printable result documents.
+
+Shared by the PDF views and by background pre-generation (no request needed).
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from academics.models import ProgramCourse
+from . import archive
+from .models import ResultBatch, SemesterResult
+from .timing import PhaseTimer
+
+RESULT_NOTIFICATION_TEMPLATE = "results/result_notification.html"
+DMC_TEMPLATE = "results/dmc_batch.html"
+
+
+def course_columns_for_batch(batch: ResultBatch):
+    """Return ordered ProgramCourse rows for the batch, limited to courses that exist in the batch."""
+    batch_course_ids = list(
+        archive.course_results(batch)
+        .values_list("course_id", flat=True)
+        .distinct()
+    )
+
+    return (
+        ProgramCourse.objects.filter(
+            program=batch.program,
+            semester_number=batch.semester_number,
+            course_id__in=batch_course_ids,
+        )
+        .select_related("course")
+        .order_by("id")
+    )
+
+
+def build_gpa_history(enrollment_id: int, batch: ResultBatch):
+    """Return a list of (semester_number, gpa) up to the current semester.
+
+    If there are multiple batches for a semester (repeat/improved), the latest one (by batch.created_at)
+    is used.
+    """
+    try:
+        current_sem = int(batch.semester_number)
+    except Exception:
+        current_sem = 0
+
+    # A session's batches are archived together: this batch's table has them all.
+    qs = (
+        archive.semester_result_model(batch).objects.filter(
+            enrollment_id=enrollment_id,
+            program_id=batch.program_id,
+            session_id=batch.session_id,
+            semester_number__lte=current_sem,
+        )
+        .order_by("semester_number", "-batch__created_at")
+    )
+
+    picked = {}
+    for sr in qs:
+        sem = int(sr.semester_number)
+        if sem not in picked:
+            picked[sem] = sr
+
+    out = []
+    for sem in sorted(picked.keys()):
+        out.append((sem, picked[sem].gpa))
+    return out
+
+
+def _dmc_course_rows(ordered_course_ids, course_map):
+    """DMC subject rows in semester order (course_map: course_id -> CourseResult)."""
+    course_rows = []
+    for course_id in ordered_course_ids:
+        cr = course_map.get(course_id)
+        if not cr:
+            continue
+        ch = cr.course.credit_hours
+        gp_total = (cr.grade_point or 0) * ch
+        course_rows.append(
+            {
+                "title": cr.course.title,
+                "credit_hours": ch,
+                "marks_pct": cr.percentage,
+                "grade": cr.letter_grade,
+                "ng": cr.grade_point,
+                "gp_total": gp_total,
+            }
+        )
+
+    # Hard limit for print-fit: max 10 subjects per semester.
+    return course_rows[:10]
+
+
+# ======================================================
+# RESULT NOTIFICATION
+# ======================================================
+
+def _credit_hours_label(course, fallback=""):
+    """Credit hours for a column header (prefer course.credit_hours; fallback other fields)."""
+    ch = getattr(course, "credit_hours", "")
+    if ch in ("", None):
+        th = getattr(course, "theory_credit", None)
+        pr = getattr(course, "practical_credit", None)
+        if th is not None or pr is not None:
+            th = th or 0
+            pr = pr or 0
+            ch = f"{th} ({pr})" if pr else f"{th}"
+        else:
+            ch = fallback
+    return ch
+
+
+def result_notification_context(batch: ResultBatch, timer: PhaseTimer | None = None) -> dict:
+    timer = timer or PhaseTimer()
+
+    with timer.phase("query"):
+        # -------------------------------------------------
+        # 1) Find which courses actually appear in THIS batch
+        #    (so we don't show blank subject columns)
+        # -------------------------------------------------
+        batch_course_ids = list(
+            archive.course_results(batch)
+            .values_list("course_id", flat=True)
+            .distinct()
+        )
+
+        # -------------------------------------------------
+        # 2) Subjects, but ONLY those in batch_course_ids
+        # -------------------------------------------------
+        program_courses = list(
+            ProgramCourse.objects.filter(
+                program=batch.program,
+                semester_number=batch.semester_number,
+                course_id__in=batch_course_ids,
+            )
+            .select_related("course")
+            .order_by("id")
+        )
+
+        # Fallback: build columns from CourseResult itself (still only this batch)
+        distinct_courses = []
+        if not program_courses:
+            distinct_courses = list(
+                archive.course_results(batch)
+                .select_related("course")
+                .order_by("course__title")
+            )
+
+        # -------------------------------------------------
+        # 3) Student rows (one per enrollment)
+        #    Natural roll order: BD1524-1, BD1524-2, ... BD1524-10
+        # -------------------------------------------------
+        results = list(
+            archive.semester_results(batch)
+            .select_related("enrollment", "enrollment__student")
+            .order_by("enrollment__roll_sort_key", "enrollment__roll_no")
+        )
+
+        grade_rows = list(
+            archive.course_results(batch)
+            .values_list("enrollment_id", "course_id", "letter_grade")
+        )
+
+    with timer.phase("rows"):
+        columns = []
+        if program_courses:
+            for pc in program_courses:
+                course = pc.course
+                columns.append(
+                    {
+                        "course_id": pc.course_id,
+                        "title": getattr(course, "title", str(course)),
+                        "credit_hours": _credit_hours_label(course, getattr(pc, "credit_hours", "")),
+                    }
+                )
+        else:
+            seen = set()
+            for cr in distinct_courses:
+                if cr.course_id in seen:
+                    continue
+                seen.add(cr.course_id)
+
+                course = cr.course
+                columns.append(
+                    {
+                        "course_id": cr.course_id,
+                        "title": getattr(course, "title", str(course)),
+                        "credit_hours": _credit_hours_label(course),
+                    }
+                )
+
+        # -------------------------------------------------
+        # 4) grades_map[enrollment_id][course_id] = letter_grade
+        # -------------------------------------------------
+        grades_map = defaultdict(dict)
+        for enrollment_id, course_id, letter_grade in grade_rows:
+            grades_map[enrollment_id][course_id] = (letter_grade or "")
+
+        session_display = batch.session.display_for_program(batch.program)
+
+        # -------------------------------------------------
+        # 5) Hide CGPA when semester is 1
+        # -------------------------------------------------
+        try:
+            sem_no = int(batch.semester_number)
+        except Exception:
+            sem_no = 0
+
+        show_cgpa = (sem_no != 1)
+
+        # -------------------------------------------------
+        # 6) Result type label for header
+        #    UI wants: Regular OR Reappeared/Improved
+        # -------------------------------------------------
+        result_type_label = "Regular" if batch.result_type == "regular" else "Reappeared/Improved"
+
+    return {
+        "batch": batch,
+        "results": results,
+        "columns": columns,
+        "grades_map": grades_map,
+        "session_display": session_display,
+        "show_cgpa": show_cgpa,
+        "result_type_label": result_type_label,
+    }
+
+
+# ======================================================
+# DMCs
+# ======================================================
+
+def dmc_single_context(batch: ResultBatch, sem_res: SemesterResult, timer: PhaseTimer | None = None) -> dict:
+    """Context for a single-student DMC (one DMC per student per semester/batch)."""
+    timer = timer or PhaseTimer()
+
+    with timer.phase("query"):
+        columns = list(course_columns_for_batch(batch))
+        course_results = list(
+            archive.course_results(batch).filter(enrollment_id=sem_res.enrollment_id)
+            .select_related("course")
+        )
+
+    with timer.phase("rows"):
+        course_map = {cr.course_id: cr for cr in course_results}
+
+        # DMC layout is optimized for a strict maximum of 10 subjects.
+        course_rows = _dmc_course_rows([pc.course_id for pc in columns], course_map)
+
+    # NOTE: DMC footer must show ONLY current semester GPA, and CGPA label as "CGPA".
+    # CGPA logic remains "up to this semester" (SemesterResult.cgpa).
+    return {
+        "batch": batch,
+        "session_display": batch.session.display_for_program(batch.program),
+        "dmcs": [
+            {
+                "enrollment": sem_res.enrollment,
+                "student": sem_res.enrollment.student,
+                "semester_result": sem_res,
+                "course_rows": course_rows,
+            }
+        ],
+    }
+
+
+def dmc_batch_context(batch: ResultBatch, timer: PhaseTimer | None = None) -> dict:
+    """Context for a multi-page DMC document (one page per student) for a batch."""
+    timer = timer or PhaseTimer()
+
+    with timer.phase("query"):
+        # Courses/ordering for this semester
+        columns = list(course_columns_for_batch(batch))
+
+        # Natural sort of roll numbers
+        results = list(
+            archive.semester_results(batch)
+            .select_related("enrollment", "enrollment__student")
+            .order_by("enrollment__roll_sort_key", "enrollment__roll_no")
+        )
+
+        # Pull all course results for batch in one go
+        course_results = list(
+            archive.course_results(batch)
+            .select_related("course")
+            .order_by("id")
+        )
+
+    with timer.phase("rows"):
+        ordered_course_ids = [pc.course_id for pc in columns]
+
+        cr_map = defaultdict(dict)  # cr_map[enrollment_id][course_id] = CourseResult
+        for cr in course_results:
+            cr_map[cr.enrollment_id][cr.course_id] = cr
+
+        dmcs = []
+        for sr in results:
+            dmcs.append(
+                {
+                    "enrollment": sr.enrollment,
+                    "student": sr.enrollment.student,
+                    "semester_result": sr,
+                    "course_rows": _dmc_course_rows(ordered_course_ids, cr_map.get(sr.enrollment_id, {})),
+                }
+            )
+
+    return {
+        "batch": batch,
+        "session_display": batch.session.display_for_program(batch.program),
+        "dmcs": dmcs,
+    }
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from academics.models import Session
+from dashboards import counters
+from results import archive
+from results.models import ResultBatch
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the results of inactive sessions into the archive tables (DMCs and notifications "
+        "keep working). --restore moves a session's results back, e.g. after reactivating it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("sessions", nargs="*", type=int, help="Session start years (default: all inactive sessions)")
+        parser.add_argument("--restore", action="store_true", help="Move the given sessions' results back")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the batches that would move")
+
+    def handle(self, *args, **options):
+        years = options["sessions"]
+        restore = options["restore"]
+        if restore and not years:
+            raise CommandError("--restore needs session years.")
+
+        sessions = Session.objects.all()
+        if years:
+            sessions = sessions.filter(start_year__in=years)
+            missing = set(years) - set(sessions.values_list("start_year", flat=True))
+            if missing:
+                raise CommandError(f"Unknown session(s): {sorted(missing)}")
+            active = list(sessions.filter(is_active=True).values_list("start_year", flat=True))
+            if active and not restore:
+                raise CommandError(f"Session(s) still active: {sorted(active)} (deactivate them first)")
+        else:
+            sessions = sessions.filter(is_active=False)
+
+        batches = list(
+            ResultBatch.objects.filter(session__in=sessions, is_archived=restore)
+            .select_related("program", "session")
+            .order_by("session__start_year", "program__name", "semester_number", "result_type")
+        )
+        if not batches:
+            self.stdout.write("Nothing to move.")
+            return
+
+        for batch in batches:
+            self.stdout.write(f"  {batch}")
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Dry run: {len(batches)} batch(es) would move."))
+            return
+
+        batch_ids = [b.id for b in batches]
+        with transaction.atomic():
+            if restore:
+                moved = archive.restore_batches(batch_ids)
+                counters.add("course_results", moved.get("archivedcourseresult", 0))
+            else:
+                moved = archive.archive_batches(batch_ids)
+                counters.add("course_results", -moved.get("courseresult", 0))
+
+        summary = ", ".join(f"{name}={n}" for name, n in moved.items())
+        action = "Restored" if restore else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{action} {len(batch_ids)} batch(es): {summary}"))
@@ -0,0 +1,99 @@
+import math
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from results import archive
+from results.documents import (
+    DMC_TEMPLATE,
+    RESULT_NOTIFICATION_TEMPLATE,
+    dmc_batch_context,
+    dmc_single_context,
+    result_notification_context,
+)
+from results.models import ResultBatch
+from results.rendering import render_pdf_timed
+from results.timing import PHASES, PhaseTimer
+
+DOCUMENTS = ("notification", "dmc_batch", "dmc")
+
+
+def _percentile(values, p):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = "Benchmark a batch's PDFs N times (bypassing the PDF cache) and report per-phase percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("batch_id", type=int)
+        parser.add_argument("--runs", type=int, default=5, help="Renders per document (default 5)")
+        parser.add_argument(
+            "--document",
+            choices=DOCUMENTS,
+            action="append",
+            help="Document(s) to benchmark (default: all). 'dmc' = one student's DMC.",
+        )
+        parser.add_argument("--enrollment", type=int, help="Enrollment id for 'dmc' (default: first in batch)")
+        parser.add_argument("--base-url", default=None, help="Base URL for static assets (default: PDF_BASE_URL)")
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        batch = ResultBatch.objects.select_related("program", "session").filter(id=options["batch_id"]).first()
+        if not batch:
+            raise CommandError(f"Batch {options['batch_id']} not found.")
+
+        runs = max(1, options["runs"])
+        base_url = options["base_url"] or settings.PDF_BASE_URL
+
+        builders = {
+            "notification": lambda timer: (RESULT_NOTIFICATION_TEMPLATE, result_notification_context(batch, timer)),
+            "dmc_batch": lambda timer: (DMC_TEMPLATE, dmc_batch_context(batch, timer)),
+        }
+
+        sem_res_qs = archive.semester_results(batch).select_related("enrollment", "enrollment__student")
+        if options["enrollment"]:
+            sem_res_qs = sem_res_qs.filter(enrollment_id=options["enrollment"])
+        sem_res = sem_res_qs.order_by("enrollment__roll_sort_key", "enrollment__roll_no").first()
+        if sem_res:
+            builders["dmc"] = lambda timer: (DMC_TEMPLATE, dmc_single_context(batch, sem_res, timer))
+
+        for document in options["document"] or DOCUMENTS:
+            if document not in builders:
+                self.stdout.write(self.style.WARNING(f"{document}: no semester results in batch, skipped"))
+                continue
+
+            samples = {name: [] for name in (*PHASES, "total")}
+            pages = size = 0
+            for _ in range(runs):
+                timer = PhaseTimer()
+                started = time.perf_counter()
+                template_name, context = builders[document](timer)
+                with timer.phase("template"):
+                    html = render_to_string(template_name, context)
+                pdf, timings = render_pdf_timed(html, base_url=base_url)
+                timer.update(timings)
+
+                for name, ms in timer.as_ms().items():
+                    samples[name].append(ms)
+                samples["total"].append((time.perf_counter() - started) * 1000)
+                pages, size = timings.get("pages", 0), len(pdf)
+
+            self.stdout.write(self.style.SUCCESS(
+                f"\n{document}: batch={batch.id} runs={runs} pages={pages} size={size / 1024:.1f} KiB"
+            ))
+            self.stdout.write(f"{'phase':<10}{'p50':>10}{'p90':>10}{'p95':>10}{'max':>10}   (ms)")
+            for name, values in samples.items():
+                if not values:
+                    continue
+                values.sort()
+                self.stdout.write(
+                    f"{name:<10}"
+                    + "".join(f"{_percentile(values, p):>10.1f}" for p in (50, 90, 95))
+                    + f"{values[-1]:>10.1f}"
+                )
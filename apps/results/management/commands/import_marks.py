@@ -5,7 +5,9 @@ import openpyxl
 from academics.models import Program, Session, Course
 from students.models import Student, Enrollment
 from results.models import ResultBatch, CourseResult
+from results import bulk
 from results.services import recompute_batch
+from dashboards import counters
 
 
 def _norm(s: str) -> str:
@@ -26,6 +28,7 @@ class Command(BaseCommand):
         parser.add_argument("--recompute", action="store_true", help="Recompute batch GPA/CGPA after import")
 
     @transaction.atomic
+    @counters.batched()
     def handle(self, *args, **options):
         file_path = options["file"]
 
@@ -69,10 +72,9 @@ class Command(BaseCommand):
         if missing:
             raise SystemExit(f"Missing required columns: {missing}\nHeaders found: {header_raw}")
 
-        created = 0
-        updated = 0
         skipped = 0
         errors = 0
+        rows = []
 
         batches = {}  # cache ResultBatch by (program_id, session_id, semester, type)
 
@@ -177,6 +179,12 @@ class Command(BaseCommand):
                     )
                     batches[key] = batch
                 batch = batches[key]
+                if batch.is_archived:
+                    errors += 1
+                    self.stdout.write(self.style.ERROR(
+                        f"Row {row_num}: batch archived: {batch} (archive_results --restore {session_year})"
+                    ))
+                    continue
 
                 s_marks = _to_decimal_or_zero(sessional_marks)
                 m_marks = _to_decimal_or_zero(midterm_marks)
@@ -184,26 +192,36 @@ class Command(BaseCommand):
 
                 total_marks = s_marks + m_marks + t_marks
 
-                cr = CourseResult.objects.filter(batch=batch, enrollment=enrollment, course=course).first()
-                if not cr:
-                    CourseResult.objects.create(
+                rows.append(
+                    CourseResult(
                         batch=batch,
                         enrollment=enrollment,
                         course=course,
                         marks_obtained=total_marks,
                         max_marks=float(max_marks),
+                        **batch.cohort_fields(),
                     )
-                    created += 1
-                else:
-                    cr.marks_obtained = total_marks
-                    cr.max_marks = float(max_marks)
-                    cr.save(update_fields=["marks_obtained", "max_marks"])
-                    updated += 1
+                )
 
             except Exception as e:
                 errors += 1
                 self.stdout.write(self.style.ERROR(f"Row {row_num}: ERROR {e}"))
 
+        # One upsert for the whole file; created = rows the touched batches gained.
+        existing = CourseResult.objects.filter(batch__in=list(batches.values()))
+        before = existing.count()
+        bulk.upsert(
+            CourseResult,
+            rows,
+            unique_fields=["batch", "enrollment", "course"],
+            update_fields=["marks_obtained", "max_marks"],
+        )
+        created = existing.count() - before
+        updated = len(rows) - created
+        counters.add("course_results", created)
+
+        ResultBatch.bump_data_version(b.id for b in batches.values())
+
         self.stdout.write(self.style.SUCCESS(
             f"\nImported. Created={created}, Updated={updated}, Errors={errors}"
         ))
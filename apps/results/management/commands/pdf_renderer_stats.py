@@ -0,0 +1,23 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from results.rendering import RenderServiceError, service_stats
+
+
+class Command(BaseCommand):
+    help = "Show queue depth and render-time stats of the running PDF rendering service."
+
+    def handle(self, *args, **options):
+        if not settings.PDF_RENDERER_ADDRESS:
+            raise CommandError("PDF_RENDERER_ADDRESS is not set; PDFs are rendered in-process.")
+
+        try:
+            stats = service_stats()
+        except (ConnectionError, FileNotFoundError) as e:
+            raise CommandError(f"PDF renderer not reachable at {settings.PDF_RENDERER_ADDRESS}: {e}")
+        except RenderServiceError as e:
+            raise CommandError(f"PDF renderer at {settings.PDF_RENDERER_ADDRESS} failed: {e}")
+
+        self.stdout.write(json.dumps(stats, indent=2))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from results.models import ResultBatch
+from results.pregenerate import pregenerate_batch
+
+
+class Command(BaseCommand):
+    help = "Generate the PDF cache (notification + DMCs) for locked result batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("batch_ids", nargs="*", type=int, help="Batch ids (default: see --pending)")
+        parser.add_argument(
+            "--pending",
+            action="store_true",
+            help="All locked batches whose pre-generation is missing, failed or not finished "
+            "(running jobs are superseded, so use it for stalled ones)",
+        )
+
+    def handle(self, *args, **options):
+        batch_ids = options["batch_ids"]
+        if options["pending"]:
+            batch_ids += list(
+                ResultBatch.objects.filter(is_locked=True)
+                .exclude(pdf_pregeneration__status="done")
+                .values_list("id", flat=True)
+            )
+        if not batch_ids:
+            raise CommandError("Give batch ids or --pending.")
+
+        for batch_id in batch_ids:
+            self.stdout.write(f"Batch {batch_id}...")
+            pregenerate_batch(batch_id)
+
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from results.rendering import RenderPool, serve
+
+
+class Command(BaseCommand):
+    help = "Run the local PDF rendering service (pool of warmed-up WeasyPrint workers)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--address",
+            default=settings.PDF_RENDERER_ADDRESS or "127.0.0.1:8765",
+            help="host:port or socket path to listen on (default: PDF_RENDERER_ADDRESS)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PDF_RENDER_POOL_SIZE,
+            help="Number of renderer processes = max concurrent renders (default: PDF_RENDER_POOL_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        address = options["address"]
+        workers = max(1, options["workers"])
+
+        pool = RenderPool(workers, max_tasks_per_worker=settings.PDF_RENDER_MAX_TASKS_PER_WORKER)
+        self.stdout.write(self.style.SUCCESS(f"PDF renderer listening on {address} with {workers} worker(s)."))
+        try:
+            serve(address, pool)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping PDF renderer...")
+        finally:
+            pool.close()
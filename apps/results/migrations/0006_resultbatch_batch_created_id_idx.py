@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0005_alter_course_title'),
+        ('results', '0005_resultbatch_data_version_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resultbatch',
+            index=models.Index(fields=['created_at', 'id'], name='batch_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_course_course_code_lower_idx'),
+        ('results', '0006_resultbatch_batch_created_id_idx'),
+        ('students', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='courseresult',
+            index=models.Index(fields=['enrollment', 'batch'], name='course_result_enr_batch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultbatch',
+            index=models.Index(fields=['program', 'session', 'result_type', 'created_at'], name='batch_picker_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='semesterresult',
+            index=models.Index(fields=['enrollment', 'batch'], name='sem_result_enr_batch_idx'),
+        ),
+    ]
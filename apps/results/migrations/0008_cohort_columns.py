@@ -0,0 +1,73 @@
+"""program / session / semester_number copied from the batch onto CourseResult and SemesterResult."""
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+COHORT_FIELDS = ("program_id", "session_id", "semester_number")
+
+
+def copy_cohort(apps, schema_editor):
+    ResultBatch = apps.get_model("results", "ResultBatch")
+    for name in ("CourseResult", "SemesterResult"):
+        model = apps.get_model("results", name)
+        batch = ResultBatch.objects.filter(id=OuterRef("batch_id"))
+        model.objects.update(**{field: Subquery(batch.values(field)[:1]) for field in COHORT_FIELDS})
+
+
+def cohort_fields(null):
+    return [
+        (
+            "program",
+            models.ForeignKey(
+                db_index=False, editable=False, null=null, on_delete=django.db.models.deletion.PROTECT,
+                related_name="+", to="academics.program",
+            ),
+        ),
+        (
+            "session",
+            models.ForeignKey(
+                db_index=False, editable=False, null=null, on_delete=django.db.models.deletion.PROTECT,
+                related_name="+", to="academics.session",
+            ),
+        ),
+        ("semester_number", models.PositiveSmallIntegerField(editable=False, null=null)),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_course_course_code_lower_idx'),
+        ('results', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='courseresult',
+            name='course_result_enr_batch_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='semesterresult',
+            name='sem_result_enr_batch_idx',
+        ),
+        *[
+            migrations.AddField(model_name=model_name, name=name, field=field)
+            for model_name in ('courseresult', 'semesterresult')
+            for name, field in cohort_fields(null=True)
+        ],
+        migrations.RunPython(copy_cohort, migrations.RunPython.noop),
+        *[
+            migrations.AlterField(model_name=model_name, name=name, field=field)
+            for model_name in ('courseresult', 'semesterresult')
+            for name, field in cohort_fields(null=False)
+        ],
+        migrations.AddIndex(
+            model_name='courseresult',
+            index=models.Index(fields=['program', 'session', 'enrollment'], name='course_result_cohort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='semesterresult',
+            index=models.Index(fields=['program', 'session', 'enrollment', 'semester_number'], name='sem_result_cohort_idx'),
+        ),
+    ]
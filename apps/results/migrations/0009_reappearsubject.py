@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    """Rows for existing results, from the "CODE - Title, ..." text and the batch's course results."""
+    SemesterResult = apps.get_model("results", "SemesterResult")
+    CourseResult = apps.get_model("results", "CourseResult")
+    ReappearSubject = apps.get_model("results", "ReappearSubject")
+
+    rows = []
+    for sr in SemesterResult.objects.exclude(subjects_to_reappear="").iterator(chunk_size=500):
+        text = sr.subjects_to_reappear
+        courses = CourseResult.objects.filter(batch_id=sr.batch_id, enrollment_id=sr.enrollment_id).values_list(
+            "course_id", "course__code", "course__title"
+        )
+        for course_id, code, title in courses:
+            if f"{code} - {title}" in text:
+                rows.append(ReappearSubject(semester_result_id=sr.id, course_id=course_id))
+        if len(rows) >= 1000:
+            ReappearSubject.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    ReappearSubject.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_course_course_code_lower_idx'),
+        ('results', '0008_cohort_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReappearSubject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='academics.course')),
+                ('semester_result', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reappear_subjects', to='results.semesterresult')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'semester_result'], name='reappear_course_idx')],
+                'unique_together': {('semester_result', 'course')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_course_course_code_lower_idx'),
+        ('results', '0009_reappearsubject'),
+        ('students', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultbatch',
+            name='is_archived',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ArchivedSemesterResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester_number', models.PositiveSmallIntegerField(editable=False)),
+                ('total_obtained', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('total_max', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('gpa', models.DecimalField(decimal_places=2, default=0, max_digits=4)),
+                ('cgpa', models.DecimalField(decimal_places=2, default=0, max_digits=4)),
+                ('letter_grade', models.CharField(blank=True, max_length=5)),
+                ('remarks', models.CharField(blank=True, max_length=200)),
+                ('subjects_to_reappear', models.TextField(blank=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_semester_results', to='results.resultbatch')),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_semester_results', to='students.enrollment')),
+                ('program', models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='academics.program')),
+                ('session', models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='academics.session')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedReappearSubject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='academics.course')),
+                ('semester_result', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reappear_subjects', to='results.archivedsemesterresult')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedCourseResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester_number', models.PositiveSmallIntegerField(editable=False)),
+                ('marks_obtained', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('max_marks', models.DecimalField(decimal_places=2, default=100, max_digits=6)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('letter_grade', models.CharField(blank=True, max_length=5)),
+                ('grade_point', models.DecimalField(decimal_places=2, default=0, max_digits=4)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_course_results', to='results.resultbatch')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='academics.course')),
+                ('enrollment', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_course_results', to='students.enrollment')),
+                ('program', models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='academics.program')),
+                ('session', models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='academics.session')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['program', 'session', 'enrollment'], name='arch_course_result_cohort_idx')],
+                'unique_together': {('batch', 'enrollment', 'course')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedsemesterresult',
+            index=models.Index(fields=['program', 'session', 'enrollment', 'semester_number'], name='arch_sem_result_cohort_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedsemesterresult',
+            unique_together={('batch', 'enrollment')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedreappearsubject',
+            unique_together={('semester_result', 'course')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0010_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfpregeneration',
+            name='token',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
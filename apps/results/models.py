@@ -1,4 +1,7 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from academics.models import Program, Session, Course
 from students.models import Enrollment
 
@@ -37,23 +40,136 @@ class ResultBatch(models.Model):
     notification_date = models.DateField(null=True, blank=True)
 
     is_locked = models.BooleanField(default=False)
+    # Rows moved to the Archived* tables (manage.py archive_results)
+    is_archived = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Bumped whenever printable data changes (edit, import, recompute).
+    # Drives PDF ETag/Last-Modified and the PDF cache file names.
+    data_version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         unique_together = ("program", "session", "semester_number", "result_type")
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of the batch list
+            models.Index(fields=["created_at", "id"], name="batch_created_id_idx"),
+            # Pickers: a program/session's batches of a type, newest first
+            models.Index(fields=["program", "session", "result_type", "created_at"], name="batch_picker_idx"),
+        ]
+
+    # Columns printed on (or deciding) the documents; editing one bumps data_version.
+    PRINTED_FIELDS = (
+        "program_id",
+        "session_id",
+        "semester_number",
+        "result_type",
+        "notification_no",
+        "notification_date",
+        "is_locked",
+    )
+
+    def save(self, *args, **kwargs):
+        if (
+            self.pk
+            and not kwargs.get("update_fields")
+            and getattr(self, "_loaded_printed", None) != self.printed_fields()
+        ):
+            # Edited (e.g. notification no/date, lock): printed documents change.
+            self.data_version = (self.data_version or 0) + 1
+        super().save(*args, **kwargs)
+        # post_save receivers have seen the old state; this is the new baseline.
+        self._loaded_is_locked = self.is_locked
+        self._loaded_printed = self.printed_fields()
+        self._loaded_data_version = self.data_version
+
+        cohort = self.cohort_fields()
+        loaded = getattr(self, "_loaded_cohort", None)
+        if loaded is not None and loaded != cohort:
+            # Rows copy program/session/semester from their batch.
+            for model in (CourseResult, SemesterResult, ArchivedCourseResult, ArchivedSemesterResult):
+                model.objects.filter(batch=self).update(**cohort)
+        self._loaded_cohort = cohort
+
+    def printed_fields(self) -> dict:
+        return {name: getattr(self, name) for name in self.PRINTED_FIELDS}
+
+    def cohort_fields(self) -> dict:
+        """The batch columns copied onto its CourseResult / SemesterResult rows."""
+        return {
+            "program_id": self.program_id,
+            "session_id": self.session_id,
+            "semester_number": self.semester_number,
+        }
+
+    @classmethod
+    def bump_data_version(cls, batch_ids):
+        """Mark the given batches' printable data as changed (marks import, recompute, ...)."""
+        cls.objects.filter(id__in=list(batch_ids)).update(
+            data_version=F("data_version") + 1,
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored lock state so post_save can detect lock/unlock transitions.
+        instance._loaded_is_locked = instance.__dict__.get("is_locked")
+        # ... and the printed columns / version, so a save that changes nothing keeps the PDFs.
+        instance._loaded_data_version = instance.__dict__.get("data_version")
+        if set(cls.PRINTED_FIELDS) <= instance.__dict__.keys():
+            instance._loaded_printed = instance.printed_fields()
+        if {"program_id", "session_id", "semester_number"} <= instance.__dict__.keys():
+            instance._loaded_cohort = instance.cohort_fields()
+        return instance
 
     def __str__(self):
         return f"{self.program} | {self.session.start_year} | Sem {self.semester_number} | {self.result_type}"
 
 
-class CourseResult(models.Model):
-    """
-    Marks per course per student for a specific batch.
+class BatchCohortMixin(models.Model):
+    """Program / session / semester copied from ``batch`` (cohort queries skip the join).
+
+    Set on save; ``ResultBatch.save`` updates the rows when a batch's cohort
+    changes. Bulk writers pass ``**batch.cohort_fields()`` themselves.
     """
-    batch = models.ForeignKey(ResultBatch, on_delete=models.CASCADE, related_name="course_results")
-    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT, related_name="course_results")
-    course = models.ForeignKey(Course, on_delete=models.PROTECT)
+
+    program = models.ForeignKey(Program, on_delete=models.PROTECT, related_name="+", editable=False, db_index=False)
+    session = models.ForeignKey(Session, on_delete=models.PROTECT, related_name="+", editable=False, db_index=False)
+    semester_number = models.PositiveSmallIntegerField(editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_batch_id = instance.__dict__.get("batch_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Rows loaded with their batch unchanged are already in sync.
+        unchanged = self.program_id and self.batch_id == getattr(self, "_loaded_batch_id", None)
+        if self.batch_id and not unchanged:
+            if self._meta.get_field("batch").is_cached(self):
+                cohort = self.batch.cohort_fields()
+            else:
+                cohort = (
+                    ResultBatch.objects.filter(id=self.batch_id)
+                    .values("program_id", "session_id", "semester_number")
+                    .get()
+                )
+            for name, value in cohort.items():
+                setattr(self, name, value)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "batch" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "program", "session", "semester_number"}
+        super().save(*args, **kwargs)
+
+
+class CourseResultFields(BatchCohortMixin):
+    """Columns shared by :class:`CourseResult` and :class:`ArchivedCourseResult`."""
 
     marks_obtained = models.DecimalField(max_digits=6, decimal_places=2)
     max_marks = models.DecimalField(max_digits=6, decimal_places=2, default=100)
@@ -64,18 +180,30 @@ class CourseResult(models.Model):
     grade_point = models.DecimalField(max_digits=4, decimal_places=2, default=0)
 
     class Meta:
-        unique_together = ("batch", "enrollment", "course")
+        abstract = True
 
     def __str__(self):
         return f"{self.enrollment.roll_no} | {self.course.code} | {self.course.title}"
 
 
-class SemesterResult(models.Model):
+class CourseResult(CourseResultFields):
     """
-    One row per student per semester batch.
+    Marks per course per student for a specific batch.
     """
-    batch = models.ForeignKey(ResultBatch, on_delete=models.CASCADE, related_name="semester_results")
-    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT, related_name="semester_results")
+    batch = models.ForeignKey(ResultBatch, on_delete=models.CASCADE, related_name="course_results")
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT, related_name="course_results")
+    course = models.ForeignKey(Course, on_delete=models.PROTECT)
+
+    class Meta:
+        unique_together = ("batch", "enrollment", "course")
+        indexes = [
+            # CGPA (a student's results in a program/session) and cohort scans
+            models.Index(fields=["program", "session", "enrollment"], name="course_result_cohort_idx"),
+        ]
+
+
+class SemesterResultFields(BatchCohortMixin):
+    """Columns shared by :class:`SemesterResult` and :class:`ArchivedSemesterResult`."""
 
     # NEW (very useful for prints)
     total_obtained = models.DecimalField(max_digits=8, decimal_places=2, default=0)
@@ -88,10 +216,134 @@ class SemesterResult(models.Model):
     letter_grade = models.CharField(max_length=5, blank=True)
     remarks = models.CharField(max_length=200, blank=True)
 
+    # Rendered "CODE - Title, ..." for the templates; ReappearSubject rows are the data.
     subjects_to_reappear = models.TextField(blank=True)
 
     class Meta:
-        unique_together = ("batch", "enrollment")
+        abstract = True
 
     def __str__(self):
         return f"{self.enrollment.roll_no} | Sem {self.batch.semester_number}"
+
+
+class SemesterResult(SemesterResultFields):
+    """
+    One row per student per semester batch.
+    """
+    batch = models.ForeignKey(ResultBatch, on_delete=models.CASCADE, related_name="semester_results")
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT, related_name="semester_results")
+
+    class Meta:
+        unique_together = ("batch", "enrollment")
+        indexes = [
+            # GPA history (a student's semesters in a program/session) and cohort scans
+            models.Index(
+                fields=["program", "session", "enrollment", "semester_number"], name="sem_result_cohort_idx"
+            ),
+        ]
+
+
+class ReappearSubject(models.Model):
+    """A course the student must reappear in (failed in this semester result).
+
+    Written in bulk by recompute_batch, alongside subjects_to_reappear.
+    """
+    semester_result = models.ForeignKey(
+        SemesterResult, on_delete=models.CASCADE, related_name="reappear_subjects", db_index=False
+    )
+    course = models.ForeignKey(Course, on_delete=models.PROTECT, related_name="+", db_index=False)
+
+    class Meta:
+        unique_together = ("semester_result", "course")
+        indexes = [
+            # Who must reappear in course X
+            models.Index(fields=["course", "semester_result"], name="reappear_course_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.semester_result} | {self.course.code}"
+
+
+# ======================================================
+# ARCHIVE (results of inactive sessions, see results.archive)
+# ======================================================
+
+class ArchivedCourseResult(CourseResultFields):
+    """CourseResult rows of an archived batch (same columns and ids)."""
+    batch = models.ForeignKey(ResultBatch, on_delete=models.CASCADE, related_name="archived_course_results")
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT, related_name="archived_course_results")
+    course = models.ForeignKey(Course, on_delete=models.PROTECT, related_name="+")
+
+    class Meta:
+        unique_together = ("batch", "enrollment", "course")
+        indexes = [
+            models.Index(fields=["program", "session", "enrollment"], name="arch_course_result_cohort_idx"),
+        ]
+
+
+class ArchivedSemesterResult(SemesterResultFields):
+    """SemesterResult rows of an archived batch (same columns and ids)."""
+    batch = models.ForeignKey(ResultBatch, on_delete=models.CASCADE, related_name="archived_semester_results")
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT, related_name="archived_semester_results")
+
+    class Meta:
+        unique_together = ("batch", "enrollment")
+        indexes = [
+            models.Index(
+                fields=["program", "session", "enrollment", "semester_number"], name="arch_sem_result_cohort_idx"
+            ),
+        ]
+
+
+class ArchivedReappearSubject(models.Model):
+    """ReappearSubject rows of an archived batch (same columns and ids)."""
+    semester_result = models.ForeignKey(
+        ArchivedSemesterResult, on_delete=models.CASCADE, related_name="reappear_subjects", db_index=False
+    )
+    course = models.ForeignKey(Course, on_delete=models.PROTECT, related_name="+", db_index=False)
+
+    class Meta:
+        unique_together = ("semester_result", "course")
+
+    def __str__(self):
+        return f"{self.semester_result} | {self.course.code}"
+
+
+class PdfPregeneration(models.Model):
+    """
+    Progress of background PDF generation for a locked batch
+    (notification + combined DMCs + one DMC per student).
+    """
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    batch = models.OneToOneField(ResultBatch, on_delete=models.CASCADE, related_name="pdf_pregeneration")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Identifies the current job; a job whose token was replaced stops.
+    token = models.CharField(max_length=32, blank=True, editable=False)
+    # Heartbeat: refreshed by the job after every document.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.batch_id} | {self.status} | {self.done}/{self.total}"
+
+    @property
+    def is_stalled(self) -> bool:
+        """Queued/running but silent for PDF_PREGENERATE_STALE_SECONDS (e.g. its worker was recycled)."""
+        return self.status in ("queued", "running") and (
+            timezone.now() - self.updated_at
+        ).total_seconds() > settings.PDF_PREGENERATE_STALE_SECONDS
+
+    @property
+    def progress(self) -> int:
+        """Percent complete (0-100)."""
+        if not self.total:
+            return 100 if self.status == "done" else 0
+        return min(100, int(self.done * 100 / self.total))
@@ -0,0 +1,74 @@
+"""On-disk cache of generated PDFs for locked (final) batches.
+
+Files live in MEDIA_ROOT/pdf_cache/batch_<id>/v<data_version>/, so a bump of
+``ResultBatch.data_version`` (import, recompute, edit) makes old files
+unreachable; they are removed on the next write. Only locked batches are
+served from / written to the cache; the whole batch directory is dropped when
+a batch is unlocked.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+RESULT_NOTIFICATION = "result_notification"
+DMC_BATCH = "dmc_batch"
+
+
+def dmc_name(enrollment_id: int) -> str:
+    return f"dmc_{enrollment_id}"
+
+
+def batch_dir(batch_id: int) -> Path:
+    return Path(settings.MEDIA_ROOT) / "pdf_cache" / f"batch_{batch_id}"
+
+
+def version_dir(batch) -> Path:
+    return batch_dir(batch.id) / f"v{batch.data_version}"
+
+
+def path_for(batch, name: str) -> Path:
+    return version_dir(batch) / f"{name}.pdf"
+
+
+def _drop_old_versions(batch):
+    current = version_dir(batch).name
+    for entry in batch_dir(batch.id).iterdir():
+        if entry.is_dir() and entry.name != current:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def get(batch, name: str) -> bytes | None:
+    if not batch.is_locked:
+        return None
+    try:
+        return path_for(batch, name).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def put(batch, name: str, pdf: bytes):
+    """Store a PDF for a locked batch (atomic replace, so readers never see partial files)."""
+    if not batch.is_locked:
+        return
+    target = path_for(batch, name)
+    if not target.parent.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _drop_old_versions(batch)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(pdf)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def clear(batch_id: int):
+    shutil.rmtree(batch_dir(batch_id), ignore_errors=True)
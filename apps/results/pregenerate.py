@@ -0,0 +1,142 @@
+"""Background pre-generation of a locked batch's PDFs into the PDF cache.
+
+Locking a batch means results are final, which is exactly when everyone starts
+printing. :func:`enqueue` (called from the ResultBatch post_save signal when a
+batch is locked or its printed data changes) starts a background thread after
+the transaction commits; progress is stored on :class:`PdfPregeneration` for
+the dashboard. ``manage.py pregenerate_pdfs`` runs the same job synchronously.
+
+The thread lives in the web worker that saved the batch: a worker restart
+(deploy, crash, max-requests recycling) loses the job, which then shows as
+stalled. Run ``manage.py pregenerate_pdfs --pending`` after restarts (or from
+cron) to finish them; PDFs not yet cached are still rendered on demand.
+
+Every render holds a background render slot (see
+:func:`throttling.try_background_slot`), so pre-generation counts against the
+same limits as live requests and never takes all of them. Each job carries a
+token stored on its PdfPregeneration row: enqueueing again (the batch was
+saved) issues a new token and the older job stops at its next document.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from . import archive, pdf_cache, throttling
+from .documents import (
+    DMC_TEMPLATE,
+    RESULT_NOTIFICATION_TEMPLATE,
+    dmc_batch_context,
+    dmc_single_context,
+    result_notification_context,
+)
+from .models import PdfPregeneration, ResultBatch
+from .rendering import render_pdf
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to get a render slot
+SLOT_POLL = 0.5
+
+
+class Superseded(Exception):
+    """The job's token was replaced (newer job) or the batch was unlocked."""
+
+
+def _claim(batch_id: int) -> str:
+    """Queue a new job for the batch; returns its token (older jobs stop)."""
+    token = uuid.uuid4().hex
+    PdfPregeneration.objects.update_or_create(
+        batch_id=batch_id,
+        defaults={"status": "queued", "total": 0, "done": 0, "error": "", "token": token},
+    )
+    return token
+
+
+def enqueue(batch: ResultBatch):
+    """Queue a job for the batch and start it once the current transaction commits."""
+    token = _claim(batch.id)
+    transaction.on_commit(
+        lambda: threading.Thread(target=_run_in_thread, args=(batch.id, token), daemon=True).start()
+    )
+
+
+def _run_in_thread(batch_id: int, token: str):
+    close_old_connections()
+    try:
+        pregenerate_batch(batch_id, token)
+    finally:
+        connection.close()
+
+
+def _touch(batch_id: int, token: str, **fields) -> bool:
+    """Record progress (and a heartbeat) if the job is still current; False when superseded."""
+    return (
+        PdfPregeneration.objects.filter(batch_id=batch_id, token=token, batch__is_locked=True).update(
+            updated_at=timezone.now(), **fields
+        )
+        > 0
+    )
+
+
+def _render(batch_id: int, token: str, html: str) -> bytes:
+    """Render inside a background render slot, waiting as long as live requests hold them."""
+    while (slot := throttling.try_background_slot()) is None:
+        if not _touch(batch_id, token):
+            raise Superseded
+        time.sleep(SLOT_POLL)
+    with slot:
+        return render_pdf(html, base_url=settings.PDF_BASE_URL)
+
+
+def pregenerate_batch(batch_id: int, token: str | None = None):
+    """Render the notification, the combined DMCs and every per-student DMC into the cache.
+
+    ``token`` is the job's (from :func:`enqueue`); without one a new job is
+    claimed, superseding any running job for the batch.
+    """
+    batch = ResultBatch.objects.select_related("program", "session").filter(id=batch_id).first()
+    if batch is None or not batch.is_locked:
+        return
+    if token is None:
+        token = _claim(batch_id)
+
+    sem_results = list(
+        archive.semester_results(batch).select_related("enrollment", "enrollment__student")
+    )
+
+    jobs = [
+        (pdf_cache.RESULT_NOTIFICATION, lambda: (RESULT_NOTIFICATION_TEMPLATE, result_notification_context(batch))),
+        (pdf_cache.DMC_BATCH, lambda: (DMC_TEMPLATE, dmc_batch_context(batch))),
+    ]
+    for sr in sem_results:
+        jobs.append((pdf_cache.dmc_name(sr.enrollment_id), lambda sr=sr: (DMC_TEMPLATE, dmc_single_context(batch, sr))))
+
+    if not _touch(batch_id, token, status="running", total=len(jobs), done=0, error=""):
+        return
+
+    try:
+        for done, (name, build) in enumerate(jobs):
+            # Stop early if a newer job took over or the batch was unlocked (cache cleared).
+            if not _touch(batch_id, token, done=done):
+                return
+            if pdf_cache.get(batch, name) is None:
+                template_name, context = build()
+                html = render_to_string(template_name, context)
+                pdf_cache.put(batch, name, _render(batch_id, token, html))
+    except Superseded:
+        return
+    except Exception as e:
+        logger.exception("PDF pre-generation failed for batch %s", batch_id)
+        _touch(batch_id, token, status="failed", error=f"{type(e).__name__}: {e}")
+        return
+
+    _touch(batch_id, token, status="done", done=len(jobs))
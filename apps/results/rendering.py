@@ -0,0 +1,283 @@
+"""PDF rendering service.
+
+Importing WeasyPrint and warming up fontconfig/fonts/CSS costs seconds, and a
+large render competes with normal page traffic inside the web worker. Instead,
+a local rendering service can be started with::
+
+    python manage.py run_pdf_renderer
+
+It keeps a pool of long-lived worker processes (WeasyPrint pre-imported and
+warmed up) fed by a queue. Views call :func:`render_pdf`, which submits the
+HTML to that service when ``PDF_RENDERER_ADDRESS`` is configured and renders
+in-process otherwise (development / fallback).
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the service's stats reply
+STATS_TIMEOUT = 5
+
+
+# ======================================================
+# WORKER SIDE (runs inside the pool processes)
+# ======================================================
+
+def _warm_worker():
+    """Pool initializer: import WeasyPrint and load fonts once per process."""
+    try:
+        from weasyprint import HTML
+
+        HTML(string="<p>warm-up</p>").write_pdf()
+    except Exception:
+        # A failing initializer makes the pool respawn workers forever;
+        # let the actual render report the problem instead.
+        logger.exception("PDF worker warm-up failed")
+
+
+@contextmanager
+def _deadline(seconds: float | None):
+    """Raise TimeoutError in the block after ``seconds`` (SIGALRM; main thread on POSIX only).
+
+    Lets a pool worker abandon a render its caller has given up on, instead of
+    occupying the worker until it finishes. Elsewhere this is a no-op.
+    """
+    if not seconds or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expired(signum, frame):
+        raise TimeoutError(f"render exceeded {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _render(html: str, base_url: str | None, timeout: float | None = None):
+    """Render HTML to PDF bytes, giving up after ``timeout`` seconds (see :func:`_deadline`).
+
+    Returns (pdf_bytes, timings) where timings holds the parse/layout/write
+    seconds and the page count.
+    """
+    from weasyprint import HTML
+
+    with _deadline(timeout):
+        t0 = time.perf_counter()
+        doc = HTML(string=html, base_url=base_url)
+        t1 = time.perf_counter()
+        rendered = doc.render()
+        t2 = time.perf_counter()
+        pdf = rendered.write_pdf()
+        t3 = time.perf_counter()
+    return pdf, {"parse": t1 - t0, "layout": t2 - t1, "write": t3 - t2, "pages": len(rendered.pages)}
+
+
+# ======================================================
+# POOL
+# ======================================================
+
+class RenderPool:
+    """A fixed-size pool of warmed-up renderer processes.
+
+    The pool size caps the number of concurrent renders; extra jobs wait in the
+    pool's task queue. Render times of the last ``history`` jobs are kept for
+    :meth:`stats`.
+    """
+
+    def __init__(self, size: int, max_tasks_per_worker: int | None = None, history: int = 500):
+        self.size = size
+        # "spawn": the service process runs listener threads, so forking is not safe.
+        ctx = multiprocessing.get_context("spawn")
+        self._pool = ctx.Pool(
+            processes=size,
+            initializer=_warm_worker,
+            maxtasksperchild=max_tasks_per_worker or None,
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._durations: deque[float] = deque(maxlen=history)
+        self._started_at = time.time()
+
+    def render(self, html: str, base_url: str | None = None, timeout: float | None = None):
+        """Render in a worker; returns (pdf_bytes, timings) like :func:`_render`.
+
+        ``timeout`` bounds the render inside the worker (which then moves on to
+        the next job); the wait here also covers the time queued behind others.
+        """
+        with self._lock:
+            self._in_flight += 1
+        try:
+            result = self._pool.apply_async(_render, (html, base_url, timeout))
+            # Every round of queued jobs ahead of this one takes at most ``timeout``.
+            wait = None if timeout is None else timeout * (1 + self.queue_depth() // self.size) + 1
+            pdf, timings = result.get(wait)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+                self._durations.append(timings["parse"] + timings["layout"] + timings["write"])
+            return pdf, timings
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def queue_depth(self) -> int:
+        """Jobs waiting for a free worker."""
+        with self._lock:
+            return max(0, self._in_flight - self.size)
+
+    def stats(self) -> dict:
+        with self._lock:
+            durations = sorted(self._durations)
+            in_flight = self._in_flight
+            completed = self._completed
+            failed = self._failed
+
+        def pct(p):
+            if not durations:
+                return None
+            i = min(len(durations) - 1, int(round(p / 100 * (len(durations) - 1))))
+            return round(durations[i] * 1000, 1)
+
+        return {
+            "pool_size": self.size,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.size),
+            "completed": completed,
+            "failed": failed,
+            "uptime_s": round(time.time() - self._started_at),
+            "render_ms": {
+                "samples": len(durations),
+                "avg": round(sum(durations) / len(durations) * 1000, 1) if durations else None,
+                "p50": pct(50),
+                "p95": pct(95),
+                "max": pct(100),
+            },
+        }
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+
+# ======================================================
+# SERVICE (socket front-end for the pool)
+# ======================================================
+
+def parse_address(address: str):
+    """'host:port' -> (host, port); anything else is used as a socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _authkey() -> bytes:
+    return settings.SECRET_KEY.encode()
+
+
+def serve(address: str, pool: RenderPool):
+    """Accept render requests on ``address`` until interrupted (one thread per connection)."""
+
+    def handle(conn):
+        with conn:
+            try:
+                request = conn.recv()
+                if request[0] == "render":
+                    _, html, base_url = request
+                    conn.send(("ok", pool.render(html, base_url, settings.PDF_RENDER_TIMEOUT)))
+                elif request[0] == "stats":
+                    conn.send(("ok", pool.stats()))
+                else:
+                    conn.send(("error", f"unknown command {request[0]!r}"))
+            except EOFError:
+                pass
+            except Exception as e:
+                logger.exception("PDF render failed")
+                try:
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+                except OSError:
+                    pass
+
+    with Listener(parse_address(address), authkey=_authkey()) as listener:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError):
+                # Failed handshake (wrong key, port scan); keep serving.
+                continue
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+
+# ======================================================
+# CLIENT (used by views)
+# ======================================================
+
+class RenderServiceError(RuntimeError):
+    """The service failed the render or did not answer in time."""
+
+
+def _call_service(*request, timeout: float):
+    with Client(parse_address(settings.PDF_RENDERER_ADDRESS), authkey=_authkey()) as conn:
+        conn.send(request)
+        # Never block a request thread on a hung service.
+        if not conn.poll(timeout):
+            raise RenderServiceError(f"no reply from {settings.PDF_RENDERER_ADDRESS} within {timeout:g}s")
+        status, payload = conn.recv()
+    if status != "ok":
+        raise RenderServiceError(payload)
+    return payload
+
+
+def render_pdf_timed(html: str, base_url: str | None = None):
+    """Render HTML to PDF, preferring the local rendering service.
+
+    Returns (pdf_bytes, timings); see :func:`_render`. Raises
+    :class:`RenderServiceError` when the service fails or times out: rendering
+    the same document in-process would hold the web worker just as long.
+    """
+    if settings.PDF_RENDERER_ADDRESS:
+        try:
+            return tuple(_call_service("render", html, base_url, timeout=settings.PDF_RENDER_CLIENT_TIMEOUT))
+        except (ConnectionError, FileNotFoundError) as e:
+            # Service not running: degrade to an in-process render instead of failing the request.
+            logger.warning("PDF renderer unavailable at %s (%s); rendering in-process",
+                           settings.PDF_RENDERER_ADDRESS, e)
+        except RenderServiceError as e:
+            logger.error("PDF renderer at %s failed: %s", settings.PDF_RENDERER_ADDRESS, e)
+            raise
+
+    return _render(html, base_url)
+
+
+def render_pdf(html: str, base_url: str | None = None) -> bytes:
+    """Render HTML to PDF bytes (see :func:`render_pdf_timed`)."""
+    pdf, _ = render_pdf_timed(html, base_url)
+    return pdf
+
+
+def service_stats() -> dict:
+    """Queue depth and render-time stats from the running service."""
+    return _call_service("stats", timeout=STATS_TIMEOUT)
@@ -1,6 +1,7 @@
 from decimal import Decimal, ROUND_HALF_UP
 
-from results.models import GradeScale, CourseResult, SemesterResult, ResultBatch
+from results import bulk
+from results.models import GradeScale, CourseResult, ReappearSubject, SemesterResult, ResultBatch
 
 Q2 = Decimal("0.01")
 
@@ -52,13 +53,14 @@ def recompute_batch(batch: ResultBatch):
         - semester_percentage
         - semester letter_grade + remarks (from GradeScale using semester_percentage)
         - GPA (weighted by credit hours)
-        - subjects_to_reappear (if any course has grade_point == 0 OR scale is_fail)
+        - subjects_to_reappear (if any course has grade_point == 0 OR scale is_fail),
+          also stored as ReappearSubject rows
         - CGPA (weighted across all semesters in same program+session)
     """
     # -----------------------------
     # 1) Update course results
     # -----------------------------
-    course_results = CourseResult.objects.filter(batch=batch).select_related("course")
+    course_results = list(CourseResult.objects.filter(batch=batch).select_related("course"))
 
     for cr in course_results:
         pct = calc_percentage(cr.marks_obtained, cr.max_marks)
@@ -67,7 +69,10 @@ def recompute_batch(batch: ResultBatch):
         cr.percentage = pct
         cr.letter_grade = letter
         cr.grade_point = gp
-        cr.save(update_fields=["percentage", "letter_grade", "grade_point"])
+
+    CourseResult.objects.bulk_update(
+        course_results, ["percentage", "letter_grade", "grade_point"], batch_size=bulk.BATCH_SIZE
+    )
 
     # -----------------------------
     # 2) Semester results per enrollment
@@ -78,6 +83,9 @@ def recompute_batch(batch: ResultBatch):
         .distinct()
     )
 
+    semester_results = []
+    reappear = {}  # enrollment id -> failed course ids
+
     for enrollment_id in enrollment_ids:
         qs = (
             CourseResult.objects.filter(batch=batch, enrollment_id=enrollment_id)
@@ -91,6 +99,7 @@ def recompute_batch(batch: ResultBatch):
         sem_max = Decimal("0.00")
 
         fails = []
+        failed_course_ids = []
 
         for cr in qs:
             ch = Decimal(str(cr.course.credit_hours))
@@ -104,6 +113,7 @@ def recompute_batch(batch: ResultBatch):
             _, _, _, is_fail = find_grade(Decimal(str(cr.percentage)))
             if is_fail or Decimal(str(cr.grade_point)) == 0:
                 fails.append(f"{cr.course.code} - {cr.course.title}")
+                failed_course_ids.append(cr.course_id)
 
         gpa = Decimal("0.00")
         if total_ch > 0:
@@ -120,37 +130,12 @@ def recompute_batch(batch: ResultBatch):
 
         subj_reappear = ", ".join(fails)
 
-        sem_obj, _ = SemesterResult.objects.get_or_create(
-            batch=batch,
-            enrollment_id=enrollment_id,
-        )
-        sem_obj.total_obtained = q2(sem_obt)
-        sem_obj.total_max = q2(sem_max)
-        sem_obj.percentage = sem_pct
-
-        sem_obj.gpa = gpa
-        sem_obj.letter_grade = sem_letter
-        sem_obj.remarks = sem_remark
-        sem_obj.subjects_to_reappear = subj_reappear
-
-        sem_obj.save(
-            update_fields=[
-                "total_obtained",
-                "total_max",
-                "percentage",
-                "gpa",
-                "letter_grade",
-                "remarks",
-                "subjects_to_reappear",
-            ]
-        )
-
         # -----------------------------
         # 3) CGPA (across all semesters in same program+session)
         # -----------------------------
         all_results = CourseResult.objects.filter(
-            batch__program=batch.program,
-            batch__session=batch.session,
+            program_id=batch.program_id,
+            session_id=batch.session_id,
             enrollment_id=enrollment_id,
         ).select_related("course")
 
@@ -166,5 +151,69 @@ def recompute_batch(batch: ResultBatch):
         if all_ch > 0:
             cgpa = q2(all_points / all_ch)
 
-        sem_obj.cgpa = cgpa
-        sem_obj.save(update_fields=["cgpa"])
+        semester_results.append(
+            SemesterResult(
+                batch=batch,
+                enrollment_id=enrollment_id,
+                total_obtained=q2(sem_obt),
+                total_max=q2(sem_max),
+                percentage=sem_pct,
+                gpa=gpa,
+                cgpa=cgpa,
+                letter_grade=sem_letter,
+                remarks=sem_remark,
+                subjects_to_reappear=subj_reappear,
+                **batch.cohort_fields(),
+            )
+        )
+        reappear[enrollment_id] = failed_course_ids
+
+    bulk.upsert(
+        SemesterResult,
+        semester_results,
+        unique_fields=["batch", "enrollment"],
+        update_fields=[
+            "total_obtained",
+            "total_max",
+            "percentage",
+            "gpa",
+            "cgpa",
+            "letter_grade",
+            "remarks",
+            "subjects_to_reappear",
+        ],
+    )
+    sem_ids = dict(SemesterResult.objects.filter(batch=batch).values_list("enrollment_id", "id"))
+    reappear = {sem_ids[enrollment_id]: course_ids for enrollment_id, course_ids in reappear.items()}
+
+    # -----------------------------
+    # 4) Reappear subjects (one delete + one insert for the batch)
+    # -----------------------------
+    ReappearSubject.objects.filter(semester_result_id__in=list(reappear)).delete()
+    ReappearSubject.objects.bulk_create(
+        [
+            ReappearSubject(semester_result_id=sem_id, course_id=course_id)
+            for sem_id, course_ids in reappear.items()
+            for course_id in course_ids
+        ],
+        batch_size=1000,
+    )
+
+    ResultBatch.bump_data_version([batch.id])
+
+
+def reappear_roster(program_id, session_id, semester_number, course_id=None):
+    """Who must reappear in which course for a program/session/semester (one query).
+
+    Rows of every batch of that semester; ``course_id`` narrows to one course.
+    """
+    qs = ReappearSubject.objects.filter(
+        semester_result__program_id=program_id,
+        semester_result__session_id=session_id,
+        semester_result__semester_number=semester_number,
+    )
+    if course_id:
+        qs = qs.filter(course_id=course_id)
+    return qs.select_related(
+        "course", "semester_result__batch", "semester_result__enrollment__student"
+    ).order_by("semester_result__enrollment__roll_sort_key", "course__code")
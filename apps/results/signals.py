@@ -0,0 +1,45 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from students.models import Enrollment, Student
+
+from . import archive, pdf_cache
+from .models import PdfPregeneration, ResultBatch
+from .pregenerate import enqueue
+
+
+@receiver(post_save, sender=ResultBatch)
+def batch_saved(sender, instance, created, raw=False, **kwargs):
+    """Batch locked or its printed data changed -> rebuild its PDF cache; unlocked -> drop it.
+
+    A save that changes nothing printed (same ``data_version``) keeps the
+    cache and any running pre-generation job.
+    """
+    if raw:
+        return
+
+    was_locked = getattr(instance, "_loaded_is_locked", False)
+
+    if instance.is_locked:
+        loaded_version = getattr(instance, "_loaded_data_version", None)
+        if created or not was_locked or instance.data_version != loaded_version:
+            pdf_cache.clear(instance.id)
+            enqueue(instance)
+    elif was_locked:
+        pdf_cache.clear(instance.id)
+        PdfPregeneration.objects.filter(batch=instance).delete()
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, raw=False, **kwargs):
+    """Names/registration numbers are printed on DMCs and notifications."""
+    if raw or created:
+        return
+    ResultBatch.bump_data_version(archive.batch_ids_with_results(enrollment__student=instance))
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    ResultBatch.bump_data_version(archive.batch_ids_with_results(enrollment=instance))
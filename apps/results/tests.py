@@ -1,3 +1,729 @@
-from django.test import TestCase
+import json
+import re
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from academics.models import Course, Program, Session
+from results import archive, bulk, documents, pdf_cache, pregenerate, rendering, throttling, timing
+from results.models import (
+    ArchivedCourseResult,
+    ArchivedReappearSubject,
+    ArchivedSemesterResult,
+    CourseResult,
+    GradeScale,
+    PdfPregeneration,
+    ReappearSubject,
+    ResultBatch,
+    SemesterResult,
+)
+from results.services import reappear_roster, recompute_batch
+from students.models import Enrollment, Student, enrolled_in
+
+
+class CohortFixture:
+    """One program and session with courses, enrolled students and a semester 1 batch.
+
+    ``setUpTestData`` calls :meth:`create_cohort`, which sets ``program``,
+    ``session``, ``courses`` / ``course``, ``enrollments`` / ``enrollment``,
+    ``student`` and ``batch``; class attributes size and date the cohort.
+    """
+
+    START_YEAR = 2024
+    SESSION_ACTIVE = True
+    N_STUDENTS = 1
+    N_COURSES = 1
+
+    @classmethod
+    def create_cohort(cls):
+        cls.program = Program.objects.create(name="B.Ed", total_semesters=3)
+        cls.session = Session.objects.create(start_year=cls.START_YEAR, is_active=cls.SESSION_ACTIVE)
+        cls.courses = [
+            Course.objects.create(code=f"EDU-10{i}", title=f"Course {i}", credit_hours=3)
+            for i in range(1, cls.N_COURSES + 1)
+        ]
+        cls.enrollments = [
+            Enrollment.objects.create(
+                student=Student.objects.create(name=f"Student {i}", father_name="Khan", registration_no=f"REG-{i}"),
+                program=cls.program,
+                session=cls.session,
+                roll_no=f"BD15{cls.START_YEAR % 100:02d}-{i}",
+            )
+            for i in range(1, cls.N_STUDENTS + 1)
+        ]
+        cls.course = cls.courses[0]
+        cls.enrollment = cls.enrollments[0]
+        cls.student = cls.enrollment.student
+        cls.batch = ResultBatch.objects.create(program=cls.program, session=cls.session, semester_number=1)
+
+
+class HotQueryPlanTests(CohortFixture, TestCase):
+    """EXPLAIN the portal's hot queries: none may read a whole table.
+
+    SQLite reports a walk over a whole table or index as ``SCAN <table>``
+    (a lookup is ``SEARCH``); PostgreSQL a full read as ``Seq Scan on <table>``
+    (sequential scans are disabled for the check, since with a handful of test
+    rows they are always "cheapest").
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_cohort()
+        CourseResult.objects.create(batch=cls.batch, enrollment=cls.enrollment, course=cls.course, marks_obtained=70)
+        cls.semester_result = SemesterResult.objects.create(batch=cls.batch, enrollment=cls.enrollment)
+        ReappearSubject.objects.create(semester_result=cls.semester_result, course=cls.course)
+
+    def plan(self, queryset) -> str:
+        if connection.vendor == "sqlite":
+            return queryset.explain()
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+        raise unittest.SkipTest(f"No plan check for {connection.vendor}")
+
+    def full_scans(self, plan: str, allowed=()) -> list[str]:
+        pattern = r"\bSCAN (\w+)" if connection.vendor == "sqlite" else r"Seq Scan on (\w+)"
+        return [
+            line
+            for line in plan.splitlines()
+            if (m := re.search(pattern, line)) and m.group(1) not in allowed
+        ]
+
+    def assertNoFullScan(self, queryset, allowed=()):
+        plan = self.plan(queryset)
+        self.assertEqual(self.full_scans(plan, allowed), [], f"full table scan in:\n{plan}")
+
+    # -----------------------------
+    # Results / documents
+    # -----------------------------
+    def test_cgpa_course_results_of_enrollment(self):
+        self.assertNoFullScan(
+            CourseResult.objects.filter(
+                program=self.program,
+                session=self.session,
+                enrollment_id=self.enrollment.id,
+            ).select_related("course")
+        )
+
+    def test_gpa_history_of_enrollment(self):
+        self.assertNoFullScan(
+            SemesterResult.objects.filter(
+                enrollment_id=self.enrollment.id,
+                program=self.program,
+                session=self.session,
+                semester_number__lte=2,
+            )
+            .order_by("semester_number", "-batch__created_at")
+        )
+
+    def test_cohort_course_results(self):
+        self.assertNoFullScan(
+            CourseResult.objects.filter(program=self.program, session=self.session).values_list(
+                "enrollment_id", "grade_point"
+            )
+        )
+
+    def test_batch_students_in_roll_order(self):
+        self.assertNoFullScan(
+            SemesterResult.objects.filter(batch=self.batch)
+            .select_related("enrollment", "enrollment__student")
+            .order_by("enrollment__roll_sort_key", "enrollment__roll_no")
+        )
+
+    def test_batch_course_results(self):
+        self.assertNoFullScan(
+            CourseResult.objects.filter(batch=self.batch).values_list("enrollment_id", "course_id", "letter_grade")
+        )
+
+    def test_picker_batches(self):
+        self.assertNoFullScan(
+            ResultBatch.objects.filter(
+                program=self.program, session=self.session, result_type="regular"
+            ).order_by("-created_at")
+        )
+
+    def test_repeat_batch_roster(self):
+        self.assertNoFullScan(reappear_roster(self.program.id, self.session.id, 1))
+
+    def test_reappear_in_course(self):
+        self.assertNoFullScan(ReappearSubject.objects.filter(course=self.course).values_list("semester_result_id"))
+
+    # -----------------------------
+    # Imports
+    # -----------------------------
+    def test_import_enrollment_of_student(self):
+        self.assertNoFullScan(
+            Enrollment.objects.filter(student=self.student, program=self.program, session=self.session)
+        )
+
+    def test_import_student_by_registration_no(self):
+        self.assertNoFullScan(Student.objects.filter(registration_no__lower="reg-1"))
+
+    def test_import_course_by_code(self):
+        self.assertNoFullScan(Course.objects.filter(code__lower="edu-101"))
+
+    # -----------------------------
+    # Lists
+    # -----------------------------
+    def test_student_list_enrollment_filter(self):
+        # A keyset page walks the (name, id) index until the page is full.
+        self.assertNoFullScan(
+            Student.objects.filter(enrolled_in(self.program.id, self.session.id)).order_by("name", "id")[:51],
+            allowed=("students_student",),
+        )
+
+    def test_case_insensitive_lookups_match(self):
+        self.assertEqual(Student.objects.filter(registration_no__lower="reg-1").get(), self.student)
+        self.assertEqual(Course.objects.filter(code__lower="edu-101").get(), self.course)
+
+
+class BulkUpsertTests(CohortFixture, TestCase):
+    """``bulk.upsert`` gives the same rows with every strategy."""
+
+    N_STUDENTS = 2
+    N_COURSES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_cohort()
+        GradeScale.objects.create(
+            min_percentage=50, max_percentage=100, letter_grade="A", grade_point=4, remarks="Pass"
+        )
+        GradeScale.objects.create(
+            min_percentage=0, max_percentage=49.99, letter_grade="F", grade_point=0, remarks="Fail", is_fail=True
+        )
+
+    def course_result(self, enrollment, course, marks):
+        return CourseResult(
+            batch=self.batch, enrollment=enrollment, course=course, marks_obtained=marks, **self.batch.cohort_fields()
+        )
+
+    def marks(self):
+        return dict(
+            CourseResult.objects.filter(batch=self.batch).values_list("enrollment_id", "marks_obtained")
+        )
+
+    def check_upsert(self):
+        e1, e2 = self.enrollments
+        course = self.courses[0]
+        bulk.upsert(
+            CourseResult,
+            [self.course_result(e1, course, 40)],
+            unique_fields=["batch", "enrollment", "course"],
+            update_fields=["marks_obtained", "max_marks"],
+        )
+        # One existing key (listed twice: the last wins) and one new key
+        bulk.upsert(
+            CourseResult,
+            [self.course_result(e1, course, 55), self.course_result(e2, course, 60), self.course_result(e1, course, 65)],
+            unique_fields=["batch", "enrollment", "course"],
+            update_fields=["marks_obtained", "max_marks"],
+        )
+        self.assertEqual(self.marks(), {e1.id: Decimal("65.00"), e2.id: Decimal("60.00")})
+        self.assertEqual(
+            set(CourseResult.objects.values_list("program_id", "session_id", "semester_number")),
+            {(self.program.id, self.session.id, 1)},
+        )
+
+    def test_backend_strategy(self):
+        self.check_upsert()
+
+    def test_select_fallback(self):
+        with mock.patch.object(bulk, "strategy", return_value="select"):
+            self.check_upsert()
+
+    def test_recompute_upserts_semester_results(self):
+        e1, e2 = self.enrollments
+        c1, c2 = self.courses
+        for enrollment, course, marks in ((e1, c1, 80), (e1, c2, 30), (e2, c1, 90)):
+            CourseResult.objects.create(batch=self.batch, enrollment=enrollment, course=course, marks_obtained=marks)
+
+        recompute_batch(self.batch)
+        CourseResult.objects.filter(enrollment=e1, course=c2).update(marks_obtained=70)
+        recompute_batch(self.batch)
+
+        results = {r.enrollment_id: r for r in SemesterResult.objects.filter(batch=self.batch)}
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[e1.id].total_obtained, Decimal("150.00"))
+        self.assertEqual(results[e1.id].gpa, Decimal("4.00"))
+        self.assertEqual(results[e1.id].cgpa, Decimal("4.00"))
+        self.assertEqual(results[e1.id].semester_number, 1)
+        self.assertFalse(ReappearSubject.objects.exists())
+
+
+class ArchiveTests(CohortFixture, TestCase):
+    """Archived batches print the same documents from the archive tables."""
+
+    START_YEAR = 2019
+    SESSION_ACTIVE = False
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_cohort()
+        CourseResult.objects.create(batch=cls.batch, enrollment=cls.enrollment, course=cls.course, marks_obtained=30)
+        cls.semester_result = SemesterResult.objects.create(
+            batch=cls.batch, enrollment=cls.enrollment, gpa=Decimal("1.50")
+        )
+        ReappearSubject.objects.create(semester_result=cls.semester_result, course=cls.course)
+
+    def test_archive_and_restore(self):
+        before = documents.dmc_batch_context(self.batch)["dmcs"]
+
+        archive.archive_batches([self.batch.id])
+        self.batch.refresh_from_db()
+        self.assertTrue(self.batch.is_archived)
+        self.assertFalse(CourseResult.objects.exists() or SemesterResult.objects.exists())
+        self.assertEqual(ArchivedCourseResult.objects.count(), 1)
+        self.assertEqual(ArchivedReappearSubject.objects.get().semester_result_id, self.semester_result.id)
+
+        after = documents.dmc_batch_context(self.batch)["dmcs"]
+        self.assertEqual(
+            [(d["enrollment"], d["semester_result"].id, d["semester_result"].gpa) for d in after],
+            [(d["enrollment"], d["semester_result"].id, d["semester_result"].gpa) for d in before],
+        )
+        self.assertEqual(documents.build_gpa_history(self.enrollment.id, self.batch), [(1, Decimal("1.50"))])
+
+        archive.restore_batches([self.batch.id])
+        self.batch.refresh_from_db()
+        self.assertFalse(self.batch.is_archived)
+        self.assertFalse(ArchivedSemesterResult.objects.exists())
+        self.assertEqual(ReappearSubject.objects.get().semester_result_id, self.semester_result.id)
+
+    def test_edits_bump_archived_batches(self):
+        archive.archive_batches([self.batch.id])
+        for obj, field, value in ((self.student, "name", "Student 1 Renamed"), (self.enrollment, "roll_no", "BD1519-9")):
+            with self.subTest(field=field):
+                version = ResultBatch.objects.get(id=self.batch.id).data_version
+                setattr(obj, field, value)
+                obj.save()
+                self.assertEqual(ResultBatch.objects.get(id=self.batch.id).data_version, version + 1)
+
+
+class AdminChangelistQueryTests(CohortFixture, TestCase):
+    """Result changelists run a fixed number of queries whatever the number of rows."""
+
+    N_STUDENTS = 4
+    N_COURSES = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_cohort()
+        cls.admin = User.objects.create_superuser("admin", password="x")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_results(self, enrollments):
+        for enrollment in enrollments:
+            SemesterResult.objects.create(batch=self.batch, enrollment=enrollment, gpa=Decimal("3.00"))
+            for course in self.courses:
+                CourseResult.objects.create(batch=self.batch, enrollment=enrollment, course=course, marks_obtained=60)
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_changelists_do_not_query_per_row(self):
+        course_results = reverse("admin:results_courseresult_changelist")
+        pages = [  # url, rows per student
+            (course_results, self.N_COURSES),
+            (f"{course_results}?course__id__exact={self.course.id}", 1),
+            (reverse("admin:results_semesterresult_changelist"), 1),
+        ]
+        self.add_results(self.enrollments[:1])
+        baseline = {}
+        for url, _ in pages:
+            with CaptureQueriesContext(connection) as queries:
+                self.get(url)
+            baseline[url] = len(queries)
+
+        self.add_results(self.enrollments[1:])
+        for url, rows in pages:
+            with self.subTest(url=url):
+                with self.assertNumQueries(baseline[url]):
+                    response = self.get(url)
+                self.assertEqual(response.context["cl"].result_count, rows * self.N_STUDENTS)
+
+
+class FakePool:
+    """Stands in for RenderPool behind the real socket service."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+
+    def render(self, html, base_url=None, timeout=None):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return b"%PDF-" + html.encode(), {"parse": 0.0, "layout": 0.0, "write": 0.0, "pages": 1}
+
+    def stats(self):
+        return {"pool_size": 1}
+
+
+def _free_address() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def _start_service(pool) -> str:
+    address = _free_address()
+    threading.Thread(target=rendering.serve, args=(address, pool), daemon=True).start()
+    for _ in range(50):  # wait until it listens
+        try:
+            socket.create_connection(rendering.parse_address(address), timeout=0.1).close()
+            return address
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("render service did not start")
+
+
+class RenderServiceTests(TestCase):
+    """Client side of the rendering service: round trip, errors, deadline and fallback."""
+
+    def render(self, address, **settings):
+        with override_settings(PDF_RENDERER_ADDRESS=address, **settings):
+            return rendering.render_pdf_timed("<p>DMC</p>")
+
+    def test_round_trip(self):
+        address = _start_service(FakePool())
+        pdf, timings = self.render(address)
+        self.assertEqual(pdf, b"%PDF-<p>DMC</p>")
+        self.assertEqual(timings["pages"], 1)
+        with override_settings(PDF_RENDERER_ADDRESS=address):
+            self.assertEqual(rendering.service_stats(), {"pool_size": 1})
+
+    def test_service_error_is_raised(self):
+        address = _start_service(FakePool(error=TimeoutError()))
+        with self.assertLogs("results.rendering", "ERROR"), self.assertRaises(rendering.RenderServiceError):
+            self.render(address)
+
+    def test_hung_service_times_out(self):
+        address = _start_service(FakePool(delay=5))
+        started = time.monotonic()
+        with self.assertLogs("results.rendering", "ERROR"), self.assertRaises(rendering.RenderServiceError):
+            self.render(address, PDF_RENDER_CLIENT_TIMEOUT=0.3)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_falls_back_in_process_when_service_down(self):
+        with mock.patch.object(rendering, "_render", return_value=(b"%PDF-local", {})) as local:
+            with self.assertLogs("results.rendering", "WARNING"):
+                pdf, _ = self.render(_free_address())
+        self.assertEqual(pdf, b"%PDF-local")
+        local.assert_called_once()
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "SIGALRM")
+    def test_worker_deadline(self):
+        with self.assertRaises(TimeoutError):
+            with rendering._deadline(0.1):
+                time.sleep(2)
+
+    def test_view_answers_busy_when_service_fails(self):
+        batch = ResultBatch.objects.create(
+            program=Program.objects.create(name="B.Ed", total_semesters=3),
+            session=Session.objects.create(start_year=2024),
+            semester_number=1,
+        )
+        self.client.force_login(User.objects.create_user("printer", password="x"))
+        with mock.patch("results.views.render_pdf_timed", side_effect=rendering.RenderServiceError("timeout")):
+            response = self.client.get(reverse("result_notification_pdf", args=[batch.id]))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+
+class PhaseTimerTests(TestCase):
+    """results.timing.PhaseTimer: accumulation, Server-Timing and the results.pdf record."""
+
+    def timer(self, now=100.0):
+        with mock.patch.object(timing.time, "perf_counter", return_value=now):
+            return timing.PhaseTimer()
+
+    def test_phases_accumulate(self):
+        timer = self.timer()
+        with mock.patch.object(timing.time, "perf_counter", side_effect=[1.0, 1.002, 2.0, 2.003]):
+            with timer.phase("query"):
+                pass
+            with timer.phase("query"):
+                pass
+        timer.add("template", 0.004)
+        timer.update({"parse": 0.01, "layout": 0.02, "write": 0.005, "pages": 3, "unknown": 9})
+        timer.update({"layout": 0.01})
+        self.assertEqual(
+            timer.as_ms(), {"query": 5.0, "template": 4.0, "parse": 10.0, "layout": 30.0, "write": 5.0}
+        )
+        self.assertEqual(timer.info, {"pages": 3})
+
+    def test_phase_timed_when_it_raises(self):
+        timer = self.timer()
+        with self.assertRaises(ValueError), timer.phase("rows"):
+            raise ValueError
+        self.assertIn("rows", timer.durations)
+
+    def test_server_timing(self):
+        timer = self.timer(100.0)
+        timer.add("template", 0.0123)
+        timer.add("query", 0.002)
+        timer.info.update(pages=2, bytes=2048)
+        with mock.patch.object(timing.time, "perf_counter", return_value=100.25):
+            header = timer.server_timing()
+        # Phases in pipeline order, then the total and the document's size.
+        self.assertEqual(header, 'query;dur=2.0, template;dur=12.3, total;dur=250.0, pages;desc="2", bytes;desc="2048"')
+
+    def test_log_record(self):
+        timer = self.timer(100.0)
+        timer.add("query", 0.001)
+        timer.info["bytes"] = 10
+        with self.assertLogs("results.pdf", "INFO") as logs:
+            with mock.patch.object(timing.time, "perf_counter", return_value=100.5):
+                timer.log(endpoint="dmc_batch_pdf", batch_id=7, document="dmc_batch")
+        self.assertEqual(
+            json.loads(logs.records[0].getMessage()),
+            {
+                "event": "pdf_render",
+                "endpoint": "dmc_batch_pdf",
+                "batch_id": 7,
+                "document": "dmc_batch",
+                "phases_ms": {"query": 1.0},
+                "total_ms": 500.0,
+                "bytes": 10,
+            },
+        )
+
+
+@override_settings(PDF_RENDER_LOCK_DIR=tempfile.mkdtemp())
+class PdfTimingTests(CohortFixture, TestCase):
+    """Phase timings of real renders: the view's log line and header, and benchmark_pdfs."""
+
+    START_YEAR = 2019
+    SESSION_ACTIVE = False
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_cohort()
+        SemesterResult.objects.create(batch=cls.batch, enrollment=cls.enrollment, gpa=Decimal("3.00"))
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+
+    def test_view_logs_render_phases(self):
+        self.client.force_login(User.objects.create_user("printer", password="x"))
+        renderer = {"parse": 0.01, "layout": 0.02, "write": 0.003, "pages": 1}
+        with mock.patch("results.views.render_pdf_timed", return_value=(b"%PDF-", renderer)):
+            with self.assertLogs("results.pdf", "INFO") as logs:
+                response = self.client.get(reverse("dmc_batch_pdf", args=[self.batch.id]))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            {k: record[k] for k in ("event", "endpoint", "batch_id", "document", "pages", "bytes")},
+            {
+                "event": "pdf_render",
+                "endpoint": "dmc_batch_pdf",
+                "batch_id": self.batch.id,
+                "document": pdf_cache.DMC_BATCH,
+                "pages": 1,
+                "bytes": 5,
+            },
+        )
+        self.assertEqual(list(record["phases_ms"]), ["query", "rows", "template", "parse", "layout", "write"])
+        self.assertEqual(record["phases_ms"]["layout"], 20.0)
+        # The request-timing middleware appends its own entries after the view's.
+        self.assertRegex(response["Server-Timing"], r'^query;dur=[\d.]+, .*total;dur=[\d.]+, pages;desc="1", bytes;desc="5"')
+
+    def test_benchmark_reports_every_document(self):
+        archive.archive_batches([self.batch.id])  # the single DMC comes from the archive
+        renderer = {"parse": 0.01, "layout": 0.02, "write": 0.003, "pages": 1}
+        out = StringIO()
+        with mock.patch(
+            "results.management.commands.benchmark_pdfs.render_pdf_timed", return_value=(b"%PDF-", renderer)
+        ) as render:
+            call_command("benchmark_pdfs", str(self.batch.id), "--runs", "2", stdout=out)
+        self.assertEqual(render.call_count, 6)
+        output = out.getvalue()
+        for document in ("notification", "dmc_batch", "dmc"):
+            self.assertIn(f"{document}: batch={self.batch.id} runs=2 pages=1", output)
+        self.assertNotIn("skipped", output)
+        self.assertRegex(output, r"\nlayout\s+20\.0\s+20\.0\s+20\.0\s+20\.0")
+
+
+@override_settings(PDF_RENDER_LOCK_DIR=tempfile.mkdtemp())
+class ConditionalPdfTests(CohortFixture, TestCase):
+    """PDF views answer a matching If-None-Match with 304; data changes change the ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_cohort()
+        GradeScale.objects.create(
+            min_percentage=0, max_percentage=100, letter_grade="A", grade_point=4, remarks="Pass"
+        )
+        CourseResult.objects.create(batch=cls.batch, enrollment=cls.enrollment, course=cls.course, marks_obtained=80)
+        recompute_batch(cls.batch)
+        cls.user = User.objects.create_user("printer", password="x")
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.render = self.enterContext(
+            mock.patch("results.views.render_pdf_timed", return_value=(b"%PDF-", {}))
+        )
+        self.enterContext(self.assertLogs("results.pdf"))  # every test renders first
+        self.client.force_login(self.user)
+        self.urls = [
+            reverse("result_notification_pdf", args=[self.batch.id]),
+            reverse("dmc_single_pdf", args=[self.batch.id, self.enrollment.id]),
+            reverse("dmc_batch_pdf", args=[self.batch.id]),
+        ]
+
+    def etags(self):
+        etags = []
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etags.append(response["ETag"])
+        return etags
+
+    def test_matching_etag_is_answered_before_any_work(self):
+        etags = self.etags()
+        self.render.reset_mock()
+        builders = [
+            self.enterContext(mock.patch(f"results.views.{name}"))
+            for name in ("result_notification_context", "dmc_single_context", "dmc_batch_context")
+        ]
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+            sql = " ".join(q["sql"] for q in queries.captured_queries)
+            for table in ("results_semesterresult", "results_courseresult", "students_enrollment"):
+                self.assertNotIn(table, sql)
+        for build in builders:
+            build.assert_not_called()
+        self.render.assert_not_called()
+
+    def test_data_changes_change_the_etag(self):
+        def edit():
+            self.batch.refresh_from_db()
+            self.batch.notification_no = "EXAM/2024/1"
+            self.batch.save()
+
+        def import_marks():
+            book = openpyxl.Workbook()
+            book.active.append(["registration_no", "program", "session", "semester", "course_code", "terminal_marks", "maxmarks"])
+            book.active.append([self.student.registration_no, "B.Ed", self.START_YEAR, 1, self.course.code, 90, 100])
+            path = Path(tempfile.mkdtemp()) / "marks.xlsx"
+            self.addCleanup(shutil.rmtree, path.parent, ignore_errors=True)
+            book.save(path)
+            call_command("import_marks", str(path), stdout=StringIO())
+
+        etags = self.etags()
+        for change in (edit, lambda: recompute_batch(self.batch), import_marks):
+            change()
+            new_etags = self.etags()
+            for old, new in zip(etags, new_etags):
+                self.assertNotEqual(old, new)
+            # The old ETag no longer matches: the new PDF is sent.
+            self.assertEqual(self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etags[0]).status_code, 200)
+            etags = new_etags
+
+
+@override_settings(PDF_RENDER_LOCK_DIR=tempfile.mkdtemp(), PDF_RENDER_MAX_CONCURRENT=2)
+class PregenerationTests(CohortFixture, TestCase):
+    """Background PDF jobs: progress, supersession by a newer job, render slots."""
+
+    N_STUDENTS = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_cohort()
+        for enrollment in cls.enrollments:
+            SemesterResult.objects.create(batch=cls.batch, enrollment=enrollment, gpa=Decimal("3.00"))
+        cls.batch.is_locked = True
+        cls.batch.save()  # queues a job (its thread would start on commit)
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.render = self.enterContext(mock.patch.object(pregenerate, "render_pdf", return_value=b"%PDF-"))
+
+    def job(self):
+        return PdfPregeneration.objects.get(batch=self.batch)
+
+    def edit_batch(self):
+        self.batch.notification_no = f"{self.batch.notification_no}1"
+        self.batch.save()
+
+    def test_job_renders_every_document(self):
+        pregenerate.pregenerate_batch(self.batch.id)
+        job = self.job()
+        self.assertEqual((job.status, job.done, job.total), ("done", 4, 4))
+        self.assertEqual(self.render.call_count, 4)
+        enrollment_id = SemesterResult.objects.first().enrollment_id
+        self.assertEqual(pdf_cache.get(self.batch, pdf_cache.dmc_name(enrollment_id)), b"%PDF-")
+
+    def test_superseded_job_stops(self):
+        old_token = self.job().token
+        self.edit_batch()  # edited while locked: a new job takes over
+        pregenerate.pregenerate_batch(self.batch.id, old_token)
+        job = self.job()
+        self.assertNotEqual(job.token, old_token)
+        self.assertEqual((job.status, job.done), ("queued", 0))
+        self.render.assert_not_called()
+
+    def test_waits_for_a_background_slot(self):
+        with throttling.try_background_slot():
+            # While it waits, the batch is edited: the waiting job gives up.
+            with mock.patch.object(pregenerate.time, "sleep", side_effect=lambda _: self.edit_batch()) as sleep:
+                pregenerate.pregenerate_batch(self.batch.id, self.job().token)
+        sleep.assert_called_once()
+        self.render.assert_not_called()
+
+    def test_unchanged_save_keeps_cache_and_job(self):
+        pregenerate.pregenerate_batch(self.batch.id)
+        job = self.job()
+        batch = ResultBatch.objects.get(id=self.batch.id)
+        batch.save()  # e.g. the admin form saved without changes
+        batch.refresh_from_db()
+        self.assertEqual(batch.data_version, self.batch.data_version)
+        self.assertEqual((self.job().token, self.job().status), (job.token, "done"))
+        self.assertEqual(pdf_cache.get(batch, pdf_cache.DMC_BATCH), b"%PDF-")
+
+    def test_edit_rebuilds(self):
+        pregenerate.pregenerate_batch(self.batch.id)
+        token = self.job().token
+        self.edit_batch()
+        self.assertNotEqual(self.job().token, token)
+        self.assertEqual(self.job().status, "queued")
+        self.assertFalse(pdf_cache.batch_dir(self.batch.id).exists())
+
+    def test_silent_job_is_stalled(self):
+        PdfPregeneration.objects.filter(batch=self.batch).update(status="running")
+        self.assertFalse(self.job().is_stalled)
+        PdfPregeneration.objects.filter(batch=self.batch).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertTrue(self.job().is_stalled)
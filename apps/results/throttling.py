@@ -0,0 +1,137 @@
+"""Concurrency limits for heavy PDF renders.
+
+A few users printing large batches at once can occupy every WSGI worker. Each
+heavy render must therefore hold a *slot* in three scopes: global, per
+endpoint and per user. Slots are lock files (``flock``) shared by all
+processes on the host; the OS releases them automatically if a worker dies.
+
+Requests that cannot get a slot within ``PDF_RENDER_QUEUE_WAIT`` seconds get a
+503 "busy" page with ``Retry-After`` that refreshes itself, so the user is
+effectively queued instead of tying up a worker.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.shortcuts import render
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class _Slot:
+    """One held lock file."""
+
+    def __init__(self, fh):
+        self.fh = fh
+
+    def release(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fh, fcntl.LOCK_UN)
+            else:
+                self.fh.seek(0)
+                msvcrt.locking(self.fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.fh.close()
+
+
+def _try_lock(path: str):
+    fh = open(path, "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        fh.close()
+        return None
+    return _Slot(fh)
+
+
+def acquire_slot(scope: str, limit: int):
+    """Take one of ``limit`` slots for ``scope``; return a _Slot or None when all are busy."""
+    lock_dir = settings.PDF_RENDER_LOCK_DIR
+    os.makedirs(lock_dir, exist_ok=True)
+    for i in range(limit):
+        slot = _try_lock(os.path.join(lock_dir, f"{scope}.{i}.lock"))
+        if slot is not None:
+            return slot
+    return None
+
+
+def _scopes(request, endpoint: str):
+    """(scope, limit) pairs a render must hold, narrowest first. A limit <= 0 disables the scope."""
+    scopes = []
+    if request.user.is_authenticated and settings.PDF_RENDER_MAX_PER_USER > 0:
+        scopes.append((f"user-{request.user.pk}", settings.PDF_RENDER_MAX_PER_USER))
+    endpoint_limit = settings.PDF_RENDER_ENDPOINT_LIMITS.get(endpoint, 0)
+    if endpoint_limit > 0:
+        scopes.append((f"endpoint-{endpoint}", endpoint_limit))
+    if settings.PDF_RENDER_MAX_CONCURRENT > 0:
+        scopes.append(("global", settings.PDF_RENDER_MAX_CONCURRENT))
+    return scopes
+
+
+def _acquire_all(scopes, stack: ExitStack) -> bool:
+    for scope, limit in scopes:
+        slot = acquire_slot(scope, limit)
+        if slot is None:
+            return False
+        stack.callback(slot.release)
+    return True
+
+
+def try_background_slot() -> ExitStack | None:
+    """Slots for a render outside a request (pre-generation), or None when busy.
+
+    Held like a request's (``with slot: ...``): one of
+    ``PDF_PREGENERATE_MAX_CONCURRENT`` background slots plus a global one.
+    """
+    scopes = [("pregenerate", max(1, settings.PDF_PREGENERATE_MAX_CONCURRENT))]
+    if settings.PDF_RENDER_MAX_CONCURRENT > 0:
+        scopes.append(("global", settings.PDF_RENDER_MAX_CONCURRENT))
+    stack = ExitStack()
+    if _acquire_all(scopes, stack):
+        return stack
+    stack.close()
+    return None
+
+
+def run_with_render_slot(request, endpoint: str, func):
+    """Return ``func()`` while holding a render slot, or a 503 "busy" page when none frees up in time."""
+    scopes = _scopes(request, endpoint)
+    deadline = time.monotonic() + settings.PDF_RENDER_QUEUE_WAIT
+
+    while True:
+        with ExitStack() as stack:
+            if _acquire_all(scopes, stack):
+                return func()
+        # Partially acquired slots were released by the ExitStack.
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(0.25)
+
+    return busy_response(request)
+
+
+def busy_response(request):
+    """503 "busy" page that retries itself after ``PDF_RENDER_RETRY_AFTER`` seconds."""
+    retry_after = settings.PDF_RENDER_RETRY_AFTER
+    response = render(
+        request,
+        "results/render_busy.html",
+        {"retry_after": retry_after},
+        status=503,
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
@@ -0,0 +1,69 @@
+"""Per-phase timing for the PDF pipeline.
+
+Phases: query, rows, template (render_to_string), parse (WeasyPrint ``HTML()``),
+layout (``document.render()``) and write (``write_pdf``). Timings are emitted as
+one JSON log line on the ``results.pdf`` logger and as a ``Server-Timing``
+response header.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("results.pdf")
+
+PHASES = ("query", "rows", "template", "parse", "layout", "write")
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.durations: dict[str, float] = {}  # phase -> seconds (accumulated)
+        self.info: dict = {}                   # pages, bytes, ...
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def update(self, timings: dict):
+        """Merge renderer timings: {"parse": s, "layout": s, "write": s, "pages": n}."""
+        for name in ("parse", "layout", "write"):
+            if name in timings:
+                self.add(name, timings[name])
+        if "pages" in timings:
+            self.info["pages"] = timings["pages"]
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._started
+
+    def as_ms(self) -> dict:
+        return {name: round(self.durations[name] * 1000, 1) for name in PHASES if name in self.durations}
+
+    def server_timing(self) -> str:
+        parts = [f"{name};dur={ms}" for name, ms in self.as_ms().items()]
+        parts.append(f"total;dur={round(self.total * 1000, 1)}")
+        for key in ("pages", "bytes"):
+            if key in self.info:
+                parts.append(f'{key};desc="{self.info[key]}"')
+        return ", ".join(parts)
+
+    def log(self, **fields):
+        record = {
+            "event": "pdf_render",
+            **fields,
+            "phases_ms": self.as_ms(),
+            "total_ms": round(self.total * 1000, 1),
+            **self.info,
+        }
+        logger.info(json.dumps(record, default=str))
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from dashboards.admin_filters import AutocompleteListFilter
+
 from .models import Student, Enrollment
 
 
@@ -13,5 +15,11 @@ class StudentAdmin(admin.ModelAdmin):
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ("student", "program", "session", "roll_no", "department", "is_active")
-    list_filter = ("department", "program", "session", "is_active")
+    list_filter = (
+        "department",
+        ("program", AutocompleteListFilter),
+        ("session", AutocompleteListFilter),
+        "is_active",
+    )
     search_fields = ("roll_no", "student__name", "student__registration_no")
+    autocomplete_fields = ("student",)
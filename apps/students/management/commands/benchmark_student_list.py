@@ -0,0 +1,159 @@
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from academics.models import Program, Session, get_default_department_id
+from students import search
+from students.models import Enrollment, Student, enrolled_in
+
+
+def _percentile(values, p):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def join_distinct(program_id, session_id, q):
+    """The old student_list filter: JOIN enrollments + DISTINCT."""
+    lookups = {}
+    if program_id:
+        lookups["enrollments__program_id"] = program_id
+    if session_id:
+        lookups["enrollments__session_id"] = session_id
+    return search.filter_students(Student.objects.filter(**lookups), q).distinct()
+
+
+def exists_subquery(program_id, session_id, q):
+    """The current student_list filter: correlated EXISTS."""
+    qs = Student.objects.filter(enrolled_in(program_id, session_id))
+    return search.filter_students(qs, q)
+
+
+VARIANTS = (
+    ("join+distinct", join_distinct),
+    ("exists", exists_subquery),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the student list's program/session filter (JOIN + DISTINCT vs EXISTS). "
+        "Use --synthetic N to run against N generated students (rolled back afterwards)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--program", type=int, help="Program id (default: the most enrolled one)")
+        parser.add_argument("--session", type=int, help="Session id (default: the most enrolled one)")
+        parser.add_argument("--q", default="", help="Search text combined with the filter")
+        parser.add_argument("--runs", type=int, default=20, help="Runs per variant (default 20)")
+        parser.add_argument("--synthetic", type=int, default=0, help="Generate N students first (default: use existing data)")
+        parser.add_argument("--enrollments", type=int, default=3, help="Max enrollments per synthetic student (default 3)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["synthetic"]:
+                self._generate(options["synthetic"], max(1, options["enrollments"]))
+            try:
+                self._benchmark(options)
+            finally:
+                if options["synthetic"]:
+                    transaction.set_rollback(True)
+
+    def _generate(self, n_students, max_enrollments):
+        started = time.perf_counter()
+        department_id = get_default_department_id()
+        programs = [
+            Program.objects.create(name=f"Benchmark Program {i}", total_semesters=8, department_id=department_id)
+            for i in range(10)
+        ]
+        first_year = (Session.objects.order_by("start_year").values_list("start_year", flat=True).first() or 2000) - 20
+        sessions = [Session.objects.create(start_year=first_year - i) for i in range(10)]
+
+        rng = random.Random(1524)
+        students = Student.objects.bulk_create(
+            [
+                Student(
+                    department_id=department_id,
+                    name=f"Benchmark Student {i:07d}",
+                    father_name="Benchmark",
+                    registration_no=f"BENCH-{i:07d}",
+                )
+                for i in range(n_students)
+            ],
+            batch_size=2000,
+        )
+        enrollments = []
+        for i, student in enumerate(students):
+            for j, (program, session) in enumerate(
+                rng.sample([(p, s) for p in programs for s in sessions], rng.randint(1, max_enrollments))
+            ):
+                enrollments.append(
+                    Enrollment(
+                        department_id=department_id,
+                        student=student,
+                        program=program,
+                        session=session,
+                        roll_no=f"BENCH-{i:07d}-{j}",
+                    )
+                )
+        Enrollment.objects.bulk_create(enrollments, batch_size=2000)
+        search.rebuild()
+        if connection.vendor in ("sqlite", "postgresql"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        self.stdout.write(
+            f"Generated {len(students)} students / {len(enrollments)} enrollments "
+            f"in {time.perf_counter() - started:.1f}s (rolled back afterwards)"
+        )
+
+    def _benchmark(self, options):
+        program_id = options["program"] or self._busiest("program_id")
+        session_id = options["session"] or self._busiest("session_id")
+        if not program_id and not session_id:
+            raise CommandError("No enrollments to filter by (use --synthetic N).")
+
+        q = options["q"]
+        runs = max(1, options["runs"])
+        page_size = settings.LIST_PAGE_SIZE
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\nprogram={program_id} session={session_id} q={q!r} runs={runs} page={page_size}")
+        )
+        self.stdout.write(f"{'variant':<16}{'rows':>8}{'p50':>10}{'p95':>10}{'max':>10}   (ms, first page)")
+
+        results = {}
+        for name, build in VARIANTS:
+            qs = build(program_id, session_id, q)
+            rows = qs.count()
+            samples = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                list(qs.order_by("name", "id").values_list("id", flat=True)[: page_size + 1])
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            results[name] = _percentile(samples, 50)
+            self.stdout.write(
+                f"{name:<16}{rows:>8}"
+                + "".join(f"{_percentile(samples, p):>10.2f}" for p in (50, 95))
+                + f"{samples[-1]:>10.2f}"
+            )
+
+        old, new = results["join+distinct"], results["exists"]
+        if new:
+            self.stdout.write(f"speedup (p50): {old / new:.1f}x")
+
+    def _busiest(self, field):
+        return (
+            Enrollment.objects.values(field)
+            .annotate(n=Count("id"))
+            .order_by("-n")
+            .values_list(field, flat=True)
+            .first()
+        )
@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
+from students import search
 from students.models import Student, Enrollment
 from academics.models import Program, Session
+from dashboards import counters
 import openpyxl
 
 
@@ -16,6 +18,8 @@ class Command(BaseCommand):
         parser.add_argument("--program", required=True, help="Program name (match or partial match)")
         parser.add_argument("--session", required=True, type=int, help="Session start year e.g. 2022")
 
+    @counters.batched()
+    @search.batched()
     def handle(self, *args, **options):
         file_path = options["file"]
         program_text = str(options["program"]).strip()
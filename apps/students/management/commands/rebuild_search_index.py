@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from students import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the student/enrollment search index (SQLite FTS5)."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
@@ -0,0 +1,67 @@
+"""Search index for students/enrollments (see students.search).
+
+SQLite: FTS5 tables, filled from the existing rows.
+PostgreSQL: pg_trgm GIN indexes matching Django's UPPER(...) LIKE lookups.
+Other databases: nothing (search falls back to icontains).
+"""
+
+from django.db import migrations
+
+# Keep in sync with students.search.FTS_OPTIONS
+FTS_OPTIONS = "tokenize = \"unicode61 tokenchars '-/.'\", prefix = '2 3'"
+
+PG_INDEXES = [
+    ("student_name_trgm", "students_student", "name"),
+    ("student_regno_trgm", "students_student", "registration_no"),
+    ("enrollment_rollno_trgm", "students_enrollment", "roll_no"),
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS students_student_fts "
+            f"USING fts5(registration_no, name, {FTS_OPTIONS})"
+        )
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS students_enrollment_fts "
+            f"USING fts5(roll_no, registration_no, name, {FTS_OPTIONS})"
+        )
+        schema_editor.execute(
+            "INSERT INTO students_student_fts (rowid, registration_no, name) "
+            "SELECT id, registration_no, name FROM students_student"
+        )
+        schema_editor.execute(
+            "INSERT INTO students_enrollment_fts (rowid, roll_no, registration_no, name) "
+            "SELECT e.id, e.roll_no, s.registration_no, s.name "
+            "FROM students_enrollment e JOIN students_student s ON s.id = e.student_id"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in PG_INDEXES:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS students_student_fts")
+        schema_editor.execute("DROP TABLE IF EXISTS students_enrollment_fts")
+    elif vendor == "postgresql":
+        for name, _, _ in PG_INDEXES:
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("students", "0003_student_student_name_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
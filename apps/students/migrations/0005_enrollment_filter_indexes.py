@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0005_alter_course_title'),
+        ('students', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['program', 'session', 'student'], name='enroll_prog_sess_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['session', 'student'], name='enroll_session_student_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+"""Enrollment.roll_sort_key: natural-order key of roll_no, filled for existing rows."""
+
+import re
+
+from django.db import migrations, models
+
+_DIGITS = re.compile(r"\d+")
+
+
+def roll_sort_key(roll_no):
+    # Frozen copy of students.models.roll_sort_key
+    key = _DIGITS.sub(lambda m: m.group().lstrip("0").rjust(10, "0"), (roll_no or "").strip().upper())
+    return key[:255]
+
+
+def fill_roll_sort_key(apps, schema_editor):
+    Enrollment = apps.get_model("students", "Enrollment")
+    batch = []
+    for enrollment in Enrollment.objects.only("id", "roll_no").iterator(chunk_size=2000):
+        enrollment.roll_sort_key = roll_sort_key(enrollment.roll_no)
+        batch.append(enrollment)
+        if len(batch) >= 2000:
+            Enrollment.objects.bulk_update(batch, ["roll_sort_key"])
+            batch = []
+    if batch:
+        Enrollment.objects.bulk_update(batch, ["roll_sort_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0005_alter_course_title'),
+        ('students', '0005_enrollment_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='enrollment',
+            options={'ordering': ['program', 'roll_sort_key']},
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='roll_sort_key',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_roll_sort_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['program', 'session', 'roll_sort_key'], name='enroll_prog_sess_roll_key_idx'),
+        ),
+    ]
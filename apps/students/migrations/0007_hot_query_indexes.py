@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:58
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_course_course_code_lower_idx'),
+        ('students', '0006_enrollment_roll_sort_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', 'program', 'session'], name='enroll_student_prog_sess_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.text.Lower('registration_no'), name='student_regno_lower_idx'),
+        ),
+    ]
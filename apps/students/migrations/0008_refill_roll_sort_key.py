@@ -0,0 +1,45 @@
+"""Enrollment.roll_sort_key: length-prefixed digit runs (any number of digits).
+
+0006 zero-padded digit runs to 10 places, which sorts runs of 11+ digits
+wrongly; every key is recomputed with the current scheme.
+"""
+
+import re
+
+from django.db import migrations
+
+_DIGITS = re.compile(r"\d+")
+
+
+def _number_key(match):
+    digits = match.group().lstrip("0")
+    return f"{len(digits):02d}{digits}"
+
+
+def roll_sort_key(roll_no):
+    # Frozen copy of students.models.roll_sort_key
+    return _DIGITS.sub(_number_key, (roll_no or "").strip().upper())[:255]
+
+
+def fill_roll_sort_key(apps, schema_editor):
+    Enrollment = apps.get_model("students", "Enrollment")
+    batch = []
+    for enrollment in Enrollment.objects.only("id", "roll_no").iterator(chunk_size=2000):
+        enrollment.roll_sort_key = roll_sort_key(enrollment.roll_no)
+        batch.append(enrollment)
+        if len(batch) >= 2000:
+            Enrollment.objects.bulk_update(batch, ["roll_sort_key"])
+            batch = []
+    if batch:
+        Enrollment.objects.bulk_update(batch, ["roll_sort_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_roll_sort_key, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,33 @@
+import re
+
 from django.db import models
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Lower
+
+from academics.models import Department, Program, Session, get_default_department_id, related_department_id
+
+
+ROLL_SORT_KEY_LENGTH = 255
+_DIGITS = re.compile(r"\d+")
 
-from academics.models import Department, Program, Session, get_default_department
+
+def _number_key(match) -> str:
+    digits = match.group().lstrip("0")
+    return f"{len(digits):02d}{digits}"
+
+
+def roll_sort_key(roll_no: str) -> str:
+    """Natural-order key for a roll number: every digit run prefixed with its length.
+
+    "BD1524-2" -> "BD041524-012", so a plain string ORDER BY gives BD1524-1,
+    BD1524-2, ... BD1524-10 whatever the prefix looks like: a longer number
+    sorts after a shorter one, numbers of equal length compare digit by digit.
+    Leading zeros are dropped ("BD1524-09" sorts with "BD1524-9"). Roll
+    numbers are at most 50 characters, so the length fits two digits and the
+    key stays well within ``ROLL_SORT_KEY_LENGTH``.
+    """
+    key = _DIGITS.sub(_number_key, (roll_no or "").strip().upper())
+    return key[:ROLL_SORT_KEY_LENGTH]
 
 
 class Student(models.Model):
@@ -13,10 +40,16 @@ class Student(models.Model):
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # Keyset pagination of the student list
+            models.Index(fields=["name", "id"], name="student_name_id_idx"),
+            # Imports match registration numbers case-insensitively (registration_no__lower=...)
+            models.Index(Lower("registration_no"), name="student_regno_lower_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.department_id:
-            self.department = get_default_department()
+            self.department_id = get_default_department_id()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -35,23 +68,51 @@ class Enrollment(models.Model):
     program = models.ForeignKey(Program, on_delete=models.PROTECT)
     session = models.ForeignKey(Session, on_delete=models.PROTECT)
     roll_no = models.CharField(max_length=50)
+    # Derived from roll_no on save (see roll_sort_key); order by this.
+    roll_sort_key = models.CharField(max_length=ROLL_SORT_KEY_LENGTH, blank=True, editable=False)
 
     is_active = models.BooleanField(default=True)
 
     class Meta:
         unique_together = ("program", "session", "roll_no")
-        ordering = ["program", "roll_no"]
+        ordering = ["program", "roll_sort_key"]
+        indexes = [
+            # Roll-number order within a program/session (documents, lists)
+            models.Index(fields=["program", "session", "roll_sort_key"], name="enroll_prog_sess_roll_key_idx"),
+            # enrolled_in(): answered from the index alone
+            models.Index(fields=["program", "session", "student"], name="enroll_prog_sess_student_idx"),
+            models.Index(fields=["session", "student"], name="enroll_session_student_idx"),
+            # Imports: existing enrollment of a student in a program/session
+            models.Index(fields=["student", "program", "session"], name="enroll_student_prog_sess_idx"),
+        ]
 
     def save(self, *args, **kwargs):
+        self.roll_sort_key = roll_sort_key(self.roll_no)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "roll_no" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "roll_sort_key"}
         if not self.department_id:
             # Keep in sync with student/program department
-            if self.student_id and getattr(self.student, "department_id", None):
-                self.department_id = self.student.department_id
-            elif self.program_id and getattr(self.program, "department_id", None):
-                self.department_id = self.program.department_id
-            else:
-                self.department = get_default_department()
+            self.department_id = (
+                related_department_id(self, "student")
+                or related_department_id(self, "program")
+                or get_default_department_id()
+            )
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.program.name} | {self.session.start_year} | {self.roll_no}"
+
+
+def enrolled_in(program_id=None, session_id=None) -> Exists:
+    """``Exists`` for Student querysets: has an enrollment in the program / session.
+
+    A correlated subquery instead of joining ``enrollments``, so the student
+    list needs no DISTINCT.
+    """
+    enrollments = Enrollment.objects.filter(student_id=OuterRef("pk"))
+    if program_id:
+        enrollments = enrollments.filter(program_id=program_id)
+    if session_id:
+        enrollments = enrollments.filter(session_id=session_id)
+    return Exists(enrollments)
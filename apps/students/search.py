@@ -0,0 +1,267 @@
+"""Indexed student / enrollment search.
+
+``icontains`` ORs over name, registration no and roll no scan the whole table.
+Instead:
+
+* SQLite: FTS5 tables ``students_student_fts`` (registration_no, name) and
+  ``students_enrollment_fts`` (roll_no, registration_no, name), rowid = the
+  model id. Each search word is a prefix match ("bd1524-1" finds BD1524-10);
+  ``-``, ``/`` and ``.`` are part of words so roll/registration numbers stay
+  whole. Matches are ranked with bm25, exact words first.
+* PostgreSQL: trigram GIN indexes (pg_trgm) on the same columns, which the
+  ``istartswith`` / ``icontains`` lookups use; names are ranked by similarity.
+* Other databases: plain ``icontains``.
+
+The FTS tables are created by migration ``students.0004`` and kept in sync by
+the signals below; imports wrap their work in :func:`batched` so each changed
+row is re-indexed once at the end. ``manage.py rebuild_search_index`` rebuilds
+them from scratch.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Enrollment, Student
+
+STUDENT_FTS = "students_student_fts"
+ENROLLMENT_FTS = "students_enrollment_fts"
+
+# Shared with the migration that creates the tables.
+FTS_OPTIONS = "tokenize = \"unicode61 tokenchars '-/.'\", prefix = '2 3'"
+
+_CHUNK = 500
+_WORD = re.compile(r"[^\W_]")
+_local = threading.local()
+
+
+def _uses_fts() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def match_expression(q: str) -> str:
+    """FTS5 query: every word must match, as a whole word or as a prefix.
+
+    Empty when ``q`` has no letter or digit ("%%%", "-"): nothing can match.
+    """
+    words = [word for word in re.findall(r"[\w\-/.]+", q.lower()) if _WORD.search(word)]
+    terms = []
+    for word in words:
+        quoted = '"' + word.replace('"', '""') + '"'
+        terms.append(f"({quoted} OR {quoted}*)")
+    return " AND ".join(terms)
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for i in range(0, len(ids), _CHUNK):
+        yield ids[i : i + _CHUNK]
+
+
+# ======================================================
+# QUERIES
+# ======================================================
+
+def filter_students(queryset, q: str):
+    """Students matching ``q`` (registration no prefix or name words)."""
+    q = (q or "").strip()
+    if not q:
+        return queryset
+    expr = match_expression(q)
+    if not expr:
+        return queryset.none()
+    if _uses_fts():
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {STUDENT_FTS} WHERE {STUDENT_FTS} MATCH %s", [expr])
+        )
+    if connection.vendor == "postgresql":
+        return queryset.filter(Q(registration_no__istartswith=q) | Q(name__icontains=q))
+    return queryset.filter(Q(registration_no__icontains=q) | Q(name__icontains=q))
+
+
+def filter_enrollments(queryset, q: str):
+    """Enrollments matching ``q`` (roll no / registration no prefix or student name words)."""
+    q = (q or "").strip()
+    if not q:
+        return queryset
+    expr = match_expression(q)
+    if not expr:
+        return queryset.none()
+    if _uses_fts():
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {ENROLLMENT_FTS} WHERE {ENROLLMENT_FTS} MATCH %s", [expr])
+        )
+    if connection.vendor == "postgresql":
+        return queryset.filter(
+            Q(roll_no__istartswith=q)
+            | Q(student__registration_no__istartswith=q)
+            | Q(student__name__icontains=q)
+        )
+    return queryset.filter(
+        Q(roll_no__icontains=q)
+        | Q(student__registration_no__icontains=q)
+        | Q(student__name__icontains=q)
+    )
+
+
+def ranked_student_ids(q: str, limit: int = 20, department_id=None) -> list[int]:
+    """Ids of the best ``limit`` student matches for ``q``, best first."""
+    q = (q or "").strip()
+    expr = match_expression(q)
+    if not expr:
+        return []
+    if _uses_fts():
+        sql = f"SELECT f.rowid FROM {STUDENT_FTS} f "
+        params = [expr]
+        if department_id:
+            sql += "JOIN students_student s ON s.id = f.rowid "
+        sql += f"WHERE {STUDENT_FTS} MATCH %s "
+        if department_id:
+            sql += "AND s.department_id = %s "
+            params.append(department_id)
+        sql += f"ORDER BY bm25({STUDENT_FTS}, 2.0, 1.0), f.name LIMIT %s"
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    qs = Student.objects.all()
+    if department_id:
+        qs = qs.filter(department_id=department_id)
+    qs = filter_students(qs, q)
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        qs = qs.annotate(similarity=TrigramSimilarity("name", q)).order_by("-similarity", "name")
+    else:
+        qs = qs.order_by("name")
+    return list(qs.values_list("id", flat=True)[:limit])
+
+
+# ======================================================
+# INDEX MAINTENANCE (SQLite FTS5)
+# ======================================================
+
+def index_students(ids):
+    if not _uses_fts():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            marks = ",".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {STUDENT_FTS} WHERE rowid IN ({marks})", chunk)
+            cursor.execute(
+                f"INSERT INTO {STUDENT_FTS} (rowid, registration_no, name) "
+                f"SELECT id, registration_no, name FROM students_student WHERE id IN ({marks})",
+                chunk,
+            )
+
+
+def index_enrollments(ids):
+    if not _uses_fts():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            marks = ",".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {ENROLLMENT_FTS} WHERE rowid IN ({marks})", chunk)
+            cursor.execute(
+                f"INSERT INTO {ENROLLMENT_FTS} (rowid, roll_no, registration_no, name) "
+                f"SELECT e.id, e.roll_no, s.registration_no, s.name "
+                f"FROM students_enrollment e JOIN students_student s ON s.id = e.student_id "
+                f"WHERE e.id IN ({marks})",
+                chunk,
+            )
+
+
+def _unindex(table, ids):
+    if not _uses_fts():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            marks = ",".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {table} WHERE rowid IN ({marks})", chunk)
+
+
+def rebuild():
+    """Re-index every student and enrollment."""
+    if not _uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {STUDENT_FTS}")
+        cursor.execute(
+            f"INSERT INTO {STUDENT_FTS} (rowid, registration_no, name) "
+            f"SELECT id, registration_no, name FROM students_student"
+        )
+        cursor.execute(f"DELETE FROM {ENROLLMENT_FTS}")
+        cursor.execute(
+            f"INSERT INTO {ENROLLMENT_FTS} (rowid, roll_no, registration_no, name) "
+            f"SELECT e.id, e.roll_no, s.registration_no, s.name "
+            f"FROM students_enrollment e JOIN students_student s ON s.id = e.student_id"
+        )
+
+
+@contextmanager
+def batched():
+    """Defer re-indexing of rows saved inside the block to its end (imports)."""
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+
+    _local.pending = pending = {"students": set(), "enrollments": set()}
+    try:
+        yield
+    except BaseException:
+        # Same as dashboards.counters.batched: best effort, rebuild repairs.
+        _local.pending = None
+        try:
+            _flush(pending)
+        except Exception:
+            pass
+        raise
+    _local.pending = None
+    _flush(pending)
+
+
+def _flush(pending):
+    index_students(pending["students"])
+    index_enrollments(pending["enrollments"])
+
+
+def _reindex(kind, ids):
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending[kind].update(ids)
+    elif kind == "students":
+        index_students(ids)
+    else:
+        index_enrollments(ids)
+
+
+@receiver(post_save, sender=Student)
+def _student_saved(sender, instance, created, **kwargs):
+    _reindex("students", [instance.id])
+    if not created:
+        # Enrollment rows carry the student's name / registration no.
+        _reindex("enrollments", instance.enrollments.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Enrollment)
+def _enrollment_saved(sender, instance, **kwargs):
+    _reindex("enrollments", [instance.id])
+
+
+@receiver(post_delete, sender=Student)
+def _student_deleted(sender, instance, **kwargs):
+    _unindex(STUDENT_FTS, [instance.id])
+
+
+@receiver(post_delete, sender=Enrollment)
+def _enrollment_deleted(sender, instance, **kwargs):
+    _unindex(ENROLLMENT_FTS, [instance.id])
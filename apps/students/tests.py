@@ -1,3 +1,244 @@
-from django.test import TestCase
+import importlib
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from academics.models import Program, Session
+from config.sqlite_backend.base import DatabaseWrapper
+from students import search
+from students.models import Enrollment, Student, roll_sort_key
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "SQLite tuning")
+class SQLiteConcurrencyTests(SimpleTestCase):
+    """Page views keep reading while an import writes (WAL + busy_timeout).
+
+    Runs against a throwaway database file (the test database is in memory,
+    which has no WAL), with the project's database settings.
+    """
+
+    BUSY_TIMEOUT_MS = 3000
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.path = os.path.join(tmp, "concurrency.sqlite3")
+        self.settings_dict = {
+            **connection.settings_dict,
+            "NAME": self.path,
+            "PRAGMAS": {**connection.settings_dict.get("PRAGMAS", {}), "busy_timeout": self.BUSY_TIMEOUT_MS},
+        }
+        self.connections = []
+        conn = self.connect()
+        conn.execute("CREATE TABLE enrollment (id INTEGER PRIMARY KEY, roll_no TEXT)")
+        conn.executemany("INSERT INTO enrollment (roll_no) VALUES (?)", [(f"BD1524-{i}",) for i in range(100)])
+
+    def tearDown(self):
+        for conn in self.connections:
+            conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        os.rmdir(os.path.dirname(self.path))
+
+    def connect(self):
+        wrapper = DatabaseWrapper(self.settings_dict, alias="concurrency")
+        # Raw connection (shareable across threads), in autocommit mode like Django's
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        conn.isolation_level = None
+        self.connections.append(conn)
+        return conn
+
+    def test_pragmas_applied(self):
+        conn = self.connect()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], self.BUSY_TIMEOUT_MS)
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)  # MEMORY
+
+    def test_reader_not_blocked_by_import_writer(self):
+        writer, reader = self.connect(), self.connect()
+
+        # The "import": an open write transaction with uncommitted rows.
+        writer.execute("BEGIN IMMEDIATE")
+        writer.executemany("INSERT INTO enrollment (roll_no) VALUES (?)", [(f"BD1525-{i}",) for i in range(500)])
+
+        started = time.monotonic()
+        count = reader.execute("SELECT COUNT(*) FROM enrollment").fetchone()[0]
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(count, 100)  # the last committed snapshot
+        self.assertLess(elapsed, 0.5)  # answered immediately, not after busy_timeout
+
+        writer.execute("COMMIT")
+        self.assertEqual(reader.execute("SELECT COUNT(*) FROM enrollment").fetchone()[0], 600)
+
+    def test_second_writer_waits_instead_of_failing(self):
+        first, second = self.connect(), self.connect()
+        first.execute("BEGIN IMMEDIATE")
+        first.execute("INSERT INTO enrollment (roll_no) VALUES ('BD1526-1')")
+
+        # The first import finishes a moment later.
+        timer = threading.Timer(0.3, lambda: first.execute("COMMIT"))
+        timer.start()
+        try:
+            started = time.monotonic()
+            second.execute("BEGIN IMMEDIATE")  # waits on busy_timeout
+            second.execute("INSERT INTO enrollment (roll_no) VALUES ('BD1526-2')")
+            second.execute("COMMIT")
+        finally:
+            timer.join()
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(second.execute("SELECT COUNT(*) FROM enrollment").fetchone()[0], 102)
+
+
+class SearchTests(TestCase):
+    """students.search: prefix matching, ranking and the FTS index kept in sync."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.program = Program.objects.create(name="B.Ed", total_semesters=4)
+        cls.session = Session.objects.create(start_year=2024)
+        cls.ali = cls.student("REG-2024-001", "Ali Raza", "BD1524-1")
+        cls.alina = cls.student("REG-2024-002", "Alina Shah", "BD1524-10")
+        cls.sara = cls.student("ABC-2023-777", "Sara Ali", "BD1524-2")
+
+    @classmethod
+    def student(cls, registration_no, name, roll_no):
+        student = Student.objects.create(name=name, father_name="Father", registration_no=registration_no)
+        Enrollment.objects.create(student=student, program=cls.program, session=cls.session, roll_no=roll_no)
+        return student
+
+    def students(self, q):
+        return set(search.filter_students(Student.objects.all(), q).values_list("name", flat=True))
+
+    def rolls(self, q):
+        return set(search.filter_enrollments(Enrollment.objects.all(), q).values_list("roll_no", flat=True))
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.students("reg-2024"), {"Ali Raza", "Alina Shah"})
+        self.assertEqual(self.students("ali"), {"Ali Raza", "Alina Shah", "Sara Ali"})
+        self.assertEqual(self.students("ali raz"), {"Ali Raza"})
+        self.assertEqual(self.rolls("bd1524-1"), {"BD1524-1", "BD1524-10"})
+        self.assertEqual(self.rolls("BD1524-2"), {"BD1524-2"})
+        self.assertEqual(self.rolls("abc-2023"), {"BD1524-2"})  # registration no
+        self.assertEqual(self.rolls("shah"), {"BD1524-10"})  # student name
+
+    def test_blank_query_filters_nothing(self):
+        self.assertEqual(len(self.students("  ")), 3)
+        self.assertEqual(len(self.rolls("")), 3)
+
+    def test_query_without_words_matches_nothing(self):
+        for q in ("%%%", "-", "_", "./"):
+            with self.subTest(q=q):
+                self.assertEqual(search.match_expression(q), "")
+                self.assertEqual(self.students(q), set())
+                self.assertEqual(self.rolls(q), set())
+                self.assertEqual(search.ranked_student_ids(q), [])
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "FTS5 ranking")
+    def test_ranking_puts_whole_words_first(self):
+        ids = search.ranked_student_ids("ali")
+        self.assertEqual(set(ids), {self.ali.id, self.alina.id, self.sara.id})
+        self.assertEqual(ids[-1], self.alina.id)  # "ali" only as a prefix
+        self.assertEqual(search.ranked_student_ids("ali", limit=1), [ids[0]])
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "FTS5 index")
+    def test_index_follows_inserts_updates_and_deletes(self):
+        self.assertEqual(self.students("zainab"), set())
+
+        zainab = self.student("REG-2024-003", "Zainab Bibi", "BD1524-3")
+        self.assertEqual(self.students("zainab"), {"Zainab Bibi"})
+        self.assertEqual(self.rolls("zainab"), {"BD1524-3"})
+
+        # A student's name / registration no is indexed on their enrollments too.
+        zainab.name = "Zara Bibi"
+        zainab.registration_no = "NEW-2024-003"
+        zainab.save()
+        self.assertEqual(self.students("zainab"), set())
+        self.assertEqual(self.students("zara"), {"Zara Bibi"})
+        self.assertEqual(self.rolls("new-2024"), {"BD1524-3"})
+        self.assertEqual(self.rolls("zainab"), set())
+
+        enrollment = zainab.enrollments.get()
+        enrollment.roll_no = "BD1524-30"
+        enrollment.save()
+        self.assertEqual(self.rolls("bd1524-3"), {"BD1524-30"})
+
+        enrollment.delete()
+        self.assertEqual(self.rolls("zara"), set())
+        zainab.delete()
+        self.assertEqual(self.students("zara"), set())
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {search.STUDENT_FTS}")
+            self.assertEqual(cursor.fetchone()[0], 3)
+            cursor.execute(f"SELECT COUNT(*) FROM {search.ENROLLMENT_FTS}")
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "FTS5 index")
+    def test_batched_indexes_once_at_the_end(self):
+        with search.batched():
+            self.student("REG-2024-004", "Hina Noor", "BD1524-4")
+            self.assertEqual(self.students("hina"), set())
+        self.assertEqual(self.students("hina"), {"Hina Noor"})
+        self.assertEqual(self.rolls("hina"), {"BD1524-4"})
+
+
+class RollSortKeyTests(TestCase):
+    """Enrollment.roll_sort_key orders roll numbers naturally."""
+
+    ORDERED = [
+        "BD1523-7",
+        "BD1524-1",
+        "BD1524-2",
+        "BD1524-9",
+        "BD1524-10",
+        "BD1524-99",
+        "BD1524-100",
+        "BD1524-9999999999",
+        "BD1524-10000000000",  # 11 digits
+        "BD1524-123456789012345",
+        "BD1524-A",  # digits sort before letters
+        "BD15240-1",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        program = Program.objects.create(name="B.Ed", total_semesters=4)
+        session = Session.objects.create(start_year=2024)
+        rolls = list(cls.ORDERED)
+        random.Random(1).shuffle(rolls)
+        for i, roll_no in enumerate(rolls):
+            student = Student.objects.create(name=f"Student {i}", father_name="Khan", registration_no=f"REG-{i}")
+            Enrollment.objects.create(student=student, program=program, session=session, roll_no=roll_no)
+
+    def test_natural_order(self):
+        self.assertEqual(list(Enrollment.objects.order_by("roll_sort_key").values_list("roll_no", flat=True)), self.ORDERED)
+        self.assertLess(roll_sort_key("BD1524-9"), roll_sort_key("BD1524-10"))
+
+    def test_key(self):
+        self.assertEqual(roll_sort_key(" bd1524-2 "), "BD041524-012")
+        self.assertEqual(roll_sort_key("BD1524-09"), roll_sort_key("BD1524-9"))
+        self.assertEqual(roll_sort_key(""), "")
+        self.assertLessEqual(len(roll_sort_key("1-" * 25)), 255)
+
+    def test_roll_no_change_updates_key(self):
+        enrollment = Enrollment.objects.get(roll_no="BD1524-1")
+        enrollment.roll_no = "BD1524-1000"
+        enrollment.save(update_fields=["roll_no"])
+        self.assertEqual(Enrollment.objects.get(id=enrollment.id).roll_sort_key, roll_sort_key("BD1524-1000"))
+
+    def test_migration_backfills_keys(self):
+        migration = importlib.import_module("students.migrations.0008_refill_roll_sort_key")
+        Enrollment.objects.update(roll_sort_key="")  # rows as 0006 / an old release left them
+        migration.fill_roll_sort_key(django_apps, None)
+        self.assertEqual(list(Enrollment.objects.order_by("roll_sort_key").values_list("roll_no", flat=True)), self.ORDERED)
+        for roll_no in self.ORDERED:
+            self.assertEqual(migration.roll_sort_key(roll_no), roll_sort_key(roll_no))
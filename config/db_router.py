@@ -0,0 +1,114 @@
+"""Read-replica routing.
+
+Views wrapped in :func:`read_from_replica` (PDFs, dashboards, document
+previews) read from the ``replica`` database alias; everything else, every
+write and every read inside a transaction on ``default`` (imports, recompute)
+uses ``default``.
+
+Replicas lag, so after a request writes, :class:`ReplicaStickyMiddleware`
+pins that session's reads to ``default`` for ``DB_REPLICA_STICKY_SECONDS``:
+an editor who just imported marks sees them in the next PDF.
+
+Without a ``replica`` alias in ``DATABASES`` (the default) all of this is a
+no-op. Locally, two SQLite files kept in sync with ``manage.py sync_replica``
+stand in for a replicated server.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = "replica"
+
+# Session key: time until which the session reads from default.
+STICKY_SESSION_KEY = "_db_sticky_until"
+
+# Login, sessions and permissions must never see a lagging copy.
+PRIMARY_ONLY_APPS = {"auth", "contenttypes", "sessions", "admin"}
+
+# Per request: whether reads may go to the replica / whether anything was written.
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+_wrote: ContextVar[list | None] = ContextVar("db_wrote", default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def _is_sticky(request) -> bool:
+    session = getattr(request, "session", None)
+    return session is not None and session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+def _wrote_in_request() -> bool:
+    return bool(_wrote.get())
+
+
+def read_from_replica(view):
+    """Let the view's reads go to the replica (unless its session just wrote)."""
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if not replica_configured() or _is_sticky(request):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapped
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and not _wrote_in_request()
+            and model._meta.app_label not in PRIMARY_ONLY_APPS
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        wrote = _wrote.get()
+        if wrote is not None and model._meta.app_label != "sessions":
+            wrote.append(model._meta.label)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema with the data (replication / sync_replica).
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaStickyMiddleware:
+    """Pin a session's reads to ``default`` for a while after it writes.
+
+    Must come after SessionMiddleware (it stores the deadline in the session).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configured():
+            return self.get_response(request)
+
+        token = _wrote.set([])
+        try:
+            response = self.get_response(request)
+            if _wrote.get() and hasattr(request, "session"):
+                request.session[STICKY_SESSION_KEY] = time.time() + settings.DB_REPLICA_STICKY_SECONDS
+        finally:
+            _wrote.reset(token)
+        return response
@@ -0,0 +1,120 @@
+"""Per-request SQL and timing instrumentation, cheap enough to leave on.
+
+:class:`RequestTimingMiddleware` hooks every database connection with
+``connection.execute_wrapper`` for the duration of a request and records
+query count, total SQL time, and how often each statement ran. It adds a
+``Server-Timing`` header (``sql`` and ``view``, appended to any phases the view
+set itself) and logs one JSON line on the ``portal.requests`` logger: at
+WARNING for requests slower than ``REQUEST_SLOW_MS`` (with the most repeated
+statements), at DEBUG for the rest.
+
+A "duplicate" is a query whose SQL text (parameters aside) already ran in the
+same request: the N+1 shape. Only ``REQUEST_TIMING_SAMPLE_RATE`` of requests
+are instrumented; the others pass through untouched.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("portal.requests")
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that counts and times the queries it sees."""
+
+    def __init__(self):
+        self.statements: Counter[str] = Counter()
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    @property
+    def count(self) -> int:
+        return self.statements.total()
+
+    @property
+    def duplicates(self) -> int:
+        return self.count - len(self.statements)
+
+    def top_duplicates(self, n: int) -> list[dict]:
+        return [
+            {"count": count, "sql": sql[:500]}
+            for sql, count in self.statements.most_common(n)
+            if count > 1
+        ]
+
+
+def server_timing(recorder: QueryRecorder, total: float) -> str:
+    sql_ms = round(recorder.seconds * 1000, 1)
+    view_ms = round(total * 1000, 1)
+    return (
+        f'sql;dur={sql_ms};desc="{recorder.count} queries, {recorder.duplicates} duplicates", '
+        f"view;dur={view_ms}"
+    )
+
+
+class RequestTimingMiddleware:
+    """Record SQL and wall time of a sample of requests (see the module docstring).
+
+    Goes first in ``MIDDLEWARE`` so session and auth queries count too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            # Every alias (default, replica): opening the wrapper does not connect.
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            started = time.perf_counter()
+            response = self.get_response(request)
+            total = time.perf_counter() - started
+
+        if settings.REQUEST_TIMING_HEADER:
+            existing = response.get("Server-Timing")
+            timing = server_timing(recorder, total)
+            response["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+        self.log(request, response, recorder, total)
+        return response
+
+    def log(self, request, response, recorder: QueryRecorder, total: float):
+        slow = total * 1000 >= settings.REQUEST_SLOW_MS
+        level = logging.WARNING if slow else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        match = getattr(request, "resolver_match", None)
+        record = {
+            "event": "slow_request" if slow else "request",
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "sql_ms": round(recorder.seconds * 1000, 1),
+            "queries": recorder.count,
+            "duplicates": recorder.duplicates,
+        }
+        if slow:
+            record["top_duplicates"] = recorder.top_duplicates(settings.REQUEST_SLOW_TOP_DUPLICATES)
+        logger.log(level, json.dumps(record, default=str))
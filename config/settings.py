@@ -7,6 +7,10 @@ Generated by 'django-admin startproject' using Django 5.0.14.
 from pathlib import Path
 import os
 import sys
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import load_dotenv
 
 # ---------------------------------------------------------
 # Paths
@@ -16,6 +20,18 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Allow importing apps from /apps folder
 sys.path.insert(0, str(BASE_DIR / "apps"))
 
+# Settings below read os.environ; a .env file in the project root fills in
+# anything not already set in the real environment.
+load_dotenv(BASE_DIR / ".env")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # ---------------------------------------------------------
 # Quick-start development settings (DEV)
 # ---------------------------------------------------------
@@ -48,8 +64,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.request_timing.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "config.db_router.ReplicaStickyMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -82,14 +100,85 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 
 # ---------------------------------------------------------
-# Database (dev)
+# Database
 # ---------------------------------------------------------
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Chosen by DB_ENGINE (from the environment or .env): "sqlite" (default) or
+# "postgresql" (needs psycopg: pip install "psycopg[binary]").
+#
+# config.sqlite_backend = Django's SQLite backend + the pragmas below on every
+# connection. WAL lets page views read while an import writes; busy_timeout
+# (ms) makes a second writer wait instead of failing with "database is locked".
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite").strip().lower()
+
+if DB_ENGINE in ("postgres", "postgresql"):
+    _default_db = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("DB_NAME", "result_portal"),
+        "USER": os.environ.get("DB_USER", ""),
+        "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+        "HOST": os.environ.get("DB_HOST", ""),
+        "PORT": os.environ.get("DB_PORT", ""),
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", "10")),
+        },
     }
-}
+elif DB_ENGINE == "sqlite":
+    _default_db = {
+        "ENGINE": "config.sqlite_backend",
+        "NAME": os.environ.get("DB_NAME", str(BASE_DIR / "db.sqlite3")),
+        "PRAGMAS": {
+            "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+            "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+            "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", "5000")),
+            "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+            # Negative = KiB (64 MiB page cache per connection)
+            "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", "-65536")),
+            "temp_store": os.environ.get("SQLITE_TEMP_STORE", "MEMORY"),
+        },
+        # BEGIN mode of atomic blocks (DEFERRED / IMMEDIATE / EXCLUSIVE)
+        "TRANSACTION_MODE": os.environ.get("SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+    }
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'sqlite' or 'postgresql', not {DB_ENGINE!r}")
+
+# Keep connections open between requests (seconds; 0 = close after each
+# request, "none" = forever); health checks replace a connection that died
+# while idle instead of failing the next request.
+_conn_max_age = os.environ.get("DB_CONN_MAX_AGE", "60").strip().lower()
+_default_db["CONN_MAX_AGE"] = None if _conn_max_age == "none" else int(_conn_max_age)
+_default_db["CONN_HEALTH_CHECKS"] = _env_bool("DB_CONN_HEALTH_CHECKS", True)
+
+# Test database name (default: "test_" + NAME on PostgreSQL, in memory on SQLite)
+if os.environ.get("DB_TEST_NAME"):
+    _default_db["TEST"] = {"NAME": os.environ["DB_TEST_NAME"]}
+
+DATABASES = {"default": _default_db}
+
+# Optional read replica for PDFs / dashboards / document previews (config.db_router).
+# SQLite: DB_REPLICA_NAME = a second file, refreshed with manage.py sync_replica.
+# PostgreSQL: DB_REPLICA_HOST (and optionally DB_REPLICA_PORT / DB_REPLICA_NAME)
+# of a streaming-replication standby.
+if os.environ.get("DB_REPLICA_NAME") or os.environ.get("DB_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **_default_db,
+        "NAME": os.environ.get("DB_REPLICA_NAME", _default_db["NAME"]),
+        # Tests use the default database for both aliases.
+        "TEST": {"MIRROR": "default"},
+    }
+    if DB_ENGINE == "sqlite":
+        # Read-only connections; sync_replica writes the file through the backup API.
+        DATABASES["replica"]["PRAGMAS"] = {**_default_db["PRAGMAS"], "query_only": "ON"}
+        DATABASES["replica"]["TRANSACTION_MODE"] = "DEFERRED"
+    else:
+        DATABASES["replica"]["HOST"] = os.environ.get("DB_REPLICA_HOST", _default_db["HOST"])
+        DATABASES["replica"]["PORT"] = os.environ.get("DB_REPLICA_PORT", _default_db["PORT"])
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+# Seconds a session keeps reading from default after it wrote (replica lag).
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get("DB_REPLICA_STICKY_SECONDS", "15"))
+
+# Runs every app's tests; DB_ENGINE=postgresql python manage.py test runs them on PostgreSQL.
+TEST_RUNNER = "config.test_runner.ProjectTestRunner"
 
 # ---------------------------------------------------------
 # Password validation
@@ -130,3 +219,115 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/dashboard/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
+
+# ---------------------------------------------------------
+# Dashboard lists (dashboards.pagination)
+# ---------------------------------------------------------
+LIST_PAGE_SIZE = int(os.environ.get("LIST_PAGE_SIZE", "50"))
+
+# ---------------------------------------------------------
+# Cache
+# ---------------------------------------------------------
+# File-based by default (Django's own default, LocMemCache, is per process) so
+# every worker process on the host shares the version stamps (and cached data)
+# of dashboards.roles and dashboards.filter_cascade. Deployments on more than
+# one host must point CACHE_BACKEND / CACHE_LOCATION at Redis/Memcached.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "result_portal_cache"),
+        ),
+    }
+}
+
+# Seconds a user's group set stays cached in the session (dashboards.roles).
+# Membership changes invalidate it immediately; this only bounds staleness.
+ROLE_CACHE_TTL = int(os.environ.get("ROLE_CACHE_TTL", "900"))
+
+# Seconds other processes may serve a stale department list (role_flags);
+# the writing process is invalidated immediately.
+DEPARTMENT_CACHE_TTL = int(os.environ.get("DEPARTMENT_CACHE_TTL", "300"))
+
+# ---------------------------------------------------------
+# PDF rendering (results.rendering)
+# ---------------------------------------------------------
+# "host:port" (or socket path) of the service started with
+# `python manage.py run_pdf_renderer`. Empty => render inside the web process.
+PDF_RENDERER_ADDRESS = os.environ.get("PDF_RENDERER_ADDRESS", "")
+# Number of renderer processes (= max concurrent renders in the service)
+PDF_RENDER_POOL_SIZE = int(os.environ.get("PDF_RENDER_POOL_SIZE", "2"))
+# Recycle a worker after this many renders (0 = never)
+PDF_RENDER_MAX_TASKS_PER_WORKER = int(os.environ.get("PDF_RENDER_MAX_TASKS_PER_WORKER", "200"))
+# Seconds a single render may take inside the service
+PDF_RENDER_TIMEOUT = int(os.environ.get("PDF_RENDER_TIMEOUT", "120"))
+# Seconds a web request waits for the service's reply (queueing included)
+PDF_RENDER_CLIENT_TIMEOUT = float(os.environ.get("PDF_RENDER_CLIENT_TIMEOUT", PDF_RENDER_TIMEOUT + 10))
+# Background pre-generation (results.pregenerate): renders it may run at once
+# (each also takes a global slot, so live requests keep the rest)
+PDF_PREGENERATE_MAX_CONCURRENT = int(os.environ.get("PDF_PREGENERATE_MAX_CONCURRENT", "1"))
+# Seconds without progress before a queued/running job is shown as stalled
+PDF_PREGENERATE_STALE_SECONDS = int(os.environ.get("PDF_PREGENERATE_STALE_SECONDS", "900"))
+# Site root used to resolve /static/ assets (logo) in PDFs rendered outside a request
+PDF_BASE_URL = os.environ.get("PDF_BASE_URL", "http://127.0.0.1:8000/")
+
+# Back-pressure for PDF endpoints (results.throttling). Limits are shared by all
+# processes on the host through lock files; 0 disables a limit.
+PDF_RENDER_MAX_CONCURRENT = int(os.environ.get("PDF_RENDER_MAX_CONCURRENT", "2"))
+PDF_RENDER_MAX_PER_USER = int(os.environ.get("PDF_RENDER_MAX_PER_USER", "1"))
+# Per endpoint, e.g. PDF_RENDER_LIMIT_DMC_BATCH_PDF=1
+PDF_RENDER_ENDPOINT_LIMITS = {
+    endpoint: int(os.environ.get(f"PDF_RENDER_LIMIT_{endpoint.upper()}", default))
+    for endpoint, default in (
+        ("result_notification_pdf", 2),
+        ("dmc_batch_pdf", 1),
+        ("dmc_single_pdf", 2),
+    )
+}
+# Seconds a request waits for a slot before getting the "busy" page
+PDF_RENDER_QUEUE_WAIT = float(os.environ.get("PDF_RENDER_QUEUE_WAIT", "2"))
+# Retry-After (seconds) sent with the "busy" page
+PDF_RENDER_RETRY_AFTER = int(os.environ.get("PDF_RENDER_RETRY_AFTER", "5"))
+PDF_RENDER_LOCK_DIR = os.environ.get(
+    "PDF_RENDER_LOCK_DIR",
+    os.path.join(tempfile.gettempdir(), "result_portal_render_slots"),
+)
+
+# ---------------------------------------------------------
+# Request timing (config.request_timing)
+# ---------------------------------------------------------
+# Fraction of requests instrumented (SQL count/time, Server-Timing header)
+REQUEST_TIMING_SAMPLE_RATE = float(os.environ.get("REQUEST_TIMING_SAMPLE_RATE", "1"))
+# Requests at least this slow are logged at WARNING with their repeated queries
+REQUEST_SLOW_MS = float(os.environ.get("REQUEST_SLOW_MS", "1000"))
+# How many repeated statements a slow-request line lists
+REQUEST_SLOW_TOP_DUPLICATES = int(os.environ.get("REQUEST_SLOW_TOP_DUPLICATES", "5"))
+REQUEST_TIMING_HEADER = _env_bool("REQUEST_TIMING_HEADER", True)
+
+# ---------------------------------------------------------
+# Logging
+# ---------------------------------------------------------
+# "results.pdf" emits one JSON line per rendered PDF (phase timings, pages, size).
+# "portal.requests" emits one JSON line per slow request (WARNING), or per
+# sampled request with PORTAL_REQUESTS_LOG_LEVEL=DEBUG.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "plain"},
+    },
+    "loggers": {
+        "results": {
+            "handlers": ["console"],
+            "level": os.environ.get("RESULTS_LOG_LEVEL", "INFO"),
+        },
+        "portal.requests": {
+            "handlers": ["console"],
+            "level": os.environ.get("PORTAL_REQUESTS_LOG_LEVEL", "WARNING"),
+        },
+    },
+}
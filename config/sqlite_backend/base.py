@@ -0,0 +1,52 @@
+"""SQLite backend with per-connection tuning for the live server.
+
+Django's sqlite3 backend plus, for every new connection, the ``PRAGMAS`` of the
+database settings (WAL journal, busy timeout, mmap, page cache, ...), and
+``BEGIN <TRANSACTION_MODE>`` for atomic blocks. ``IMMEDIATE`` takes the write
+lock up front, so a second writer waits ``busy_timeout`` instead of failing
+with "database is locked" when it upgrades a read transaction.
+"""
+
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+# Pragmas that may be set from settings (values come from the environment).
+ALLOWED_PRAGMAS = {
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "mmap_size",
+    "cache_size",
+    "temp_store",
+    "wal_autocheckpoint",
+    "journal_size_limit",
+    "query_only",
+}
+TRANSACTION_MODES = {"DEFERRED", "IMMEDIATE", "EXCLUSIVE"}
+_VALUE = re.compile(r"^-?\w+$")
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def pragmas(self) -> dict:
+        pragmas = self.settings_dict.get("PRAGMAS") or {}
+        for name, value in pragmas.items():
+            if name not in ALLOWED_PRAGMAS or not _VALUE.match(str(value)):
+                raise ImproperlyConfigured(f"Invalid SQLite pragma: {name} = {value!r}")
+        return pragmas
+
+    def transaction_mode(self) -> str:
+        mode = (self.settings_dict.get("TRANSACTION_MODE") or "DEFERRED").upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"Invalid SQLite transaction mode: {mode!r}")
+        return mode
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas().items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {self.transaction_mode()}")
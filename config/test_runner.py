@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class ProjectTestRunner(DiscoverRunner):
+    """``manage.py test`` without labels runs the tests of every app in ``apps/``.
+
+    ``apps/`` is on ``sys.path`` rather than a package, so plain discovery
+    from the project root finds nothing.
+    """
+
+    def build_suite(self, test_labels=None, **kwargs):
+        if not test_labels:
+            apps_dir = settings.BASE_DIR / "apps"
+            test_labels = [
+                config.name for config in apps.get_app_configs() if Path(config.path).parent == apps_dir
+            ]
+        return super().build_suite(test_labels, **kwargs)
@@ -0,0 +1,60 @@
+/* Search box of dashboards.admin_filters.AutocompleteListFilter.
+ * Queries the admin autocomplete endpoint as the user types and lists the
+ * matches as filter links. Included once per filter; each box is set up once. */
+(function () {
+  function init(box) {
+    if (box.dataset.ready) { return; }
+    box.dataset.ready = "1";
+    var input = box.querySelector("input");
+    var results = box.querySelector(".admin-autocomplete-results");
+    var timer = null;
+    var seq = 0;
+
+    function link(item) {
+      var qs = box.dataset.queryString;
+      var params = new URLSearchParams(qs.charAt(0) === "?" ? qs.slice(1) : qs);
+      params.set(box.dataset.lookup, item.id);
+      var li = document.createElement("li");
+      var a = document.createElement("a");
+      a.href = "?" + params.toString();
+      a.textContent = item.text;
+      li.appendChild(a);
+      return li;
+    }
+
+    function search() {
+      var term = input.value.trim();
+      results.innerHTML = "";
+      if (term.length < 2) { return; }
+      var params = new URLSearchParams({
+        term: term,
+        app_label: box.dataset.appLabel,
+        model_name: box.dataset.modelName,
+        field_name: box.dataset.fieldName
+      });
+      var mine = ++seq;
+      fetch(box.dataset.url + "?" + params.toString(), { headers: { "X-Requested-With": "XMLHttpRequest" } })
+        .then(function (r) { return r.json(); })
+        .then(function (data) {
+          if (mine !== seq) { return; }  // a newer query is in flight
+          results.innerHTML = "";
+          (data.results || []).forEach(function (item) { results.appendChild(link(item)); });
+        });
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(search, 200);
+    });
+  }
+
+  function initAll() {
+    document.querySelectorAll(".admin-autocomplete-filter").forEach(init);
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", initAll);
+  } else {
+    initAll();
+  }
+})();
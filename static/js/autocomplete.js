@@ -0,0 +1,74 @@
+/* Autocomplete for dashboards.widgets.AutocompleteSelect.
+ * Typing in the search box queries the JSON endpoint and shows a result list;
+ * picking a result becomes the single selected <option> of the real <select>. */
+(function () {
+  function init(box) {
+    var input = box.querySelector(".autocomplete-input");
+    var results = box.querySelector(".autocomplete-results");
+    var select = box.querySelector("select");
+    var url = box.dataset.autocompleteUrl;
+    var forward = (box.dataset.forward || "").split(",").filter(Boolean);
+    var timer = null;
+    var seq = 0;
+
+    function clear() { results.innerHTML = ""; }
+
+    function choose(item) {
+      var option = Array.prototype.find.call(select.options, function (o) { return o.value === String(item.id); });
+      if (!option) {
+        option = new Option(item.text, item.id);
+        select.add(option);
+      }
+      select.value = String(item.id);
+      select.dispatchEvent(new Event("change", { bubbles: true }));
+      input.value = "";
+      clear();
+    }
+
+    function search() {
+      var q = input.value.trim();
+      if (q.length < 2) { clear(); return; }
+      var params = new URLSearchParams({ q: q });
+      forward.forEach(function (name) {
+        var field = select.form && select.form.elements[name];
+        if (field && field.value) { params.set(name, field.value); }
+      });
+      var mine = ++seq;
+      fetch(url + "?" + params.toString(), { headers: { "X-Requested-With": "XMLHttpRequest" } })
+        .then(function (r) { return r.json(); })
+        .then(function (data) {
+          if (mine !== seq) { return; }  // a newer query is in flight
+          clear();
+          (data.results || []).forEach(function (item) {
+            var a = document.createElement("button");
+            a.type = "button";
+            a.className = "list-group-item list-group-item-action";
+            a.textContent = item.text;
+            a.addEventListener("click", function () { choose(item); });
+            results.appendChild(a);
+          });
+          if (!data.results || !data.results.length) {
+            var none = document.createElement("div");
+            none.className = "list-group-item text-muted";
+            none.textContent = "No matches";
+            results.appendChild(none);
+          }
+        });
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(search, 200);
+    });
+    input.addEventListener("keydown", function (e) {
+      if (e.key === "Escape") { clear(); }
+    });
+    document.addEventListener("click", function (e) {
+      if (!box.contains(e.target)) { clear(); }
+    });
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll(".autocomplete[data-autocomplete-url]").forEach(init);
+  });
+})();
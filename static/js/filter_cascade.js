@@ -0,0 +1,74 @@
+/* Cascading document pickers (DMC / result notifications).
+ * Changing a level clears the levels below it and reloads every dropdown from
+ * the filter-options JSON endpoint instead of reloading the page. If the
+ * request fails the form is submitted as before. */
+(function () {
+  var seq = 0;
+
+  function fill(select, items, selected, placeholder, value, text) {
+    if (!select) { return; }
+    select.innerHTML = "";
+    select.add(new Option(placeholder, ""));
+    items.forEach(function (item) {
+      var option = new Option(text(item), value(item));
+      option.selected = String(value(item)) === String(selected);
+      select.add(option);
+    });
+  }
+
+  function toggle(form, name, show) {
+    var el = form.querySelector('[data-cascade-hint="' + name + '"]');
+    if (el) { el.classList.toggle("d-none", !show); }
+  }
+
+  function render(form, data) {
+    var f = form.elements;
+    fill(f.program, data.programs, data.program_id, "Select Program",
+      function (p) { return p.id; }, function (p) { return p.name; });
+    fill(f.session, data.sessions, data.session_id, "Select Session",
+      function (s) { return s.id; }, function (s) { return s.start_year; });
+    fill(f.semester, data.semesters, data.semester_no, "Select Semester",
+      function (n) { return n; }, function (n) { return n; });
+    fill(f.batch, data.batches, data.batch_id, "Select Batch",
+      function (b) { return b.id; }, function (b) { return b.label; });
+    toggle(form, "batches", data.program_id && data.session_id && data.semester_no && !data.batches.length);
+
+    if (f.enrollment) {
+      fill(f.enrollment, data.students || [], data.enrollment_id, "Select Student",
+        function (r) { return r.enrollment_id; }, function (r) { return r.roll + " | " + r.reg + " | " + r.name; });
+      f.enrollment.disabled = !data.batch_id;
+      toggle(form, "students", data.batch_id && !(data.students || []).length);
+    }
+    form.querySelectorAll("[data-requires-batch]").forEach(function (el) { el.disabled = !data.batch_id; });
+  }
+
+  function params(form) {
+    var p = new URLSearchParams();
+    Array.prototype.forEach.call(form.elements, function (el) {
+      if (el.name && el.name !== "action" && el.value) { p.set(el.name, el.value); }
+    });
+    return p;
+  }
+
+  window.refreshOptions = function (form, clear) {
+    clear.forEach(function (n) {
+      var el = form.elements[n];
+      if (el) { el.value = ""; }
+    });
+
+    var p = params(form);
+    history.replaceState(null, "", "?" + p.toString());
+    if (form.elements.enrollment) { p.set("students", "1"); }
+
+    var mine = ++seq;
+    fetch(form.dataset.cascadeUrl + "?" + p.toString(), { headers: { "X-Requested-With": "XMLHttpRequest" } })
+      .then(function (r) {
+        if (!r.ok) { throw new Error(r.status); }
+        return r.json();
+      })
+      .then(function (data) {
+        if (mine === seq) { render(form, data); }
+      })
+      .catch(function () { form.submit(); });
+  };
+})();